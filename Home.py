@@ -120,7 +120,7 @@ st.write("---")
 st.markdown("<h2 style='text-align: center; color: #667eea;'>🔄 Alur Penggunaan Aplikasi</h2>", unsafe_allow_html=True)
 st.write("")
 
-workflow_cols = st.columns(5)
+workflow_cols = st.columns(6)
 
 with workflow_cols[0]:
     st.markdown("""
@@ -167,10 +167,21 @@ with workflow_cols[3]:
     """, unsafe_allow_html=True)
 
 with workflow_cols[4]:
+    st.markdown("""
+        <div class="workflow-step">
+            <div style="text-align: center; font-size: 30px;">🔮</div>
+            <div style="text-align: center;">5. Prediction</div>
+        </div>
+        <p style="text-align: center; color: #666;">
+        Prediksi data survei baru
+        </p>
+    """, unsafe_allow_html=True)
+
+with workflow_cols[5]:
     st.markdown("""
         <div class="workflow-step">
             <div style="text-align: center; font-size: 30px;">ℹ️</div>
-            <div style="text-align: center;">5. About Us</div>
+            <div style="text-align: center;">6. About Us</div>
         </div>
         <p style="text-align: center; color: #666;">
         Informasi tim & mata kuliah
@@ -208,7 +219,8 @@ st.info("""
 3. 🔧 Lakukan **Preprocessing** untuk membersihkan data
 4. 📈 Jalankan **Analysis** untuk training model Random Forest
 5. 📊 Eksplorasi **Visualizations** untuk insight lebih dalam
-6. ℹ️ Lihat **About Us** untuk info mata kuliah dan tim
+6. 🔮 Gunakan **Prediction** untuk memprediksi data survei baru
+7. ℹ️ Lihat **About Us** untuk info mata kuliah dan tim
 
 **Tips:**
 - Pastikan dataset memiliki kolom target bernama 'Depression'
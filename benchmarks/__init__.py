@@ -0,0 +1 @@
+"""Benchmark skala pipeline (load, profiling, preprocessing, training, visualisasi)."""
@@ -0,0 +1,102 @@
+"""Bandingkan dua hasil ``benchmarks.run`` dan tandai regresi.
+
+    python -m benchmarks.compare hasil_lama.json hasil_baru.json
+    python -m benchmarks.compare lama.json baru.json --threshold 1.2 --min-seconds 0.1
+
+Tahap dicocokkan per ``(n_rows, stage)``. Sebuah tahap dianggap regresi jika
+waktunya (atau puncak alokasi ``tracemalloc``-nya) lebih dari ``threshold``
+kali nilai lama dan selisih absolutnya melewati batas minimum, agar noise
+pada tahap yang sangat singkat tidak ikut ditandai. Hasil tanpa pengukuran
+memori (``--no-memory`` atau hasil lama berbasis RSS) hanya dibandingkan
+waktunya. Exit code 1 jika ada regresi, sehingga bisa dipakai di CI.
+"""
+import argparse
+import json
+import sys
+
+import pandas as pd
+
+DEFAULT_THRESHOLD = 1.25
+DEFAULT_MIN_SECONDS = 0.05
+DEFAULT_MIN_MEMORY_MB = 16
+
+
+def _workload(params):
+    # Ukuran, tahap yang dilewati, dan jumlah ulangan tidak mengubah isi pekerjaan per tahap
+    return {name: value for name, value in params.items() if name not in ('sizes', 'skip', 'repeat')}
+
+
+def load_results(path):
+    with open(path) as f:
+        report = json.load(f)
+    results = pd.DataFrame(report['results']).set_index(['n_rows', 'stage'])
+    # Hasil lama (sebelum tracemalloc) tidak punya kolom peak_mb, hasil --no-memory berisi None
+    results['peak_mb'] = pd.to_numeric(results.get('peak_mb'), errors='coerce')
+    return report, results
+
+
+def compare_results(base, new, threshold=DEFAULT_THRESHOLD, min_seconds=DEFAULT_MIN_SECONDS,
+                    min_memory_mb=DEFAULT_MIN_MEMORY_MB):
+    """DataFrame per ``(n_rows, stage)`` yang ada di kedua hasil, dengan rasio dan flag regresi."""
+    joined = base[['seconds', 'peak_mb']].join(
+        new[['seconds', 'peak_mb']], how='inner', lsuffix='_base', rsuffix='_new'
+    )
+    joined['time_ratio'] = joined['seconds_new'] / joined['seconds_base']
+    joined['time_regression'] = (
+        (joined['time_ratio'] > threshold)
+        & (joined['seconds_new'] - joined['seconds_base'] > min_seconds)
+    )
+    memory_base = joined['peak_mb_base']
+    memory_new = joined['peak_mb_new']
+    # Perbandingan dengan NaN bernilai False, jadi tahap tanpa data memori tidak ditandai
+    joined['memory_regression'] = (
+        (memory_new > memory_base * threshold)
+        & (memory_new - memory_base > min_memory_mb)
+    )
+    return joined
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bandingkan dua hasil benchmark")
+    parser.add_argument('base', help="Hasil acuan (mis. commit sebelumnya)")
+    parser.add_argument('new', help="Hasil baru")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Rasio baru/lama yang dianggap regresi")
+    parser.add_argument('--min-seconds', type=float, default=DEFAULT_MIN_SECONDS,
+                        help="Selisih waktu minimum (detik) agar dianggap regresi")
+    parser.add_argument('--min-memory-mb', type=float, default=DEFAULT_MIN_MEMORY_MB,
+                        help="Selisih puncak alokasi minimum (MB) agar dianggap regresi")
+    args = parser.parse_args(argv)
+
+    base_report, base = load_results(args.base)
+    new_report, new = load_results(args.new)
+    print(f"Acuan: {base_report['environment'].get('commit')} ({base_report['created_at']})")
+    print(f"Baru : {new_report['environment'].get('commit')} ({new_report['created_at']})")
+    if _workload(base_report['params']) != _workload(new_report['params']):
+        print("⚠️  Parameter benchmark berbeda, perbandingan mungkin tidak setara")
+
+    comparison = compare_results(base, new, args.threshold, args.min_seconds, args.min_memory_mb)
+    if comparison.empty:
+        print("Tidak ada tahap yang sama di kedua hasil")
+        return 0
+
+    table = comparison.copy()
+    table['flag'] = ''
+    table.loc[table['time_regression'], 'flag'] += ' WAKTU'
+    table.loc[table['memory_regression'], 'flag'] += ' MEMORI'
+    columns = ['seconds_base', 'seconds_new', 'time_ratio', 'peak_mb_base', 'peak_mb_new', 'flag']
+    display = {'display.max_rows': None, 'display.max_columns': None, 'display.width': 200,
+               'display.float_format': '{:.3f}'.format}
+    with pd.option_context(*[item for option in display.items() for item in option]):
+        print(table[columns])
+
+    regressions = comparison[comparison['time_regression'] | comparison['memory_regression']]
+    if len(regressions):
+        print(f"❌ {len(regressions)} tahap mengalami regresi")
+        return 1
+    print("✅ Tidak ada regresi")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
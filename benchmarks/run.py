@@ -0,0 +1,397 @@
+"""Benchmark setiap tahap pipeline pada dataset sintetis berbagai ukuran.
+
+Jalankan dari root project::
+
+    python -m benchmarks.run                          # 27.9rb, 100rb, 1jt, 10jt baris
+    python -m benchmarks.run --sizes 27901 1000000 --trees 20
+    python -m benchmarks.compare hasil_lama.json hasil_baru.json
+
+Tahap yang diukur mengikuti pekerjaan yang dilakukan halaman-halaman:
+
+- Input Data: load CSV (parse + tulis snapshot), load ulang dari snapshot
+  Arrow, kompresi tipe data, profiling di memori, profiling streaming
+- Preprocessing: setiap langkah pipeline secara terpisah, untuk kedua jalur
+  load (frame hasil parse CSV dan frame read-only dari snapshot Arrow).
+  Missing values diukur untuk setiap metode (``mean``, ``median``,
+  ``drop``); hapus duplikat dan encoding melanjutkan hasil metode default
+- Analysis: split train/test berstrata, matriks feature float32, fit Random
+  Forest, predict data test
+- Visualizations: data untuk correlation heatmap, distribusi kategorikal
+  (value counts + crosstab), histogram & box plot numerikal, dan KDE
+
+Setiap tahap dicatat waktunya (``perf_counter``, tercepat dari ``--repeat``
+kali). Memori diukur dengan satu run tambahan per tahap saat ``tracemalloc``
+aktif (``utils.memory.TracedMemory``): puncak alokasi selama tahap dan
+alokasi yang masih dipegang setelahnya. Run ini tidak dihitung waktunya
+karena tracing memperlambat alokasi Python. Alokasi di luar allocator
+Python/NumPy (buffer Arrow, node tree sklearn) tidak ikut terhitung.
+
+Hasil ditulis sebagai JSON bersama commit git, versi library, dan parameter
+benchmark, sehingga dua hasil dari commit berbeda bisa dibandingkan dengan
+``benchmarks.compare``.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import sklearn
+from scipy.stats import gaussian_kde
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
+
+from benchmarks.synthetic import DATA_DIR, get_dataset
+from utils.compaction import compact_dtypes
+from utils.data_loader import NA_VALUES, clear_cache, load_csv, snapshot_path
+from utils.memory import TracedMemory
+from utils.preprocessing import TARGET_COL, build_pipeline
+from utils.profiler import profile_csv_stream, profile_dataframe
+from utils.training import compact_features, fit_forest
+
+DEFAULT_SIZES = (27_901, 100_000, 1_000_000, 10_000_000)
+RESULTS_DIR = os.path.join('benchmarks', 'results')
+
+# Langkah default halaman Preprocessing
+PREPROCESSING_STEPS = {
+    'handle_missing': True,
+    'missing_method': 'drop',
+    'remove_duplicates': True,
+    'encode_categorical': True,
+}
+MISSING_METHODS = ('mean', 'median', 'drop')
+# Jalur load: frame hasil parse CSV dan frame read-only dari snapshot Arrow
+LOAD_PATHS = ('csv', 'snapshot')
+TEST_SIZE = 0.2
+RANDOM_STATE = 42
+HISTOGRAM_BINS = 30
+# pandas Series.plot.kde mengevaluasi density di 1000 titik
+KDE_POINTS = 1000
+
+
+def _git(*args):
+    try:
+        return subprocess.run(
+            ['git', *args], capture_output=True, text=True, check=True, timeout=30
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment_info():
+    status = _git('status', '--porcelain', '--untracked-files=no')
+    return {
+        'commit': _git('rev-parse', 'HEAD'),
+        'dirty': None if status is None else bool(status),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+    }
+
+
+def feature_columns(df):
+    return [col for col in df.columns if col not in (TARGET_COL, 'id')]
+
+
+def numeric_columns(df):
+    return [col for col in df.select_dtypes(include=['number']).columns if col.lower() not in ('id', 'index')]
+
+
+# Setiap tahap menerima dict ``state`` bersama dan mengembalikan jumlah baris hasilnya
+
+def stage_load_csv(state):
+    # Hapus snapshot agar load benar-benar mem-parse CSV seperti load pertama
+    if os.path.exists(snapshot_path(state['path'])):
+        os.remove(snapshot_path(state['path']))
+    clear_cache()
+    df, _ = load_csv(state['path'], na_values=NA_VALUES)
+    state['original'] = state['frame_csv'] = df
+    return len(state['original'])
+
+
+def stage_load_snapshot(state):
+    clear_cache()
+    df, _ = load_csv(state['path'], na_values=NA_VALUES)
+    state['original'] = state['frame_snapshot'] = df
+    clear_cache()
+    return len(state['original'])
+
+
+def stage_compact_dtypes(state):
+    return len(compact_dtypes(state['original']))
+
+
+def stage_profile(state):
+    return profile_dataframe(state['original']).n_rows
+
+
+def stage_profile_stream(state):
+    profile, _ = profile_csv_stream(state['path'], na_values=NA_VALUES)
+    return profile.n_rows
+
+
+def make_preprocessing_stage(name, input_key, output_key, missing_method=PREPROCESSING_STEPS['missing_method']):
+    steps = {**PREPROCESSING_STEPS, 'missing_method': missing_method}
+
+    def stage(state):
+        transformer = dict(build_pipeline(steps).steps)[name]
+        state[output_key] = transformer.fit_transform(state[input_key])
+        return len(state[output_key])
+    return stage
+
+
+def stage_split(state):
+    y = state['processed'][TARGET_COL]
+    state['train_positions'], state['test_positions'] = train_test_split(
+        np.arange(len(y)), test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y
+    )
+    return len(state['train_positions'])
+
+
+def stage_feature_matrix(state):
+    X = state['processed'][feature_columns(state['processed'])]
+    state['X_train'] = compact_features(X, state['train_positions'])
+    state['X_test'] = compact_features(X, state['test_positions'])
+    return len(state['X_train'])
+
+
+def stage_fit(state):
+    y_train = state['processed'][TARGET_COL].iloc[state['train_positions']]
+    state['model'], _, _ = fit_forest(state['X_train'], y_train, state['forest_params'])
+    return len(y_train)
+
+
+def stage_predict(state):
+    y_pred = state['model'].predict(state['X_test'])
+    y_test = state['processed'][TARGET_COL].iloc[state['test_positions']]
+    state['test_accuracy'] = float(accuracy_score(y_test, y_pred))
+    return len(y_pred)
+
+
+def stage_viz_correlation(state):
+    return len(state['original'].select_dtypes(include=['number']).corr())
+
+
+def stage_viz_categorical(state):
+    df = state['original']
+    for col in df.select_dtypes(include=['object', 'category']).columns:
+        df[col].value_counts().head(10)
+        pd.crosstab(df[col], df[TARGET_COL], normalize='index')
+    return len(df)
+
+
+def stage_viz_numeric(state):
+    df = state['original']
+    columns = numeric_columns(df)
+    for col in columns:
+        values = df[col].dropna().to_numpy()
+        np.histogram(values, bins=HISTOGRAM_BINS)
+        values.mean()
+    df.groupby(TARGET_COL)[columns].quantile([0.25, 0.5, 0.75])
+    return len(df)
+
+
+def stage_viz_kde(state):
+    df = state['original']
+    col = numeric_columns(df)[0]
+    for _, values in df.groupby(TARGET_COL)[col]:
+        values = values.dropna().to_numpy(dtype=float)
+        spread = values.max() - values.min()
+        points = np.linspace(values.min() - 0.5 * spread, values.max() + 0.5 * spread, KDE_POINTS)
+        gaussian_kde(values).evaluate(points)
+    return len(df)
+
+
+def preprocessing_stages(load_path):
+    """Tahap preprocessing untuk frame dari ``load_path`` (lihat ``LOAD_PATHS``)."""
+    default_method = PREPROCESSING_STEPS['missing_method']
+    stages = [
+        (f'preprocess_missing_{method}_{load_path}',
+         make_preprocessing_stage('missing', f'frame_{load_path}', f'after_missing_{method}_{load_path}', method))
+        for method in MISSING_METHODS
+    ]
+    # Hasil jalur CSV dipakai untuk split dan training
+    output_key = 'processed' if load_path == 'csv' else f'processed_{load_path}'
+    return stages + [
+        (f'preprocess_duplicates_{load_path}', make_preprocessing_stage(
+            'duplicates', f'after_missing_{default_method}_{load_path}', f'after_duplicates_{load_path}')),
+        (f'preprocess_encode_{load_path}', make_preprocessing_stage(
+            'encode', f'after_duplicates_{load_path}', output_key)),
+    ]
+
+
+STAGES = [
+    ('load_csv', stage_load_csv),
+    *preprocessing_stages('csv'),
+    ('load_snapshot', stage_load_snapshot),
+    *preprocessing_stages('snapshot'),
+    ('compact_dtypes', stage_compact_dtypes),
+    ('profile', stage_profile),
+    ('profile_stream', stage_profile_stream),
+    ('split', stage_split),
+    ('feature_matrix', stage_feature_matrix),
+    ('fit', stage_fit),
+    ('predict', stage_predict),
+    ('viz_correlation', stage_viz_correlation),
+    ('viz_categorical', stage_viz_categorical),
+    ('viz_numeric', stage_viz_numeric),
+    ('viz_kde', stage_viz_kde),
+]
+SNAPSHOT_STAGES = [name for name, _ in preprocessing_stages('snapshot')]
+ALTERNATE_MISSING_STAGES = [
+    f'preprocess_missing_{method}_csv' for method in MISSING_METHODS
+    if method != PREPROCESSING_STEPS['missing_method']
+]
+# Tahap yang hasilnya tidak dipakai tahap lain, jadi boleh dilewati.
+# Melewati load_snapshot ikut melewati preprocessing jalur snapshot
+OPTIONAL_STAGES = [
+    'load_snapshot', *SNAPSHOT_STAGES, *ALTERNATE_MISSING_STAGES, 'compact_dtypes', 'profile', 'profile_stream',
+    'viz_correlation', 'viz_categorical', 'viz_numeric', 'viz_kde',
+]
+REQUIRES = {name: 'load_snapshot' for name in SNAPSHOT_STAGES}
+
+
+def _release_after():
+    default_method = PREPROCESSING_STEPS['missing_method']
+    release = {
+        # Frame CSV tidak dipakai lagi setelah frame snapshot dimuat
+        'load_snapshot': ('frame_csv',),
+        'predict': ('X_train', 'X_test', 'model'),
+    }
+    for load_path in LOAD_PATHS:
+        for method in MISSING_METHODS:
+            if method != default_method:
+                release[f'preprocess_missing_{method}_{load_path}'] = (f'after_missing_{method}_{load_path}',)
+        release[f'preprocess_duplicates_{load_path}'] = (f'after_missing_{default_method}_{load_path}',)
+    release['preprocess_encode_csv'] = ('after_duplicates_csv',)
+    release['preprocess_encode_snapshot'] = ('after_duplicates_snapshot', 'processed_snapshot')
+    return release
+
+
+# Hasil antara yang dilepas setelah tahap selesai agar memori tidak menumpuk
+RELEASE_AFTER = _release_after()
+
+
+def run_stage(fn, state, repeat, measure_memory=True):
+    """Jalankan tahap ``repeat`` kali untuk waktu tercepat, lalu sekali lagi untuk memori.
+
+    Run memori memakai ``tracemalloc`` dan tidak dihitung waktunya.
+    """
+    best_seconds, rows = None, None
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        rows = fn(state)
+        seconds = time.perf_counter() - started
+        best_seconds = seconds if best_seconds is None else min(best_seconds, seconds)
+    result = {
+        'seconds': best_seconds,
+        'peak_mb': None,
+        'retained_mb': None,
+        'rows': int(rows) if rows is not None else None,
+    }
+    if measure_memory:
+        gc.collect()
+        with TracedMemory() as memory:
+            fn(state)
+        result['peak_mb'] = memory.peak_bytes / 1024**2
+        result['retained_mb'] = memory.retained_bytes / 1024**2
+    return result
+
+
+def run_size(n_rows, forest_params, skip=(), repeat=1, seed=RANDOM_STATE, data_dir=DATA_DIR, measure_memory=True):
+    """Benchmark semua tahap untuk satu ukuran dataset; kembalikan list hasil per tahap."""
+    started = time.perf_counter()
+    path = get_dataset(n_rows, seed=seed, data_dir=data_dir)
+    print(f"[{n_rows:>11,}] dataset {path} ({os.path.getsize(path) / 1024**2:,.0f} MB, "
+          f"{time.perf_counter() - started:.1f} detik)", flush=True)
+
+    state = {'path': path, 'forest_params': forest_params}
+    results = []
+    for name, fn in STAGES:
+        if name in skip or REQUIRES.get(name) in skip:
+            continue
+        result = {'n_rows': n_rows, 'stage': name, **run_stage(fn, state, repeat, measure_memory)}
+        if name == 'predict':
+            result['test_accuracy'] = state['test_accuracy']
+        results.append(result)
+        for key in RELEASE_AFTER.get(name, ()):
+            state.pop(key, None)
+        memory = '' if result['peak_mb'] is None else f"  puncak {result['peak_mb']:,.0f} MB"
+        print(f"[{n_rows:>11,}] {name:<34} {result['seconds']:>9.3f} detik{memory}", flush=True)
+    return results
+
+
+def default_output_path(commit):
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    return os.path.join(RESULTS_DIR, f"bench_{(commit or 'nogit')[:10]}_{stamp}.json")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark tahap-tahap pipeline pada dataset sintetis")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help="Jumlah baris dataset sintetis")
+    parser.add_argument('--trees', type=int, default=20, help="n_estimators Random Forest")
+    parser.add_argument('--max-depth', type=int, default=20, help="max_depth Random Forest")
+    parser.add_argument('--max-samples', type=float, default=None,
+                        help="Fraksi bootstrap per tree (default: semua data training)")
+    parser.add_argument('--skip', nargs='+', default=[], choices=OPTIONAL_STAGES, metavar='STAGE',
+                        help="Tahap yang dilewati: " + ', '.join(OPTIONAL_STAGES))
+    parser.add_argument('--repeat', type=int, default=1, help="Ulangi setiap tahap, ambil waktu tercepat")
+    parser.add_argument('--no-memory', action='store_true',
+                        help="Lewati run tambahan dengan tracemalloc (benchmark sekitar 2x lebih cepat)")
+    parser.add_argument('--seed', type=int, default=RANDOM_STATE, help="Seed dataset sintetis")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="Folder dataset sintetis (dibuat sekali)")
+    parser.add_argument('--output', default=None, help="File JSON hasil (default: benchmarks/results/...)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    forest_params = {'n_estimators': args.trees, 'max_depth': args.max_depth, 'random_state': RANDOM_STATE}
+    if args.max_samples is not None:
+        forest_params['max_samples'] = args.max_samples
+
+    environment = environment_info()
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'environment': environment,
+        'params': {
+            'sizes': args.sizes,
+            'forest': forest_params,
+            'preprocessing': PREPROCESSING_STEPS,
+            'missing_methods': list(MISSING_METHODS),
+            'memory': None if args.no_memory else 'tracemalloc',
+            'test_size': TEST_SIZE,
+            'repeat': args.repeat,
+            'seed': args.seed,
+            'skip': args.skip,
+        },
+        'results': [],
+    }
+    output = args.output or default_output_path(environment['commit'])
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+
+    for n_rows in args.sizes:
+        report['results'].extend(
+            run_size(n_rows, forest_params, skip=set(args.skip), repeat=args.repeat,
+                     seed=args.seed, data_dir=args.data_dir, measure_memory=not args.no_memory)
+        )
+        # Tulis setelah setiap ukuran agar hasil parsial tetap ada jika ukuran besar gagal (mis. kehabisan RAM)
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+    print(f"Hasil ditulis ke {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
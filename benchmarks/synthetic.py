@@ -0,0 +1,93 @@
+"""Dataset sintetis dengan skema yang sama seperti ``student_depression_dataset.csv``.
+
+Setiap kolom diambil acak dari distribusi empirisnya di dataset asli,
+terpisah per kelas ``Depression``. Hubungan setiap kolom dengan target tetap
+ada (model masih belajar sesuatu), tetapi kombinasi antar kolom hampir
+selalu baru, sehingga langkah hapus duplikat tidak menciutkan data besar
+kembali ke ukuran dataset asli. Duplikat sungguhan disisipkan dengan rasio
+``duplicate_ratio``.
+
+Nilai ditulis persis seperti token mentah di CSV asli (mis. ``'5-6 hours'``
+dengan tanda kutip, ``?`` untuk missing), jadi loader dan preprocessing
+menjalani jalur kode yang sama. File ditulis per chunk agar memori tetap
+kecil untuk puluhan juta baris.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.data_loader import DEFAULT_DATASET_PATH
+
+TARGET_COL = 'Depression'
+ID_COL = 'id'
+
+DATA_DIR = os.path.join('benchmarks', 'data')
+CHUNK_ROWS = 500_000
+DEFAULT_DUPLICATE_RATIO = 0.01
+
+
+def _read_raw(base_path):
+    # Baca sebagai teks mentah agar setiap token ditulis ulang apa adanya
+    return pd.read_csv(base_path, dtype=str, keep_default_na=False)
+
+
+def _generate_chunk(raw, class_rows, class_probs, n_rows, first_id, duplicate_ratio, rng):
+    labels = rng.choice(len(class_probs), size=n_rows, p=class_probs)
+    chunk = {}
+    for col in raw.columns:
+        if col in (ID_COL, TARGET_COL):
+            continue
+        values = raw[col].to_numpy()
+        column = np.empty(n_rows, dtype=object)
+        for label, rows in enumerate(class_rows):
+            mask = labels == label
+            column[mask] = values[rng.choice(rows, size=int(mask.sum()))]
+        chunk[col] = column
+    chunk[TARGET_COL] = np.array(sorted(set(raw[TARGET_COL])), dtype=object)[labels]
+    df = pd.DataFrame(chunk, columns=[col for col in raw.columns if col != ID_COL])
+
+    n_duplicates = int(n_rows * duplicate_ratio)
+    if n_duplicates:
+        # Timpa sebagian baris dengan salinan baris lain di chunk yang sama
+        targets = rng.choice(n_rows, size=n_duplicates, replace=False)
+        sources = rng.choice(n_rows, size=n_duplicates)
+        df.iloc[targets] = df.iloc[sources].to_numpy()
+
+    df.insert(0, ID_COL, np.arange(first_id, first_id + n_rows))
+    return df[raw.columns]
+
+
+def generate_dataset(n_rows, path, base_path=DEFAULT_DATASET_PATH, duplicate_ratio=DEFAULT_DUPLICATE_RATIO,
+                     seed=42, chunk_rows=CHUNK_ROWS):
+    """Tulis CSV sintetis berisi ``n_rows`` baris ke ``path``."""
+    raw = _read_raw(base_path)
+    classes = sorted(set(raw[TARGET_COL]))
+    class_rows = [np.flatnonzero(raw[TARGET_COL].to_numpy() == label) for label in classes]
+    class_probs = np.array([len(rows) for rows in class_rows], dtype=float) / len(raw)
+    rng = np.random.default_rng(seed)
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    written = 0
+    with open(tmp_path, 'w', newline='') as f:
+        while written < n_rows:
+            size = min(chunk_rows, n_rows - written)
+            chunk = _generate_chunk(raw, class_rows, class_probs, size, written + 1, duplicate_ratio, rng)
+            chunk.to_csv(f, index=False, header=written == 0)
+            written += size
+    # File lengkap baru muncul setelah selesai ditulis, jadi tidak ada file setengah jadi
+    os.replace(tmp_path, path)
+    return path
+
+
+def dataset_path(n_rows, seed=42, data_dir=DATA_DIR):
+    return os.path.join(data_dir, f'synthetic_{n_rows}_seed{seed}.csv')
+
+
+def get_dataset(n_rows, seed=42, data_dir=DATA_DIR, base_path=DEFAULT_DATASET_PATH):
+    """Path CSV sintetis ``n_rows`` baris; dibuat sekali lalu dipakai ulang."""
+    path = dataset_path(n_rows, seed, data_dir)
+    if not os.path.exists(path):
+        generate_dataset(n_rows, path, base_path=base_path, seed=seed)
+    return path
@@ -1,6 +1,10 @@
 import streamlit as st
 import pandas as pd
 import os
+from utils.compaction import load_compact
+from utils.data_loader import load_csv, source_key, DEFAULT_DATASET_PATH, NA_VALUES
+from utils.dataset_store import get_store
+from utils.profiler import get_profile, profile_csv_stream
 
 st.set_page_config(page_title="Input Data", page_icon="📤", layout="wide")
 
@@ -29,6 +33,114 @@ st.info("""
 - Setelah upload, data akan disimpan di session state untuk digunakan di halaman lain
 """)
 
+def show_profile_summary(profile, preview):
+    """Tampilkan preview, statistik, dan informasi kolom dari hasil profiling."""
+    st.subheader("📊 Preview Dataset")
+    st.dataframe(preview, use_container_width=True)
+    
+    # Dataset statistics
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("Jumlah Baris", profile.n_rows)
+    with col2:
+        st.metric("Jumlah Kolom", profile.n_cols)
+    with col3:
+        st.metric("Missing Values", profile.total_missing)
+    with col4:
+        st.metric("Duplicate Rows", profile.n_duplicates, help="Dibandingkan pada semua kolom kecuali id")
+    
+    # Column info
+    st.subheader("ℹ️ Informasi Kolom")
+    col_info = pd.DataFrame({
+        'Nama Kolom': profile.columns,
+        'Tipe Data': profile.dtypes.values,
+        'Missing Values': profile.missing.values,
+        'Unique Values': [
+            f"≥{n:,}" if col in profile.nunique_capped else n
+            for col, n in profile.nunique.items()
+        ]
+    })
+    st.dataframe(col_info, use_container_width=True)
+    
+    # Check if Depression column exists
+    if 'Depression' in profile.columns:
+        st.success("✅ Kolom target 'Depression' ditemukan!")
+        
+        # Show depression distribution
+        depression_counts = profile.target_counts
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.metric("No Depression (0)", f"{depression_counts.get(0, 0):,}")
+        with col2:
+            st.metric("Depression (1)", f"{depression_counts.get(1, 0):,}")
+    else:
+        st.warning("⚠️ Kolom target 'Depression' tidak ditemukan! Pastikan dataset memiliki kolom ini.")
+    
+    # Statistical summary
+    with st.expander("📈 Statistik Deskriptif"):
+        st.dataframe(profile.numeric_summary, use_container_width=True)
+    
+    # Show data types
+    with st.expander("🔤 Kolom Kategorikal & Numerikal"):
+        categorical_cols = profile.categorical_cols
+        numerical_cols = profile.numerical_cols
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.write("**Kolom Kategorikal:**")
+            st.write(categorical_cols if categorical_cols else "Tidak ada")
+        with col2:
+            st.write("**Kolom Numerikal:**")
+            st.write(numerical_cols if numerical_cols else "Tidak ada")
+
+
+def apply_compaction(df, data_key):
+    """Kompres tipe data jika opsi dipilih, lalu tampilkan laporan memori."""
+    if not compact_mode:
+        return df, data_key
+    
+    df, data_key, report = load_compact(df, data_key)
+    total_before = report['bytes_before'].sum()
+    total_after = report['bytes_after'].sum()
+    
+    st.success(
+        f"🗜️ Tipe data dikompres: {total_before / 1024**2:.2f} MB → {total_after / 1024**2:.2f} MB "
+        f"(hemat {(1 - total_after / max(total_before, 1)) * 100:.1f}%)"
+    )
+    with st.expander("📉 Laporan Memori per Kolom"):
+        report_df = pd.DataFrame({
+            'Nama Kolom': report['column'],
+            'Tipe Sebelum': report['dtype_before'],
+            'Tipe Sesudah': report['dtype_after'],
+            'Memori Sebelum (KB)': (report['bytes_before'] / 1024).round(1),
+            'Memori Sesudah (KB)': (report['bytes_after'] / 1024).round(1),
+            'Hemat (%)': report['saving_pct'].round(1)
+        })
+        st.dataframe(report_df, use_container_width=True)
+    return df, data_key
+
+
+def save_to_session(df, data_key):
+    """Simpan dataset ke store session tanpa menyalin frame.
+    
+    Frame berasal dari cache bersama; halaman lain tidak mengubahnya in-place.
+    """
+    store = get_store(st.session_state)
+    store.put(df, data_key, description="Dataset input")
+    store.point('original', data_key)
+    store.point('current', data_key)
+    st.session_state['data_loaded'] = True
+
+
+# Opsi kompresi tipe data (berlaku untuk upload maupun dataset default)
+compact_mode = st.checkbox(
+    "🗜️ Kompres tipe data setelah load (hemat memori)",
+    help="Kolom teks dengan sedikit nilai unik diubah menjadi category, "
+         "kolom numerik di-downcast (mis. int8, float32). Halaman lain tetap bekerja seperti biasa."
+)
+
 # Tabs untuk pilihan input
 tab1, tab2 = st.tabs(["📁 Upload File CSV", "📂 Gunakan Dataset Default"])
 
@@ -41,75 +153,88 @@ with tab1:
         help="Format: CSV dengan delimiter koma (,)"
     )
     
-    if uploaded_file is not None:
+    streaming_mode = st.checkbox(
+        "⚡ Mode streaming (untuk file besar)",
+        help="File dibaca per chunk dan diprofiling dalam satu kali jalan. "
+             "Hanya sampel acak berukuran tetap yang disimpan untuk halaman lain."
+    )
+    
+    if streaming_mode:
+        col1, col2 = st.columns(2)
+        with col1:
+            chunksize = st.number_input(
+                "Ukuran chunk (baris)",
+                min_value=10_000,
+                max_value=1_000_000,
+                value=100_000,
+                step=10_000
+            )
+        with col2:
+            sample_size = st.number_input(
+                "Ukuran sampel untuk analisis (baris)",
+                min_value=10_000,
+                max_value=2_000_000,
+                value=200_000,
+                step=10_000,
+                help="Jumlah baris maksimal yang disimpan di memori untuk Preprocessing & Analysis"
+            )
+    
+    if uploaded_file is not None and streaming_mode:
         try:
-            # Read CSV dengan handling karakter '?' sebagai NA
-            df = pd.read_csv(uploaded_file, na_values=['?', 'NA', 'N/A', ''])
+            data_key = f"{source_key(uploaded_file, NA_VALUES)}:sample{sample_size}"
+            cached = st.session_state.get('stream_result')
             
-            st.success("✅ Dataset berhasil di-upload!")
+            if cached is not None and cached[0] == (data_key, chunksize):
+                profile, df = cached[1], cached[2]
+            else:
+                progress_bar = st.progress(0)
+                status_text = st.empty()
+                
+                def update_progress(fraction, n_rows):
+                    progress_bar.progress(fraction)
+                    status_text.text(f"Membaca data... {n_rows:,} baris diproses")
+                
+                profile, sample = profile_csv_stream(
+                    uploaded_file,
+                    chunksize=chunksize,
+                    na_values=NA_VALUES,
+                    sample_size=sample_size,
+                    progress_callback=update_progress
+                )
+                df = sample.reset_index(drop=True)
+                st.session_state['stream_result'] = ((data_key, chunksize), profile, df)
+                status_text.text(f"✅ Selesai: {profile.n_rows:,} baris diproses")
+            
+            st.success("✅ Dataset berhasil diprofiling secara streaming!")
+            df, data_key = apply_compaction(df, data_key)
+            if len(df) < profile.n_rows:
+                st.info(
+                    f"ℹ️ Sampel acak {len(df):,} dari {profile.n_rows:,} baris disimpan untuk halaman lain. "
+                    "Kuartil pada statistik deskriptif diestimasi dari sampel ini."
+                )
             
             # Save ke session state
-            st.session_state['df_original'] = df.copy()
-            st.session_state['df_current'] = df.copy()
-            st.session_state['data_loaded'] = True
+            save_to_session(df, data_key)
             
             # Display info
-            st.subheader("📊 Preview Dataset")
-            st.dataframe(df.head(10), use_container_width=True)
-            
-            # Dataset statistics
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                st.metric("Jumlah Baris", df.shape[0])
-            with col2:
-                st.metric("Jumlah Kolom", df.shape[1])
-            with col3:
-                st.metric("Missing Values", df.isnull().sum().sum())
-            with col4:
-                st.metric("Duplicate Rows", df.duplicated().sum())
-            
-            # Column info
-            st.subheader("ℹ️ Informasi Kolom")
-            col_info = pd.DataFrame({
-                'Nama Kolom': df.columns,
-                'Tipe Data': df.dtypes.astype(str).values,
-                'Missing Values': df.isnull().sum().values,
-                'Unique Values': [df[col].nunique() for col in df.columns]
-            })
-            st.dataframe(col_info, use_container_width=True)
+            show_profile_summary(profile, df.head(10))
+                    
+        except Exception as e:
+            st.error(f"❌ Terjadi kesalahan saat membaca file: {e}")
+    
+    elif uploaded_file is not None:
+        try:
+            # Read CSV dengan handling karakter '?' sebagai NA (cached per isi file)
+            df, data_key = load_csv(uploaded_file, na_values=NA_VALUES)
             
-            # Check if Depression column exists
-            if 'Depression' in df.columns:
-                st.success("✅ Kolom target 'Depression' ditemukan!")
-                
-                # Show depression distribution
-                depression_counts = df['Depression'].value_counts()
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.metric("No Depression (0)", f"{depression_counts.get(0, 0):,}")
-                with col2:
-                    st.metric("Depression (1)", f"{depression_counts.get(1, 0):,}")
-            else:
-                st.warning("⚠️ Kolom target 'Depression' tidak ditemukan! Pastikan dataset memiliki kolom ini.")
+            st.success("✅ Dataset berhasil di-upload!")
+            df, data_key = apply_compaction(df, data_key)
             
-            # Statistical summary
-            with st.expander("📈 Statistik Deskriptif"):
-                st.dataframe(df.describe(), use_container_width=True)
+            # Save ke session state
+            save_to_session(df, data_key)
             
-            # Show data types
-            with st.expander("🔤 Kolom Kategorikal & Numerikal"):
-                categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
-                numerical_cols = df.select_dtypes(include=['int64', 'float64']).columns.tolist()
-                
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.write("**Kolom Kategorikal:**")
-                    st.write(categorical_cols if categorical_cols else "Tidak ada")
-                with col2:
-                    st.write("**Kolom Numerikal:**")
-                    st.write(numerical_cols if numerical_cols else "Tidak ada")
+            # Display info
+            show_profile_summary(get_profile(df, data_key), df.head(10))
                     
         except Exception as e:
             st.error(f"❌ Terjadi kesalahan saat membaca file: {e}")
@@ -119,78 +244,24 @@ with tab2:
     st.subheader("Dataset Default")
     
     # Path to default dataset
-    default_path = "student_depression_dataset.csv"
+    default_path = DEFAULT_DATASET_PATH
     
     if os.path.exists(default_path):
         st.info(f"📂 Dataset default tersedia: `{default_path}`")
         
         if st.button("🔄 Load Dataset Default", type="primary"):
             try:
-                # Read default dataset
-                df = pd.read_csv(default_path, na_values=['?', 'NA', 'N/A', ''])
+                # Read default dataset (cached per isi file)
+                df, data_key = load_csv(default_path, na_values=NA_VALUES)
                 
                 st.success("✅ Dataset default berhasil di-load!")
+                df, data_key = apply_compaction(df, data_key)
                 
                 # Save to session state
-                st.session_state['df_original'] = df.copy()
-                st.session_state['df_current'] = df.copy()
-                st.session_state['data_loaded'] = True
+                save_to_session(df, data_key)
                 
                 # Display info
-                st.subheader("📊 Preview Dataset")
-                st.dataframe(df.head(10), use_container_width=True)
-                
-                # Dataset statistics
-                col1, col2, col3, col4 = st.columns(4)
-                
-                with col1:
-                    st.metric("Jumlah Baris", df.shape[0])
-                with col2:
-                    st.metric("Jumlah Kolom", df.shape[1])
-                with col3:
-                    st.metric("Missing Values", df.isnull().sum().sum())
-                with col4:
-                    st.metric("Duplicate Rows", df.duplicated().sum())
-                
-                # Column info
-                st.subheader("ℹ️ Informasi Kolom")
-                col_info = pd.DataFrame({
-                    'Nama Kolom': df.columns,
-                    'Tipe Data': df.dtypes.astype(str).values,
-                    'Missing Values': df.isnull().sum().values,
-                    'Unique Values': [df[col].nunique() for col in df.columns]
-                })
-                st.dataframe(col_info, use_container_width=True)
-                
-                # Check Depression column
-                if 'Depression' in df.columns:
-                    st.success("✅ Kolom target 'Depression' ditemukan!")
-                    
-                    # Show depression distribution
-                    depression_counts = df['Depression'].value_counts()
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.metric("No Depression (0)", f"{depression_counts.get(0, 0):,}")
-                    with col2:
-                        st.metric("Depression (1)", f"{depression_counts.get(1, 0):,}")
-                
-                # Statistical summary
-                with st.expander("📈 Statistik Deskriptif"):
-                    st.dataframe(df.describe(), use_container_width=True)
-                
-                # Show data types
-                with st.expander("🔤 Kolom Kategorikal & Numerikal"):
-                    categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
-                    numerical_cols = df.select_dtypes(include=['int64', 'float64']).columns.tolist()
-                    
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.write("**Kolom Kategorikal:**")
-                        st.write(categorical_cols if categorical_cols else "Tidak ada")
-                    with col2:
-                        st.write("**Kolom Numerikal:**")
-                        st.write(numerical_cols if numerical_cols else "Tidak ada")
+                show_profile_summary(get_profile(df, data_key), df.head(10))
                         
             except Exception as e:
                 st.error(f"❌ Terjadi kesalahan saat membaca file: {e}")
@@ -211,7 +282,7 @@ if 'data_loaded' in st.session_state and st.session_state['data_loaded']:
     """)
     
     if st.checkbox("Tampilkan data yang dimuat"):
-        df_current = st.session_state['df_current']
+        df_current = get_store(st.session_state).get('current')
         st.dataframe(df_current, use_container_width=True)
 else:
     st.warning("⚠️ Belum ada data yang dimuat. Silakan upload atau gunakan dataset default.")
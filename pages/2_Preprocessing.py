@@ -1,7 +1,10 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import LabelEncoder, StandardScaler
+from utils.dataset_store import get_store
+from utils.duplicates import default_key_columns, get_duplicate_index
+from utils.preprocessing import get_step_cache, run_pipeline_cached, save_pipeline, pipeline_to_bytes, PIPELINE_PATH
+from utils.profiler import get_profile
 
 st.set_page_config(page_title="Preprocessing", page_icon="🔧", layout="wide")
 
@@ -26,8 +29,13 @@ if 'data_loaded' not in st.session_state or not st.session_state['data_loaded']:
     st.error("❌ Data belum dimuat! Silakan upload dataset di menu **Input Data** terlebih dahulu.")
     st.stop()
 
-# Get data from session state
-df = st.session_state['df_current'].copy()
+# Get data from session state (referensi ke store, bukan salinan)
+store = get_store(st.session_state)
+df = store.get('current')
+current_key = store.key('current')
+
+# Statistik dataset dihitung sekali per versi data dan dipakai ulang setiap rerun
+profile = get_profile(df, current_key)
 
 st.info("""
 **Petunjuk:**
@@ -41,13 +49,13 @@ st.info("""
 st.subheader("📊 Data Sebelum Preprocessing")
 col1, col2, col3, col4 = st.columns(4)
 with col1:
-    st.metric("Jumlah Baris", df.shape[0])
+    st.metric("Jumlah Baris", profile.n_rows)
 with col2:
-    st.metric("Jumlah Kolom", df.shape[1])
+    st.metric("Jumlah Kolom", profile.n_cols)
 with col3:
-    st.metric("Missing Values", df.isnull().sum().sum())
+    st.metric("Missing Values", profile.total_missing)
 with col4:
-    st.metric("Duplicate Rows", df.duplicated().sum())
+    st.metric("Duplicate Rows", profile.n_duplicates, help="Dibandingkan pada semua kolom kecuali id")
 
 with st.expander("👁️ Lihat Data Awal"):
     st.dataframe(df.head(10), use_container_width=True)
@@ -71,6 +79,7 @@ if 'preprocessing_steps' not in st.session_state:
         'handle_missing': False,
         'missing_method': 'drop',
         'remove_duplicates': False,
+        'duplicate_subset': None,
         'encode_categorical': False
     }
 
@@ -78,11 +87,11 @@ if 'preprocessing_steps' not in st.session_state:
 with tab1:
     st.markdown("### 🔍 Deteksi Missing Values")
     
-    missing_info = df.isnull().sum()
+    missing_info = profile.missing
     missing_info = missing_info[missing_info > 0]
     
     if len(missing_info) > 0:
-        st.warning(f"⚠️ Ditemukan {df.isnull().sum().sum()} missing values di {len(missing_info)} kolom")
+        st.warning(f"⚠️ Ditemukan {profile.total_missing} missing values di {len(missing_info)} kolom")
         
         # Show missing values detail
         missing_df = pd.DataFrame({
@@ -128,15 +137,52 @@ with tab1:
 with tab2:
     st.markdown("### 🔍 Deteksi Duplicate Rows")
     
-    n_duplicates = df.duplicated().sum()
+    # Kolom kunci untuk membandingkan baris; id selalu unik sehingga
+    # dikecualikan secara default
+    default_keys = default_key_columns(df.columns)
+    # Widget memakai key tetap; default yang berubah tiap run membuat pilihan user hilang
+    saved_subset = st.session_state['preprocessing_steps'].get('duplicate_subset')
+    if not set(st.session_state.get('duplicate_key_columns', [])) <= set(df.columns):
+        del st.session_state['duplicate_key_columns']
+    st.session_state.setdefault(
+        'duplicate_key_columns', [col for col in (saved_subset or default_keys) if col in df.columns]
+    )
+    key_columns = st.multiselect(
+        "Kolom kunci untuk deteksi duplikat:",
+        df.columns.tolist(),
+        key='duplicate_key_columns',
+        help="Baris dianggap duplikat jika nilai semua kolom kunci sama"
+    )
+    if len(key_columns) == 0:
+        key_columns = default_keys
+    
+    # Index duplikat dari profile dipakai ulang jika kolom kuncinya sama
+    if profile.duplicate_index is not None and profile.duplicate_index.key_columns == key_columns:
+        duplicate_index = profile.duplicate_index
+    else:
+        duplicate_index = get_duplicate_index(df, current_key, key_columns)
+    n_duplicates = duplicate_index.n_duplicates
+    # Kolom kunci selalu disimpan, juga saat pilihan ini tidak menemukan duplikat
+    st.session_state['preprocessing_steps']['duplicate_subset'] = (
+        None if key_columns == default_keys else key_columns
+    )
     
     if n_duplicates > 0:
-        st.warning(f"⚠️ Ditemukan {n_duplicates} baris duplikat ({n_duplicates/len(df)*100:.2f}%)")
+        st.warning(
+            f"⚠️ Ditemukan {n_duplicates} baris duplikat ({n_duplicates/len(df)*100:.2f}%) "
+            f"dalam {duplicate_index.n_groups} grup"
+        )
         
         # Show duplicate rows
         if st.checkbox("Tampilkan baris duplikat"):
-            duplicate_rows = df[df.duplicated(keep=False)]
+            st.write("**Grup duplikat terbesar:**")
+            st.dataframe(duplicate_index.group_summary().head(20), use_container_width=True)
+            
+            duplicate_rows, group_ids = duplicate_index.take(df, max_rows=1000)
+            duplicate_rows = duplicate_rows.assign(Grup=group_ids)
             st.dataframe(duplicate_rows, use_container_width=True)
+            if len(duplicate_index.positions) > len(duplicate_rows):
+                st.caption(f"Menampilkan {len(duplicate_rows)} dari {len(duplicate_index.positions)} baris")
         
         # Option to remove duplicates
         remove_duplicates = st.checkbox(
@@ -148,6 +194,8 @@ with tab2:
         if remove_duplicates:
             st.info("✅ Baris duplikat akan dihapus")
     else:
+        # Tidak ada yang perlu dihapus untuk kolom kunci ini
+        st.session_state['preprocessing_steps']['remove_duplicates'] = False
         st.success("✅ Tidak ada baris duplikat dalam dataset!")
 
 # TAB 3: Encode Categorical Variables
@@ -155,7 +203,7 @@ with tab3:
     st.markdown("### 🔤 Encoding Categorical Variables")
     
     # Identify categorical columns
-    categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
+    categorical_cols = profile.categorical_cols
     
     if len(categorical_cols) > 0:
         st.info(f"📋 Ditemukan {len(categorical_cols)} kolom kategorikal: {', '.join(categorical_cols)}")
@@ -163,7 +211,7 @@ with tab3:
         # Show unique values for each categorical column
         with st.expander("👁️ Lihat Unique Values"):
             for col in categorical_cols:
-                st.write(f"**{col}:** {df[col].nunique()} unique values")
+                st.write(f"**{col}:** {profile.nunique[col]} unique values")
                 st.write(df[col].value_counts().head(10))
                 st.write("---")
         
@@ -177,6 +225,7 @@ with tab3:
         
         if encode_categorical:
             st.info("✅ Kolom kategorikal akan di-encode menggunakan Label Encoding")
+            st.caption("Kategori yang belum pernah dilihat (mis. kota baru pada data baru) akan diberi kode -1")
             st.success("⚡ Sleep Duration akan dikonversi ke angka (4, 5.5, 7.5, 9 jam)")
             st.success("⚡ Financial Stress sudah dalam bentuk angka (1-5), akan dibersihkan")
             st.warning("⚠️ Catatan: Kolom target 'Depression' tidak akan di-encode karena sudah numerik")
@@ -199,7 +248,8 @@ with tab4:
     
     if steps['remove_duplicates']:
         step_count += 1
-        st.success(f"✅ {step_count}. Remove duplicate rows")
+        subset_label = "semua kolom kecuali id" if steps.get('duplicate_subset') is None else ", ".join(steps['duplicate_subset'])
+        st.success(f"✅ {step_count}. Remove duplicate rows (kolom kunci: {subset_label})")
     
     if steps['encode_categorical']:
         step_count += 1
@@ -214,105 +264,43 @@ with tab4:
     if st.button("🚀 Jalankan Preprocessing", type="primary", disabled=(step_count == 0)):
         
         with st.spinner("⏳ Sedang memproses data..."):
-            df_processed = df.copy()
+            # Langkah terpilih dirangkai menjadi satu pipeline yang di-fit di sini
+            # dan bisa dipakai ulang untuk batch data baru tanpa fit ulang.
+            # Hasil tiap langkah di-cache, jadi hanya langkah yang berubah yang dijalankan ulang
+            step_labels = {
+                'missing': "Handling missing values...",
+                'duplicates': "Removing duplicates...",
+                'encode': "Encoding categorical variables..."
+            }
             
             progress_bar = st.progress(0)
             status_text = st.empty()
             
-            current_step = 0
-            total_steps = step_count
-            
-            # Step 1: Handle missing values
-            if steps['handle_missing']:
-                current_step += 1
+            def update_progress(current_step, total_steps, name, from_cache):
                 progress_bar.progress(current_step / total_steps)
-                status_text.text(f"Step {current_step}/{total_steps}: Handling missing values...")
-                
-                method = steps['missing_method']
-                
-                if method == 'drop':
-                    df_processed = df_processed.dropna()
-                elif method == 'mean':
-                    # Fill numeric with mean
-                    numeric_cols = df_processed.select_dtypes(include=['int64', 'float64']).columns
-                    df_processed[numeric_cols] = df_processed[numeric_cols].fillna(df_processed[numeric_cols].mean())
-                    # Fill categorical with mode
-                    cat_cols = df_processed.select_dtypes(include=['object']).columns
-                    for col in cat_cols:
-                        df_processed[col] = df_processed[col].fillna(df_processed[col].mode()[0] if len(df_processed[col].mode()) > 0 else 'Unknown')
-                elif method == 'median':
-                    # Fill numeric with median
-                    numeric_cols = df_processed.select_dtypes(include=['int64', 'float64']).columns
-                    df_processed[numeric_cols] = df_processed[numeric_cols].fillna(df_processed[numeric_cols].median())
-                    # Fill categorical with mode
-                    cat_cols = df_processed.select_dtypes(include=['object']).columns
-                    for col in cat_cols:
-                        df_processed[col] = df_processed[col].fillna(df_processed[col].mode()[0] if len(df_processed[col].mode()) > 0 else 'Unknown')
-                elif method == 'zero':
-                    df_processed = df_processed.fillna(0)
+                suffix = " (dari cache)" if from_cache else ""
+                status_text.text(f"Step {current_step}/{total_steps}: {step_labels[name]}{suffix}")
             
-            # Step 2: Remove duplicates
-            if steps['remove_duplicates']:
-                current_step += 1
-                progress_bar.progress(current_step / total_steps)
-                status_text.text(f"Step {current_step}/{total_steps}: Removing duplicates...")
-                
-                df_processed = df_processed.drop_duplicates()
+            df_processed, pipeline, processed_key, n_cached = run_pipeline_cached(
+                df,
+                current_key,
+                steps,
+                get_step_cache(st.session_state),
+                progress_callback=update_progress
+            )
             
-            # Step 3: Encode categorical
-            if steps['encode_categorical']:
-                current_step += 1
-                progress_bar.progress(current_step / total_steps)
-                status_text.text(f"Step {current_step}/{total_steps}: Encoding categorical variables...")
-                
-                # Feature Engineering: Convert Sleep Duration to numerical
-                if 'Sleep Duration' in df_processed.columns:
-                    sleep_mapping = {
-                        "Less than 5 hours": 4.0,
-                        "'Less than 5 hours'": 4.0,
-                        "5-6 hours": 5.5,
-                        "'5-6 hours'": 5.5,
-                        "7-8 hours": 7.5,
-                        "'7-8 hours'": 7.5,
-                        "More than 8 hours": 9.0,
-                        "'More than 8 hours'": 9.0,
-                        "Others": 6.0  # Default value
-                    }
-                    df_processed['Sleep Duration'] = df_processed['Sleep Duration'].map(sleep_mapping)
-                    # Fill any unmapped values with median
-                    if df_processed['Sleep Duration'].isnull().any():
-                        df_processed['Sleep Duration'] = df_processed['Sleep Duration'].fillna(6.0)
-                
-                # Financial Stress is already numerical (1.0-5.0), convert to integer
-                if 'Financial Stress' in df_processed.columns:
-                    # Convert to numeric, handling '?' as NaN
-                    df_processed['Financial Stress'] = pd.to_numeric(df_processed['Financial Stress'], errors='coerce')
-                    # Fill NaN with median (3.0)
-                    if df_processed['Financial Stress'].isnull().any():
-                        df_processed['Financial Stress'] = df_processed['Financial Stress'].fillna(3.0)
-                    # Convert to integer
-                    df_processed['Financial Stress'] = df_processed['Financial Stress'].astype(int)
-                
-                # Get remaining categorical columns (exclude Sleep Duration and Financial Stress)
-                categorical_cols = df_processed.select_dtypes(include=['object']).columns.tolist()
-                
-                # Save label encoders for later use
-                label_encoders = {}
-                
-                for col in categorical_cols:
-                    le = LabelEncoder()
-                    df_processed[col] = le.fit_transform(df_processed[col].astype(str))
-                    label_encoders[col] = le
-                
+            if 'encode' in pipeline.named_steps:
                 # Save encoders to session state
-                st.session_state['label_encoders'] = label_encoders
+                st.session_state['label_encoders'] = pipeline.named_steps['encode'].encoders_
             
             progress_bar.progress(1.0)
             status_text.text("✅ Preprocessing selesai!")
             
             # Save processed data
-            st.session_state['df_processed'] = df_processed.copy()
-            st.session_state['df_current'] = df_processed.copy()
+            store.put(df_processed, processed_key, parent_key=current_key, description="Hasil preprocessing")
+            store.point('processed', processed_key)
+            store.point('current', processed_key)
+            st.session_state['preprocessing_pipeline'] = pipeline
             st.session_state['preprocessing_done'] = True
             
             # Save to data folder
@@ -320,26 +308,46 @@ with tab4:
                 df_processed.to_csv('data/processed_dataset.csv', index=False)
             except:
                 pass
+            
+            # Save fitted pipeline to model folder
+            try:
+                save_pipeline(pipeline)
+            except OSError:
+                pass
         
         st.success("🎉 Preprocessing berhasil!")
+        if n_cached > 0:
+            st.info(f"♻️ {n_cached} dari {len(pipeline.steps)} langkah memakai hasil dari cache")
         
         # Show results
         st.markdown("### 📊 Hasil Preprocessing")
         
+        processed_profile = get_profile(df_processed, processed_key)
+        
         col1, col2, col3, col4 = st.columns(4)
         with col1:
-            st.metric("Jumlah Baris", df_processed.shape[0], delta=df_processed.shape[0] - df.shape[0])
+            st.metric("Jumlah Baris", processed_profile.n_rows, delta=processed_profile.n_rows - profile.n_rows)
         with col2:
-            st.metric("Jumlah Kolom", df_processed.shape[1])
+            st.metric("Jumlah Kolom", processed_profile.n_cols)
         with col3:
-            st.metric("Missing Values", df_processed.isnull().sum().sum())
+            st.metric("Missing Values", processed_profile.total_missing)
         with col4:
-            st.metric("Duplicate Rows", df_processed.duplicated().sum())
+            st.metric("Duplicate Rows", processed_profile.n_duplicates, help="Dibandingkan pada semua kolom kecuali id")
         
         # Show processed data
         st.subheader("👁️ Preview Data Setelah Preprocessing")
         st.dataframe(df_processed.head(10), use_container_width=True)
         
+        # Fitted pipeline
+        st.subheader("🧩 Pipeline Preprocessing")
+        st.write(" → ".join(name for name, _ in pipeline.steps))
+        st.caption(f"Pipeline yang sudah di-fit disimpan di `{PIPELINE_PATH}` dan bisa diterapkan ke data baru tanpa fit ulang.")
+        st.download_button(
+            "💾 Download Pipeline (.joblib)",
+            data=pipeline_to_bytes(pipeline),
+            file_name="preprocessing_pipeline.joblib"
+        )
+        
         st.info("""
         **Langkah Selanjutnya:**
         - Lanjut ke menu **📈 Analysis** untuk training model Random Forest
@@ -352,14 +360,15 @@ if 'preprocessing_done' in st.session_state and st.session_state['preprocessing_
     st.success("✅ Data sudah diproses sebelumnya!")
     
     if st.checkbox("Tampilkan data hasil preprocessing"):
-        df_proc = st.session_state['df_processed']
+        df_proc = store.get('processed')
         st.dataframe(df_proc, use_container_width=True)
+        proc_profile = get_profile(df_proc, store.key('processed'))
         
         # Stats
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("Baris", df_proc.shape[0])
+            st.metric("Baris", proc_profile.n_rows)
         with col2:
-            st.metric("Kolom", df_proc.shape[1])
+            st.metric("Kolom", proc_profile.n_cols)
         with col3:
-            st.metric("Missing", df_proc.isnull().sum().sum())
+            st.metric("Missing", proc_profile.total_missing)
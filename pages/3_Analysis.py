@@ -4,9 +4,25 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
-import joblib
+import os
+import time
+from utils.batch_scoring import default_workers
+from utils.cross_validation import cross_validate_forest
+from utils.data_loader import derive_key
+from utils.dataset_store import get_store
+from utils.feature_ranking import DEFAULT_SAMPLE_SIZE as RANKING_SAMPLE_SIZE, RANKING_METHODS
+from utils.feature_ranking import cache_ranking, get_cached_ranking, rank_features, select_top_features
+from utils.forest_eval import is_supported
+from utils.importance import DEFAULT_REPEATS, DEFAULT_SAMPLE_SIZE, cache_importance, get_cached_importance
+from utils.importance import compute_attributions, compute_permutation_importance, summarize_attributions
+from utils.model_registry import headline_accuracy, list_models, load_model, make_model_id, prune_registry
+from utils.model_registry import load_flat_forest, register_model
+from utils.predictor import build_feature_schema
+from utils.training import ENGINE_HGB, ENGINE_LABELS, ENGINE_RF, FIT_GROW, FIT_REUSE, FIT_TRIM
+from utils.training import compare_engines, forest_config_key
+from utils.training_cache import TrainingResult, get_training_cache
+from utils.training_jobs import JOB_CANCELLED, JOB_DONE, get_job, submit_training_job
+from utils.tuning import grid_candidates, random_candidates, successive_halving
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -35,7 +51,9 @@ if 'preprocessing_done' not in st.session_state or not st.session_state['preproc
     st.stop()
 
 # Get preprocessed data
-df = st.session_state['df_processed'].copy()
+store = get_store(st.session_state)
+df = store.get('processed')
+processed_key = store.key('processed')
 
 st.info("""
 **Petunjuk:**
@@ -92,10 +110,113 @@ selection_method = st.radio(
 if selection_method == "Gunakan semua features":
     selected_features = all_columns
 else:
+    with st.expander("📊 Ranking Features (Mutual Information, Chi-Square, RFE)"):
+        st.caption(
+            "Ranking dihitung tanpa training model penuh, pada subsampel berstrata. "
+            "Gunakan ranking untuk mengisi pilihan features di bawah."
+        )
+        rcol1, rcol2, rcol3 = st.columns(3)
+        with rcol1:
+            ranking_samples = st.number_input(
+                "Ukuran subsampel",
+                min_value=1000,
+                max_value=max(len(df), 1000),
+                value=min(RANKING_SAMPLE_SIZE, max(len(df), 1000)),
+                step=1000,
+                key='ranking_samples',
+                help="Subsampel berstrata; lama perhitungan sebanding dengan ukurannya"
+            )
+        with rcol2:
+            ranking_workers = st.number_input(
+                "Jumlah worker",
+                min_value=1,
+                max_value=max(os.cpu_count() or 1, 1),
+                value=default_workers(),
+                key='ranking_workers',
+                help="Fold RFE dijalankan paralel"
+            )
+        with rcol3:
+            with_rfe = st.checkbox(
+                "Recursive Feature Elimination",
+                value=True,
+                help="Forest kecil di-fit ulang untuk setiap jumlah feature; paling lambat dari ketiga metode"
+            )
+
+        # Ranking selalu memakai semua kolom dan random_state tetap, jadi hanya bergantung pada versi data
+        ranking_key = derive_key(
+            processed_key,
+            features=tuple(all_columns),
+            n_samples=int(ranking_samples),
+            with_rfe=with_rfe
+        )
+        ranking_result = get_cached_ranking(ranking_key)
+        session_ranking = st.session_state.get('feature_ranking')
+        if ranking_result is None and session_ranking is not None and session_ranking['key'] == ranking_key:
+            ranking_result = session_ranking['result']
+
+        if ranking_result is None and st.button("📊 Hitung Ranking"):
+            started = time.perf_counter()
+            with st.spinner("⏳ Menghitung ranking features..."):
+                ranking, rfe_curve = rank_features(
+                    df[all_columns], df['Depression'],
+                    n_samples=int(ranking_samples),
+                    with_rfe=with_rfe,
+                    n_workers=int(ranking_workers)
+                )
+            ranking_result = cache_ranking(ranking_key, {
+                'ranking': ranking,
+                'rfe_curve': rfe_curve,
+                'seconds': time.perf_counter() - started,
+            })
+            st.session_state['feature_ranking'] = {'key': ranking_key, 'result': ranking_result}
+
+        if ranking_result is not None:
+            st.caption(f"⏱️ Dihitung dalam {ranking_result['seconds']:.1f} detik")
+            st.dataframe(ranking_result['ranking'], use_container_width=True, hide_index=True)
+
+            rfe_curve = ranking_result['rfe_curve']
+            if rfe_curve is not None:
+                fig, ax = plt.subplots(figsize=(10, 4))
+                ax.errorbar(
+                    rfe_curve['Jumlah Features'], rfe_curve['CV Accuracy'] * 100,
+                    yerr=rfe_curve['Std'] * 100, marker='o', color='#667eea', capsize=3
+                )
+                ax.set_xlabel('Jumlah Features')
+                ax.set_ylabel('CV Accuracy (%)')
+                ax.set_title('Accuracy vs Jumlah Features (RFE)')
+                ax.grid(alpha=0.3)
+                plt.tight_layout()
+                st.pyplot(fig)
+
+            available_methods = [method for method in RANKING_METHODS if method != 'rfe' or rfe_curve is not None]
+            kcol1, kcol2 = st.columns(2)
+            with kcol1:
+                ranking_method = st.selectbox(
+                    "Urutkan berdasarkan:",
+                    available_methods,
+                    format_func=RANKING_METHODS.get
+                )
+            with kcol2:
+                top_k = st.number_input("Jumlah features (k)", min_value=1, max_value=len(all_columns),
+                                        value=min(10, len(all_columns)))
+
+            def use_top_features(ranking, method, k):
+                st.session_state['manual_features'] = select_top_features(ranking, method, k)
+
+            st.button(
+                f"✅ Gunakan Top {int(top_k)} Features",
+                on_click=use_top_features,
+                args=(ranking_result['ranking'], ranking_method, int(top_k))
+            )
+
+    # Pilihan disimpan di session state agar bisa diisi dari ranking di atas
+    if not set(st.session_state.get('manual_features', [])) <= set(all_columns):
+        del st.session_state['manual_features']
+    st.session_state.setdefault('manual_features', all_columns)
     selected_features = st.multiselect(
         "Pilih features untuk training:",
         all_columns,
-        default=all_columns
+        key='manual_features'
     )
 
 if len(selected_features) == 0:
@@ -110,7 +231,20 @@ with st.expander("📋 Daftar Features Terpilih"):
 st.write("---")
 
 # Model Parameters
-st.subheader("⚙️ Parameter Model Random Forest")
+st.subheader("⚙️ Parameter Model")
+
+engine = st.selectbox(
+    "Engine model:",
+    list(ENGINE_LABELS),
+    format_func=ENGINE_LABELS.get,
+    help="Histogram Gradient Boosting: training lebih cepat dan ukuran model jauh lebih kecil pada data besar"
+)
+use_rf = engine == ENGINE_RF
+
+# Nilai default slider disimpan di session state agar bisa diisi dari hasil Hyperparameter Search
+st.session_state.setdefault('rf_n_estimators', 100)
+st.session_state.setdefault('rf_max_depth', 20)
+st.session_state.setdefault('rf_min_samples_split', 2)
 
 col1, col2, col3 = st.columns(3)
 
@@ -119,9 +253,9 @@ with col1:
         "Number of Trees (n_estimators)",
         min_value=10,
         max_value=200,
-        value=100,
         step=10,
-        help="Jumlah decision tree dalam forest"
+        help="Jumlah decision tree dalam forest (Gradient Boosting: jumlah iterasi boosting)",
+        key='rf_n_estimators'
     )
 
 with col2:
@@ -129,9 +263,9 @@ with col2:
         "Max Depth",
         min_value=5,
         max_value=50,
-        value=20,
         step=5,
-        help="Kedalaman maksimum setiap tree"
+        help="Kedalaman maksimum setiap tree",
+        key='rf_max_depth'
     )
 
 with col3:
@@ -144,7 +278,7 @@ with col3:
         help="Persentase data untuk testing"
     )
 
-col4, col5 = st.columns(2)
+col4, col5, col6 = st.columns(3)
 
 with col4:
     random_state = st.number_input(
@@ -160,110 +294,474 @@ with col5:
         "Min Samples Split",
         min_value=2,
         max_value=20,
-        value=2,
-        help="Minimum samples required to split a node"
+        help="Minimum samples required to split a node",
+        key='rf_min_samples_split',
+        disabled=not use_rf
     )
 
-st.write("---")
+with col6:
+    learning_rate = st.slider(
+        "Learning Rate",
+        min_value=0.01,
+        max_value=0.5,
+        value=0.1,
+        step=0.01,
+        help="Kontribusi setiap tree baru (hanya Gradient Boosting)",
+        disabled=use_rf
+    )
 
-# Train Model Button
-st.subheader("🚀 Training Model")
+col7, _, _ = st.columns(3)
+
+with col7:
+    bootstrap_percent = st.slider(
+        "Bootstrap Sample per Tree (%)",
+        min_value=10,
+        max_value=100,
+        value=100,
+        step=5,
+        help="Persentase data training yang diambil (bootstrap) untuk setiap tree. Lebih kecil: training lebih "
+             "cepat dan hemat memori pada data besar. Hanya untuk Random Forest.",
+        disabled=not use_rf
+    )
+
+evaluation_mode = st.radio(
+    "Mode evaluasi:",
+    ["Train/Test Split", "Out-of-Bag (OOB)"],
+    horizontal=True,
+    help="OOB: setiap sampel training dinilai hanya oleh tree yang tidak memakainya (di luar bootstrap), "
+         "sehingga prediksi ulang seluruh data training tidak diperlukan. Hanya untuk Random Forest.",
+    disabled=not use_rf
+)
+use_oob = use_rf and evaluation_mode == "Out-of-Bag (OOB)"
+oob_without_test = False
+if use_oob:
+    oob_without_test = st.checkbox(
+        "Gunakan semua data untuk training (tanpa test set)",
+        help="Evaluasi sepenuhnya memakai estimasi OOB; Test Size diabaikan"
+    )
 
-if st.button("🎯 Mulai Training Model", type="primary"):
+# Hyperparameter Search
+def use_best_params(params):
+    # Dipanggil sebagai callback agar nilai slider bisa diubah sebelum slider dibuat ulang
+    st.session_state['rf_n_estimators'] = int(params['n_estimators'])
+    st.session_state['rf_max_depth'] = int(params['max_depth'])
+    st.session_state['rf_min_samples_split'] = int(params['min_samples_split'])
+
+# Key pencarian: versi data, fitur, dan split train/test yang sama dengan training
+search_key = derive_key(
+    processed_key,
+    features=tuple(selected_features),
+    test_size=test_size,
+    split_random_state=int(random_state)
+)
+
+with st.expander("🔍 Hyperparameter Search Random Forest (Successive Halving)"):
+    st.caption(
+        "Kandidat parameter dievaluasi dengan cross-validation pada data training. "
+        "Setiap ronde hanya sepertiga kandidat terbaik yang lanjut dengan data 3x lebih banyak. "
+        "Hasil setiap evaluasi di-cache sehingga tidak pernah di-training ulang."
+    )
     
-    with st.spinner("⏳ Training model... Mohon tunggu..."):
-        
-        # Prepare data
-        X = df[selected_features]
-        y = df['Depression']
-        
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, 
-            test_size=test_size/100, 
-            random_state=random_state,
-            stratify=y
+    scol1, scol2, scol3, scol4 = st.columns(4)
+    with scol1:
+        search_mode = st.radio("Mode pencarian:", ["Grid", "Random"])
+    with scol2:
+        n_candidates = st.number_input(
+            "Jumlah kandidat (random)",
+            min_value=3,
+            max_value=200,
+            value=27,
+            disabled=(search_mode == "Grid")
         )
-        
-        # Training info
-        st.info(f"""
-        **Data Split:**
-        - Training set: {len(X_train)} samples ({100-test_size}%)
-        - Test set: {len(X_test)} samples ({test_size}%)
-        """)
-        
-        # Create progress bar
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
-        # Initialize model
-        status_text.text("Initializing Random Forest model...")
-        progress_bar.progress(0.2)
-        
-        model = RandomForestClassifier(
-            n_estimators=n_estimators,
-            max_depth=max_depth,
-            min_samples_split=min_samples_split,
+    with scol3:
+        cv_folds = st.number_input("CV Folds", min_value=2, max_value=10, value=3)
+    with scol4:
+        search_workers = st.number_input(
+            "Jumlah worker process",
+            min_value=1,
+            max_value=max(os.cpu_count() or 1, 1),
+            value=default_workers()
+        )
+    
+    if st.button("🔍 Mulai Pencarian"):
+        X_search, _, y_search, _ = train_test_split(
+            df[selected_features], df['Depression'],
+            test_size=test_size/100,
             random_state=random_state,
-            n_jobs=-1
+            stratify=df['Depression']
         )
+        if search_mode == "Grid":
+            candidates = grid_candidates()
+        else:
+            candidates = random_candidates(int(n_candidates), random_state=int(random_state))
         
-        # Train model
-        status_text.text("Training model...")
-        progress_bar.progress(0.4)
-        
-        model.fit(X_train, y_train)
-        
-        # Predict
-        status_text.text("Making predictions...")
-        progress_bar.progress(0.6)
-        
-        y_pred_train = model.predict(X_train)
-        y_pred_test = model.predict(X_test)
-        
-        # Calculate metrics
-        status_text.text("Calculating metrics...")
-        progress_bar.progress(0.8)
+        search_progress = st.progress(0)
+        search_status = st.empty()
         
-        train_accuracy = accuracy_score(y_train, y_pred_train)
-        test_accuracy = accuracy_score(y_test, y_pred_test)
+        def update_search_progress(done, total, round_number, n_rounds):
+            search_progress.progress(done / total)
+            search_status.text(f"Ronde {round_number}/{n_rounds}: {done}/{total} evaluasi")
         
-        # Confusion matrix
-        cm = confusion_matrix(y_test, y_pred_test)
-        
-        # Classification report
-        report = classification_report(y_test, y_pred_test, output_dict=True)
-        
-        # Feature importance
-        feature_importance = pd.DataFrame({
-            'Feature': selected_features,
-            'Importance': model.feature_importances_
-        }).sort_values('Importance', ascending=False)
-        
-        progress_bar.progress(1.0)
-        status_text.text("✅ Training selesai!")
+        leaderboard = successive_halving(
+            X_search, y_search, candidates, search_key,
+            cv=int(cv_folds),
+            random_state=int(random_state),
+            n_workers=int(search_workers),
+            progress_callback=update_search_progress
+        )
+        search_status.text(
+            f"✅ Pencarian selesai: {len(candidates)} kandidat, "
+            f"{int(leaderboard['from_cache'].sum())} hasil dari cache"
+        )
+        st.session_state['search_results'] = {'key': search_key, 'leaderboard': leaderboard}
+    
+    search_results = st.session_state.get('search_results')
+    if search_results is not None and search_results['key'] == search_key:
+        leaderboard = search_results['leaderboard']
+        st.write("**🏆 Leaderboard:**")
+        st.dataframe(
+            leaderboard.rename(columns={
+                'round': 'Ronde',
+                'n_samples': 'Jumlah Sampel',
+                'mean_score': 'CV Accuracy',
+                'std_score': 'Std',
+                'from_cache': 'Dari Cache'
+            }).head(20),
+            use_container_width=True
+        )
+        best = leaderboard.iloc[0]
+        st.success(
+            f"Terbaik: n_estimators={int(best['n_estimators'])}, max_depth={int(best['max_depth'])}, "
+            f"min_samples_split={int(best['min_samples_split'])} "
+            f"(CV accuracy {best['mean_score']*100:.2f}%)"
+        )
+        st.button(
+            "✅ Gunakan Parameter Terbaik",
+            on_click=use_best_params,
+            args=(best[['n_estimators', 'max_depth', 'min_samples_split']].to_dict(),)
+        )
+
+# Cross-Validation: mean & spread metrik dari beberapa fold, bukan satu split saja
+cv_params = {
+    'n_estimators': n_estimators,
+    'max_depth': max_depth,
+    'min_samples_split': min_samples_split,
+    'random_state': int(random_state),
+}
+if bootstrap_percent < 100:
+    cv_params['max_samples'] = bootstrap_percent / 100
+
+with st.expander("📐 Cross-Validation Random Forest (Stratified K-Fold)"):
+    st.caption(
+        "Parameter Random Forest di atas dievaluasi pada k fold dari seluruh data. "
+        "Fold di-fit paralel di beberapa process; jumlah thread per forest dibagi dari jumlah core "
+        "agar core tidak dipakai berlebihan."
+    )
+    
+    ccol1, ccol2 = st.columns(2)
+    with ccol1:
+        cv_splits = st.number_input("Jumlah fold (k)", min_value=2, max_value=10, value=5)
+    with ccol2:
+        cv_workers = st.number_input(
+            "Jumlah worker process",
+            min_value=1,
+            max_value=max(os.cpu_count() or 1, 1),
+            value=max(os.cpu_count() or 1, 1),
+            key='cv_workers'
+        )
+    
+    cv_key = derive_key(processed_key, features=tuple(selected_features), n_splits=int(cv_splits), **cv_params)
+    
+    if st.button("📐 Jalankan Cross-Validation"):
+        cv_progress = st.progress(0)
+        cv_status = st.empty()
         
-        # Save model and results to session state
-        st.session_state['model'] = model
-        st.session_state['X_train'] = X_train
-        st.session_state['X_test'] = X_test
-        st.session_state['y_train'] = y_train
-        st.session_state['y_test'] = y_test
-        st.session_state['y_pred_test'] = y_pred_test
-        st.session_state['train_accuracy'] = train_accuracy
-        st.session_state['test_accuracy'] = test_accuracy
-        st.session_state['confusion_matrix'] = cm
-        st.session_state['classification_report'] = report
-        st.session_state['feature_importance'] = feature_importance
-        st.session_state['model_trained'] = True
+        def update_cv_progress(done, total):
+            cv_progress.progress(done / total)
+            cv_status.text(f"{done}/{total} fold selesai")
         
-        # Save model to file
-        try:
-            joblib.dump(model, 'model/random_forest_model.pkl')
-        except:
-            pass
+        fold_results, cv_summary = cross_validate_forest(
+            df[selected_features], df['Depression'], cv_params,
+            n_splits=int(cv_splits),
+            random_state=int(random_state),
+            n_workers=int(cv_workers),
+            progress_callback=update_cv_progress
+        )
+        cv_status.text(
+            f"✅ {int(cv_splits)} fold selesai dalam {cv_summary['wall_seconds']:.1f} detik "
+            f"({cv_summary['n_workers']} process × {cv_summary['n_jobs']} thread; "
+            f"total waktu fit semua fold {cv_summary['fit_seconds']:.1f} detik)"
+        )
+        st.session_state['cv_results'] = {'key': cv_key, 'folds': fold_results, 'summary': cv_summary}
+    
+    cv_results = st.session_state.get('cv_results')
+    if cv_results is not None and cv_results['key'] == cv_key:
+        cv_metrics = cv_results['summary']['metrics']
+        mcol1, mcol2, mcol3 = st.columns(3)
+        for metric_col, (name, label) in zip(
+            (mcol1, mcol2, mcol3),
+            [('accuracy', 'Accuracy'), ('precision', 'Precision'), ('recall', 'Recall')]
+        ):
+            with metric_col:
+                st.metric(
+                    f"{label} (mean ± std)",
+                    f"{cv_metrics.loc[name, 'mean']*100:.2f}% ± {cv_metrics.loc[name, 'std']*100:.2f}%"
+                )
+        st.dataframe(
+            cv_results['folds'].rename(columns={'fold': 'Fold', 'fit_seconds': 'Waktu Fit (detik)'}),
+            use_container_width=True
+        )
+
+# Perbandingan engine pada data dan split yang sama
+with st.expander("⚖️ Bandingkan Engine (Random Forest vs Gradient Boosting)"):
+    st.caption(
+        "Kedua engine di-training dengan parameter di atas pada split train/test yang sama, "
+        "lalu dibandingkan waktu fit, waktu predict data test, ukuran model, dan accuracy."
+    )
+    engine_params = {
+        ENGINE_RF: {
+            'n_estimators': n_estimators,
+            'max_depth': max_depth,
+            'min_samples_split': min_samples_split,
+            'random_state': int(random_state),
+        },
+        ENGINE_HGB: {
+            'n_estimators': n_estimators,
+            'max_depth': max_depth,
+            'learning_rate': learning_rate,
+            'random_state': int(random_state),
+        },
+    }
+    comparison_key = derive_key(
+        processed_key,
+        features=tuple(selected_features),
+        test_size=test_size,
+        rf_params=tuple(sorted(engine_params[ENGINE_RF].items())),
+        hgb_params=tuple(sorted(engine_params[ENGINE_HGB].items()))
+    )
+    
+    if st.button("⚖️ Jalankan Perbandingan"):
+        with st.spinner("⏳ Training kedua engine..."):
+            engine_comparison = compare_engines(
+                df[selected_features], df['Depression'], engine_params,
+                test_size=test_size,
+                random_state=int(random_state)
+            )
+        st.session_state['engine_comparison'] = {'key': comparison_key, 'table': engine_comparison}
+    
+    engine_comparison = st.session_state.get('engine_comparison')
+    if engine_comparison is not None and engine_comparison['key'] == comparison_key:
+        st.dataframe(
+            engine_comparison['table'].style.format({
+                'Fit (detik)': "{:.2f}",
+                'Predict (detik)': "{:.3f}",
+                'Ukuran Model (MB)': "{:.2f}",
+                'Test Accuracy': "{:.2%}",
+            }),
+            use_container_width=True
+        )
+
+st.write("---")
+
+# Train Model Button
+st.subheader("🚀 Training Model")
+
+# Jeda antar pengecekan status job training di background (detik)
+JOB_POLL_SECONDS = 0.5
+
+def save_result_to_session(result, config_key):
+    st.session_state['model'] = result.model
+    st.session_state['model_config_key'] = config_key
+    st.session_state['train_index'] = result.train_index
+    st.session_state['test_index'] = result.test_index
+    st.session_state['y_pred_test'] = result.y_pred_test
+    st.session_state['train_accuracy'] = result.metrics.get('train_accuracy')
+    st.session_state['test_accuracy'] = result.metrics.get('test_accuracy')
+    st.session_state['oob_accuracy'] = result.metrics.get('oob_accuracy')
+    st.session_state['confusion_matrix'] = result.confusion_matrix
+    st.session_state['classification_report'] = result.classification_report
+    st.session_state['feature_importance'] = result.feature_importance
+    st.session_state['model_trained'] = True
+
+def store_result(result, info):
+    """Masukkan hasil ke cache dan registry; kembalikan ``(model_id, error)``.
+    
+    Dipanggil juga dari thread job training, jadi tidak boleh memanggil ``st``.
+    """
+    get_training_cache().put(info['cache_key'], result)
+    # Hasil yang sudah ada di registry tidak perlu ditulis ulang
+    if info['cache_key'] in {meta['model_id'] for meta in list_models()}:
+        return info['cache_key'], None
+    try:
+        model_id = register_model(
+            result.model,
+            info['features'],
+            params=info['params'],
+            metrics=result.metrics,
+            data_key=info['data_key'],
+            encoders=info['encoders'],
+            pipeline=info['pipeline'],
+            evaluation=result.evaluation,
+            feature_schema=info['feature_schema'],
+            extras=result.extras,
+        )
+        prune_registry(keep=(model_id,))
+        return model_id, None
+    except OSError as e:
+        return None, str(e)
+
+def store_job_result(job, result):
+    job.info['model_id'], job.info['registry_error'] = store_result(result, job.info)
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def show_job_progress(job_id):
+    # Hanya panel ini yang diperbarui berkala, bukan seluruh halaman
+    job = get_job(job_id)
+    if job is None or job.finished:
+        # Jalankan ulang seluruh halaman sekali untuk menampilkan hasil; polling berhenti
+        st.rerun()
+    st.progress(job.progress)
+    st.text(f"⏳ {job.stage} ({job.elapsed:.0f} detik)")
+    if st.button("⛔ Batalkan Training"):
+        job.cancel()
+
+# Job training yang masih berjalan tetap tersambung setelah rerun atau pindah halaman
+training_job = get_job(st.session_state.get('training_job_id'))
+job_running = training_job is not None and not training_job.finished
+finished_run = None
+
+if st.button("🎯 Mulai Training Model", type="primary", disabled=job_running):
+    model_params = {
+        'n_estimators': n_estimators,
+        'max_depth': max_depth,
+        'random_state': int(random_state),
+    }
+    if use_rf:
+        model_params['min_samples_split'] = min_samples_split
+        if bootstrap_percent < 100:
+            model_params['max_samples'] = bootstrap_percent / 100
+    else:
+        model_params.update(engine=engine, learning_rate=learning_rate)
+    if use_oob:
+        model_params['oob_score'] = True
+    training_params = {**model_params, 'test_size': 0 if oob_without_test else test_size}
+    
+    # Simpan model ke registry beserta encoder, pipeline, dan hasil evaluasi
+    pipeline = st.session_state.get('preprocessing_pipeline')
+    encoders = None
+    if pipeline is not None and 'encode' in pipeline.named_steps:
+        encoders = pipeline.named_steps['encode'].encoders_
+    training_info = {
+        'cache_key': make_model_id(processed_key, selected_features, training_params),
+        'config_key': forest_config_key(processed_key, selected_features, training_params),
+        'data_key': processed_key,
+        'features': list(selected_features),
+        'params': training_params,
+        'test_size': training_params['test_size'],
+        'encoders': encoders,
+        'pipeline': pipeline,
+        'feature_schema': build_feature_schema(df, selected_features, encoders),
+    }
+    
+    # Konfigurasi yang sama persis (data, fitur, parameter) tidak di-training ulang
+    result = get_training_cache().get(training_info['cache_key'])
+    if result is not None:
+        training_info['model_id'], training_info['registry_error'] = store_result(result, training_info)
+        finished_run = {
+            'result': result,
+            'info': training_info,
+            'from_cache': True,
+            'fit_mode': None,
+            'n_trees_fitted': 0,
+        }
+    else:
+        # Forest sebelumnya dipakai ulang jika hanya jumlah tree yang berubah
+        base_model = None
+        if st.session_state.get('model_config_key') == training_info['config_key']:
+            base_model = st.session_state.get('model')
+        training_job = submit_training_job(
+            df[selected_features], df['Depression'], selected_features,
+            model_params, training_params['test_size'],
+            base_model=base_model,
+            info=training_info,
+            on_done=store_job_result
+        )
+        st.session_state['training_job_id'] = training_job.job_id
+
+if training_job is not None and not training_job.finished:
+    show_job_progress(training_job.job_id)
+elif training_job is not None:
+    del st.session_state['training_job_id']
+    if training_job.status == JOB_DONE:
+        finished_run = {
+            'result': training_job.result,
+            'info': training_job.info,
+            'from_cache': False,
+            'fit_mode': training_job.fit_mode,
+            'n_trees_fitted': training_job.n_trees_fitted,
+        }
+    elif training_job.status == JOB_CANCELLED:
+        st.warning("⛔ Training dibatalkan")
+    else:
+        st.error(f"❌ Training gagal: {training_job.error}")
+
+if finished_run is not None:
+    result = finished_run['result']
+    training_info = finished_run['info']
+    save_result_to_session(result, training_info['config_key'])
+    model_id = training_info.get('model_id')
+    st.session_state['model_id'] = model_id
+    if training_info.get('registry_error'):
+        st.warning(f"⚠️ Model tidak bisa disimpan ke registry: {training_info['registry_error']}")
+    
+    train_accuracy = result.metrics.get('train_accuracy')
+    test_accuracy = result.metrics.get('test_accuracy')
+    oob_accuracy = result.metrics.get('oob_accuracy')
+    cm = result.confusion_matrix
+    report = result.classification_report
+    feature_importance = result.feature_importance
+    
+    # Training info
+    if result.train_index is not None and result.test_index is None:
+        st.info(f"""
+        **Data Split:**
+        - Training set: {len(result.train_index)} samples (100%)
+        - Tanpa test set: evaluasi memakai estimasi out-of-bag
+        """)
+    elif result.train_index is not None:
+        st.info(f"""
+        **Data Split:**
+        - Training set: {len(result.train_index)} samples ({100-training_info['test_size']}%)
+        - Test set: {len(result.test_index)} samples ({training_info['test_size']}%)
+        """)
     
     st.success("🎉 Model berhasil di-training!")
+    if finished_run['from_cache']:
+        st.info("⚡ Konfigurasi ini sudah pernah di-training: model dan hasil evaluasi diambil dari cache")
+    elif finished_run['fit_mode'] == FIT_GROW:
+        n_trees_fitted = finished_run['n_trees_fitted']
+        st.info(f"🌱 Model sebelumnya dipakai ulang: hanya {n_trees_fitted} tree baru yang di-training")
+    elif finished_run['fit_mode'] == FIT_TRIM:
+        n_trees = training_info['params']['n_estimators']
+        st.info(f"✂️ Forest sebelumnya dipangkas menjadi {n_trees} tree tanpa training ulang")
+    elif finished_run['fit_mode'] == FIT_REUSE:
+        st.info("♻️ Konfigurasi sama dengan forest sebelumnya, tidak ada training ulang")
+    if model_id is not None:
+        st.caption(f"📦 Tersimpan di registry dengan ID `{model_id}`")
+    peak_fit_mb = result.metrics.get('peak_fit_mb')
+    if peak_fit_mb is not None:
+        st.caption(
+            f"🧠 Puncak alokasi memori selama fit: {peak_fit_mb:,.1f} MB "
+            "(tracemalloc: alokasi Python/NumPy, tanpa node tree sklearn)"
+        )
+    matrix_mb = result.metrics.get('train_matrix_mb')
+    if matrix_mb is not None:
+        frame_mb = result.metrics['train_frame_mb']
+        if matrix_mb < frame_mb:
+            size_text = f"{matrix_mb:,.1f} MB sebagai matriks float32, DataFrame asli {frame_mb:,.1f} MB"
+        else:
+            size_text = f"{matrix_mb:,.1f} MB"
+        st.caption(f"📐 Ukuran data feature training (nbytes): {size_text}")
     
     st.write("---")
     
@@ -273,20 +771,32 @@ if st.button("🎯 Mulai Training Model", type="primary"):
     # Accuracy metrics
     col1, col2, col3, col4 = st.columns(4)
     
+    # Mode OOB: akurasi OOB menggantikan akurasi training (prediksi data training dilewati)
+    reference_accuracy = oob_accuracy if oob_accuracy is not None else train_accuracy
     with col1:
-        st.metric(
-            "Training Accuracy",
-            f"{train_accuracy*100:.2f}%",
-            help="Akurasi pada data training"
-        )
+        if oob_accuracy is not None:
+            st.metric(
+                "OOB Accuracy",
+                f"{oob_accuracy*100:.2f}%",
+                help="Akurasi out-of-bag: setiap sampel training diprediksi hanya oleh tree yang tidak memakainya"
+            )
+        else:
+            st.metric(
+                "Training Accuracy",
+                f"{train_accuracy*100:.2f}%",
+                help="Akurasi pada data training"
+            )
     
     with col2:
-        st.metric(
-            "Test Accuracy",
-            f"{test_accuracy*100:.2f}%",
-            delta=f"{(test_accuracy - train_accuracy)*100:.2f}%",
-            help="Akurasi pada data testing"
-        )
+        if test_accuracy is None:
+            st.metric("Test Accuracy", "-", help="Semua data dipakai untuk training")
+        else:
+            st.metric(
+                "Test Accuracy",
+                f"{test_accuracy*100:.2f}%",
+                delta=f"{(test_accuracy - reference_accuracy)*100:.2f}%",
+                help="Akurasi pada data testing"
+            )
     
     with col3:
         st.metric(
@@ -303,7 +813,7 @@ if st.button("🎯 Mulai Training Model", type="primary"):
         )
     
     # Confusion Matrix
-    st.subheader("🔲 Confusion Matrix")
+    st.subheader("🔲 Confusion Matrix (Out-of-Bag)" if oob_accuracy is not None else "🔲 Confusion Matrix")
     
     fig, ax = plt.subplots(figsize=(8, 6))
     sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', ax=ax,
@@ -371,9 +881,15 @@ elif 'model_trained' in st.session_state and st.session_state['model_trained']:
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Training Accuracy", f"{st.session_state['train_accuracy']*100:.2f}%")
+        if st.session_state.get('oob_accuracy') is not None:
+            st.metric("OOB Accuracy", f"{st.session_state['oob_accuracy']*100:.2f}%")
+        else:
+            st.metric("Training Accuracy", f"{st.session_state['train_accuracy']*100:.2f}%")
     with col2:
-        st.metric("Test Accuracy", f"{st.session_state['test_accuracy']*100:.2f}%")
+        if st.session_state.get('test_accuracy') is not None:
+            st.metric("Test Accuracy", f"{st.session_state['test_accuracy']*100:.2f}%")
+        else:
+            st.metric("Test Accuracy", "-")
     with col3:
         report = st.session_state['classification_report']
         st.metric("Precision", f"{report['weighted avg']['precision']*100:.2f}%")
@@ -413,3 +929,171 @@ elif 'model_trained' in st.session_state and st.session_state['model_trained']:
     if st.button("🔄 Train Ulang Model"):
         st.session_state['model_trained'] = False
         st.rerun()
+
+# Permutation Importance: tidak bias ke feature dengan banyak kategori (City, Profession)
+if st.session_state.get('model_trained'):
+    st.write("---")
+    st.subheader("🔀 Permutation Importance")
+    st.caption(
+        "Turunnya accuracy saat nilai satu feature diacak. Berbeda dengan impurity importance, "
+        "hasilnya tidak bias ke feature hasil label encoding yang punya banyak kategori seperti City dan Profession."
+    )
+    
+    trained_model = st.session_state['model']
+    model_features = list(getattr(trained_model, 'feature_names_in_', selected_features))
+    # Evaluasi di data test; model tanpa test set (mode OOB) memakai data training
+    eval_index = st.session_state.get('test_index')
+    if eval_index is None:
+        eval_index = st.session_state.get('train_index')
+    eval_rows = df.index if eval_index is None else df.index.intersection(eval_index)
+    
+    if not set(model_features) <= set(df.columns) or len(eval_rows) == 0:
+        st.info("ℹ️ Data hasil preprocessing saat ini tidak cocok dengan model, silakan training ulang")
+    else:
+        icol1, icol2, icol3, icol4 = st.columns(4)
+        with icol1:
+            importance_samples = st.number_input(
+                "Ukuran subsampel",
+                min_value=500,
+                max_value=max(len(eval_rows), 500),
+                value=min(DEFAULT_SAMPLE_SIZE, max(len(eval_rows), 500)),
+                step=500,
+                help="Subsampel berstrata; lama perhitungan sebanding dengan ukurannya"
+            )
+        with icol2:
+            importance_repeats = st.number_input("Jumlah pengacakan", min_value=1, max_value=20, value=DEFAULT_REPEATS)
+        with icol3:
+            importance_workers = st.number_input(
+                "Jumlah worker",
+                min_value=1,
+                max_value=max(os.cpu_count() or 1, 1),
+                value=default_workers(),
+                key='importance_workers'
+            )
+        with icol4:
+            with_attributions = st.checkbox(
+                "Atribusi per baris (SHAP-style)",
+                help="Kontribusi setiap feature terhadap probabilitas Depression untuk setiap baris"
+            )
+        
+        model_id = st.session_state.get('model_id')
+        importance_key = derive_key(
+            model_id or st.session_state.get('model_config_key', ''),
+            n_samples=int(importance_samples),
+            n_repeats=int(importance_repeats),
+            random_state=int(random_state),
+            n_rows=len(eval_rows),
+            attributions=with_attributions
+        )
+        # Cache proses hanya untuk model di registry (ID unik per model)
+        importance = get_cached_importance(importance_key) if model_id else None
+        session_importance = st.session_state.get('importance_results')
+        if importance is None and session_importance is not None and session_importance['key'] == importance_key:
+            importance = session_importance['result']
+        
+        if importance is None and st.button("🔀 Hitung Importance"):
+            X_eval = df.loc[eval_rows, model_features]
+            y_eval = df.loc[eval_rows, 'Depression']
+            started = time.perf_counter()
+            with st.spinner("⏳ Menghitung permutation importance..."):
+                importance = {
+                    'permutation': compute_permutation_importance(
+                        trained_model, X_eval, y_eval,
+                        n_samples=int(importance_samples),
+                        n_repeats=int(importance_repeats),
+                        n_workers=int(importance_workers),
+                        random_state=int(random_state)
+                    ),
+                    'bias': None,
+                    'attributions': None,
+                }
+                if with_attributions and is_supported(trained_model):
+                    forest = load_flat_forest(model_id) if model_id else None
+                    importance['bias'], importance['attributions'] = compute_attributions(
+                        trained_model, X_eval, forest=forest, random_state=int(random_state)
+                    )
+            importance['seconds'] = time.perf_counter() - started
+            if model_id:
+                cache_importance(importance_key, importance)
+            st.session_state['importance_results'] = {'key': importance_key, 'result': importance}
+        
+        if importance is not None:
+            st.caption(f"⏱️ Dihitung dalam {importance['seconds']:.1f} detik")
+            permutation_df = importance['permutation']
+            
+            fig, ax = plt.subplots(figsize=(10, 8))
+            top_n = min(15, len(permutation_df))
+            top_features = permutation_df.head(top_n)
+            ax.barh(range(top_n), top_features['Importance'], xerr=top_features['Std'], color='#764ba2')
+            ax.set_yticks(range(top_n))
+            ax.set_yticklabels(top_features['Feature'])
+            ax.set_xlabel('Penurunan Accuracy')
+            ax.set_title(f'Top {top_n} Permutation Importance')
+            ax.invert_yaxis()
+            plt.tight_layout()
+            st.pyplot(fig)
+            
+            if hasattr(trained_model, 'feature_importances_'):
+                with st.expander("📊 Bandingkan dengan Impurity Importance"):
+                    impurity = pd.Series(trained_model.feature_importances_, index=model_features, name='Impurity')
+                    comparison = permutation_df.rename(columns={'Importance': 'Permutation'}).set_index('Feature')
+                    comparison = comparison.join(impurity)
+                    comparison['Rank Permutation'] = comparison['Permutation'].rank(ascending=False).astype(int)
+                    comparison['Rank Impurity'] = comparison['Impurity'].rank(ascending=False).astype(int)
+                    st.dataframe(comparison, use_container_width=True)
+            
+            if importance['attributions'] is not None:
+                st.subheader("🧩 Atribusi per Baris")
+                attributions = importance['attributions']
+                st.caption(
+                    f"Probabilitas Depression = {importance['bias']:.3f} (rata-rata) + jumlah atribusi semua feature. "
+                    f"Dihitung untuk {len(attributions):,} baris."
+                )
+                summary = summarize_attributions(attributions)
+                fig, ax = plt.subplots(figsize=(10, 8))
+                top_n = min(15, len(summary))
+                top_features = summary.head(top_n)
+                ax.barh(range(top_n), top_features['Mean |Attribution|'])
+                ax.set_yticks(range(top_n))
+                ax.set_yticklabels(top_features['Feature'])
+                ax.set_xlabel('Rata-rata |Atribusi|')
+                ax.set_title(f'Top {top_n} Features (Atribusi per Baris)')
+                ax.invert_yaxis()
+                plt.tight_layout()
+                st.pyplot(fig)
+                with st.expander("📋 Lihat Atribusi per Baris"):
+                    st.dataframe(attributions.head(100).style.format("{:+.3f}"), use_container_width=True)
+
+# Model Registry: pakai model yang sudah pernah di-training tanpa training ulang
+registered_models = list_models()
+if registered_models:
+    st.write("---")
+    st.subheader("📦 Model Registry")
+    
+    registry_df = pd.DataFrame([
+        {
+            'ID': meta['model_id'],
+            'Dibuat': meta['created_at'],
+            'Engine': ENGINE_LABELS.get(meta['params'].get('engine', ENGINE_RF)),
+            'Features': len(meta['features']),
+            'Trees': meta['params'].get('n_estimators'),
+            'Accuracy (%)': round(headline_accuracy(meta['metrics']) * 100, 2),
+            'Data Sama': "✅" if meta['data_key'] == processed_key else "❌",
+        }
+        for meta in registered_models
+    ])
+    st.dataframe(registry_df, use_container_width=True)
+    
+    selected_id = st.selectbox("Pilih model:", registry_df['ID'].tolist())
+    selected_meta = registered_models[registry_df['ID'].tolist().index(selected_id)]
+    if selected_meta['data_key'] != processed_key:
+        st.warning("⚠️ Model ini di-training pada versi data yang berbeda dari hasil preprocessing saat ini")
+    
+    if st.button("📂 Muat Model"):
+        registered = load_model(selected_id)
+        save_result_to_session(
+            TrainingResult.from_registered(registered),
+            forest_config_key(registered.meta['data_key'], registered.features, registered.meta['params'])
+        )
+        st.session_state['model_id'] = registered.model_id
+        st.rerun()
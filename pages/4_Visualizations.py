@@ -5,6 +5,8 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import plotly.express as px
 import plotly.graph_objects as go
+from utils.dataset_store import get_store
+from utils.profiler import get_profile
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -27,12 +29,14 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Check if data is available
-if 'df_original' not in st.session_state or st.session_state['df_original'] is None:
+store = get_store(st.session_state)
+if store.get('original') is None:
     st.error("❌ Data belum dimuat! Silakan upload dataset di menu **Input Data** terlebih dahulu.")
     st.stop()
 
 # Get data (use original before preprocessing for better visualization)
-df = st.session_state['df_original'].copy()
+df = store.get('original')
+profile = get_profile(df, store.key('original'))
 
 st.info("""
 **Petunjuk:**
@@ -46,14 +50,14 @@ st.info("""
 st.subheader("📊 Dataset Overview")
 col1, col2, col3, col4 = st.columns(4)
 with col1:
-    st.metric("Total Samples", df.shape[0])
+    st.metric("Total Samples", profile.n_rows)
 with col2:
-    st.metric("Total Features", df.shape[1])
+    st.metric("Total Features", profile.n_cols)
 with col3:
-    st.metric("Missing Values", df.isnull().sum().sum())
+    st.metric("Missing Values", profile.total_missing)
 with col4:
     if 'Depression' in df.columns:
-        st.metric("Depression Cases", df['Depression'].sum())
+        st.metric("Depression Cases", profile.target_counts.get(1, 0))
 
 st.write("---")
 
@@ -70,7 +74,7 @@ with tab1:
     st.subheader("📊 Distribusi Target: Depression")
     
     if 'Depression' in df.columns:
-        depression_counts = df['Depression'].value_counts()
+        depression_counts = profile.target_counts
         
         # Create columns for layout
         col1, col2 = st.columns(2)
@@ -122,7 +126,7 @@ with tab2:
     st.subheader("🔥 Correlation Heatmap")
     
     # Get numerical columns only
-    numerical_df = df.select_dtypes(include=['int64', 'float64'])
+    numerical_df = df.select_dtypes(include=['number'])
     
     if len(numerical_df.columns) > 1:
         # Calculate correlation
@@ -164,7 +168,7 @@ with tab3:
     st.subheader("📦 Box Plots - Deteksi Outliers")
     
     # Get numerical columns
-    numerical_cols = df.select_dtypes(include=['int64', 'float64']).columns.tolist()
+    numerical_cols = df.select_dtypes(include=['number']).columns.tolist()
     
     # Remove ID columns
     numerical_cols = [col for col in numerical_cols if col.lower() not in ['id', 'index']]
@@ -227,8 +231,8 @@ with tab4:
     st.subheader("📈 Distribusi Features")
     
     # Categorical features distribution
-    categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
-    numerical_cols = df.select_dtypes(include=['int64', 'float64']).columns.tolist()
+    categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
+    numerical_cols = df.select_dtypes(include=['number']).columns.tolist()
     numerical_cols = [col for col in numerical_cols if col.lower() not in ['id', 'index']]
     
     # Categorical distributions
@@ -330,7 +334,7 @@ with tab4:
         # Statistics
         st.markdown("### 📊 Statistik Deskriptif")
         
-        stats = df[selected_num].describe()
+        stats = profile.numeric_summary[selected_num]
         
         col1, col2, col3, col4, col5 = st.columns(5)
         
@@ -0,0 +1,250 @@
+import streamlit as st
+import pandas as pd
+import os
+from utils.batch_scoring import DEFAULT_CHUNKSIZE, cleanup_outputs, default_workers, new_output_path, score_csv
+from utils.dataset_store import get_store
+from utils.forest_eval import benchmark
+from utils.model_registry import headline_accuracy, list_models, load_model
+from utils.predictor import get_predictor
+
+st.set_page_config(page_title="Prediction", page_icon="🔮", layout="wide")
+
+# Header
+st.markdown("""
+    <div style="
+        background: linear-gradient(90deg, #667eea, #764ba2);
+        padding: 15px;
+        border-radius: 15px;
+        text-align: center;
+        color: white;
+        margin-bottom: 20px;">
+        <h2 style="margin: 0;">🔮 Prediction</h2>
+        <p style="font-size:16px; margin:5px 0 0 0;">
+           Prediksi Depression dengan Model yang Sudah Di-training
+        </p>
+    </div>
+""", unsafe_allow_html=True)
+
+
+# Model diambil dari registry, jadi halaman ini tetap bisa dipakai setelah server restart
+registered_models = list_models()
+if not registered_models:
+    st.error("❌ Belum ada model yang tersimpan! Silakan lakukan training di menu **Analysis** terlebih dahulu.")
+    st.info("Langkah-langkah: **Input Data** → **Preprocessing** → **Analysis** → **Prediction**")
+    st.stop()
+
+st.info("""
+**Petunjuk:**
+- Pilih model dari registry (default: model terakhir yang di-training di session ini)
+- Isi form untuk memprediksi satu mahasiswa, atau
+- Upload file CSV survei baru dengan kolom yang sama seperti dataset training
+- Preprocessing yang sama dengan saat training (Sleep Duration, Financial Stress, encoding) diterapkan otomatis
+- Hasil prediksi dan probabilitas bisa di-download sebagai CSV
+""")
+
+# Model selection
+st.subheader("🤖 Pilih Model")
+
+model_ids = [meta['model_id'] for meta in registered_models]
+session_model_id = st.session_state.get('model_id')
+default_index = model_ids.index(session_model_id) if session_model_id in model_ids else 0
+
+selected_id = st.selectbox(
+    "Model:",
+    model_ids,
+    index=default_index,
+    format_func=lambda model_id: (
+        f"{model_id} — Accuracy "
+        f"{headline_accuracy(registered_models[model_ids.index(model_id)]['metrics'])*100:.2f}%"
+    )
+)
+registered = load_model(selected_id)
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.metric("Features", len(registered.features))
+with col2:
+    st.metric("Trees", registered.meta['params'].get('n_estimators'))
+with col3:
+    st.metric(
+        "Accuracy",
+        f"{headline_accuracy(registered.metrics)*100:.2f}%",
+        help="Test accuracy, atau akurasi out-of-bag untuk model tanpa test set"
+    )
+
+with st.expander("📋 Daftar Features Model"):
+    st.write(registered.features)
+
+st.write("---")
+
+# Single student prediction
+st.subheader("👤 Prediksi Satu Mahasiswa")
+
+# Predictor (model + lookup encoder) dibuat sekali per proses dan dipakai semua session
+predictor = get_predictor(selected_id)
+defaults = predictor.default_values()
+
+with st.form("single_prediction"):
+    values = {}
+    form_cols = st.columns(3)
+    for i, col in enumerate(predictor.features):
+        spec = predictor.schema.get(col, {})
+        with form_cols[i % 3]:
+            if spec.get('type') == 'category':
+                values[col] = st.selectbox(col, spec['options'])
+            elif spec.get('integer'):
+                values[col] = st.number_input(
+                    col,
+                    min_value=int(spec['min']),
+                    max_value=int(spec['max']),
+                    value=int(round(spec['default']))
+                )
+            elif 'min' in spec:
+                values[col] = st.number_input(
+                    col,
+                    min_value=float(spec['min']),
+                    max_value=float(spec['max']),
+                    value=float(spec['default'])
+                )
+            else:
+                values[col] = st.number_input(col, value=float(defaults[col]))
+    submitted = st.form_submit_button("🔮 Prediksi", type="primary")
+
+if submitted:
+    prediction, probability = predictor.predict(values)
+    if prediction == 1:
+        st.error(f"⚠️ Prediksi: **Depression** (probabilitas {probability*100:.1f}%)")
+    else:
+        st.success(f"✅ Prediksi: **No Depression** (probabilitas depression {probability*100:.1f}%)")
+
+# Latency: diukur dari encoding input sampai probabilitas keluar
+col1, col2 = st.columns([3, 1])
+with col2:
+    if st.button("⏱️ Ukur Latency (200x)"):
+        for _ in range(200):
+            predictor.predict(values)
+
+stats = predictor.latency_stats()
+with col1:
+    lat1, lat2, lat3 = st.columns(3)
+    with lat1:
+        st.metric("Jumlah Prediksi", stats['count'])
+    with lat2:
+        st.metric("Latency p50", "-" if stats['p50_ms'] is None else f"{stats['p50_ms']:.2f} ms")
+    with lat3:
+        st.metric("Latency p99", "-" if stats['p99_ms'] is None else f"{stats['p99_ms']:.2f} ms")
+
+# Benchmark evaluator forest yang diratakan vs model.predict sklearn
+processed = get_store(st.session_state).get('processed')
+if predictor.forest is not None and processed is not None and set(predictor.features) <= set(processed.columns):
+    with st.expander("⚡ Benchmark Evaluator (Flat Forest vs sklearn)"):
+        st.caption(
+            "Forest diekspor ke array NumPy dan dievaluasi untuk semua tree sekaligus. "
+            "Unggul untuk batch kecil; untuk batch besar sklearn tetap lebih cepat."
+        )
+        if st.button("▶️ Jalankan Benchmark"):
+            with st.spinner("⏳ Mengukur..."):
+                benchmark_df = benchmark(predictor.forest, predictor.model, processed[predictor.features])
+            st.dataframe(
+                benchmark_df.style.format({'sklearn_ms': "{:.2f}", 'flat_ms': "{:.2f}", 'speedup': "{:.1f}x"}),
+                use_container_width=True
+            )
+
+st.write("---")
+
+# Batch Scoring
+st.subheader("📂 Batch Scoring")
+
+uploaded_file = st.file_uploader(
+    "Pilih file CSV yang akan diprediksi:",
+    type=["csv"],
+    help="Kolom target 'Depression' tidak wajib ada"
+)
+
+col1, col2 = st.columns(2)
+with col1:
+    chunksize = st.number_input(
+        "Baris per chunk",
+        min_value=1_000,
+        max_value=1_000_000,
+        value=DEFAULT_CHUNKSIZE,
+        step=1_000,
+        help="File dibaca dan diprediksi per chunk agar memori tetap kecil"
+    )
+with col2:
+    n_workers = st.number_input(
+        "Jumlah worker process",
+        min_value=1,
+        max_value=max(os.cpu_count() or 1, 1),
+        value=default_workers(),
+        help="Chunk diprediksi paralel oleh beberapa process"
+    )
+
+if uploaded_file is not None and st.button("🚀 Jalankan Scoring", type="primary"):
+    progress_text = st.empty()
+
+    def update_progress(n_rows):
+        progress_text.text(f"⏳ {n_rows:,} baris sudah diprediksi...")
+
+    # File hasil sebelumnya milik session ini diganti; file lama session lain dibersihkan
+    previous_output = st.session_state.pop('batch_scoring_output', None)
+    st.session_state.pop('batch_scoring_summary', None)
+    if previous_output is not None and os.path.exists(previous_output):
+        os.remove(previous_output)
+    cleanup_outputs()
+    output_path = new_output_path()
+
+    try:
+        with st.spinner("⏳ Sedang memprediksi data..."):
+            summary = score_csv(
+                uploaded_file,
+                registered,
+                output_path,
+                chunksize=int(chunksize),
+                n_workers=int(n_workers),
+                progress_callback=update_progress
+            )
+    except Exception as e:
+        # Apa pun penyebabnya (kolom hilang, encoding, worker crash), file output tidak boleh tertinggal
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        if isinstance(e, ValueError):
+            st.error(f"❌ Scoring gagal: {e}")
+        else:
+            st.error(f"❌ Scoring gagal ({type(e).__name__}): {e}")
+        st.stop()
+
+    progress_text.empty()
+    st.session_state['batch_scoring_summary'] = summary
+    st.session_state['batch_scoring_output'] = output_path
+
+output_path = st.session_state.get('batch_scoring_output')
+if output_path is not None and os.path.exists(output_path):
+    summary = st.session_state['batch_scoring_summary']
+    st.success("🎉 Scoring selesai!")
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Jumlah Baris", f"{summary['rows']:,}")
+    with col2:
+        st.metric(
+            "Berhasil Diprediksi",
+            f"{summary['scored']:,}",
+            help="Baris dengan nilai kosong yang tidak bisa diisi diberi prediksi -1"
+        )
+    with col3:
+        positive_pct = summary['positive'] / summary['scored'] * 100 if summary['scored'] else 0
+        st.metric("Prediksi Depression", f"{positive_pct:.1f}%")
+    with col4:
+        st.metric("Throughput", f"{summary['rows_per_second']:,.0f} baris/detik")
+
+    st.subheader("👁️ Preview Hasil Prediksi")
+    st.dataframe(pd.read_csv(output_path, nrows=10), use_container_width=True)
+
+    with open(output_path, 'rb') as f:
+        st.download_button(
+            label="📥 Download Hasil Prediksi (CSV)",
+            data=f,
+            file_name="predictions.csv",
+            mime="text/csv"
+        )
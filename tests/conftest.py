@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modul di-import sebagai ``utils.*`` dari root project, sama seperti halaman Streamlit
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
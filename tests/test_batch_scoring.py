@@ -0,0 +1,29 @@
+import os
+import time
+
+from utils.batch_scoring import cleanup_outputs, new_output_path
+
+
+def test_each_run_gets_its_own_output_file(tmp_path):
+    first = new_output_path(str(tmp_path))
+    second = new_output_path(str(tmp_path))
+    assert first != second
+    assert os.path.exists(first) and os.path.exists(second)
+
+
+def test_cleanup_removes_only_old_outputs(tmp_path):
+    old = new_output_path(str(tmp_path))
+    kept_old = new_output_path(str(tmp_path))
+    recent = new_output_path(str(tmp_path))
+    other = tmp_path / 'processed_dataset.csv'
+    other.write_text('id\n1\n')
+    two_days_ago = time.time() - 48 * 3600
+    for path in (old, kept_old, str(other)):
+        os.utime(path, (two_days_ago, two_days_ago))
+
+    cleanup_outputs(max_age_hours=24, directory=str(tmp_path), keep=(kept_old,))
+
+    assert not os.path.exists(old)
+    assert os.path.exists(kept_old)
+    assert os.path.exists(recent)
+    assert other.exists()
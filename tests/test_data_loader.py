@@ -0,0 +1,32 @@
+import io
+
+from utils.data_loader import clear_cache, load_csv, source_key
+
+CSV = b'id,Age,City\n1,20,Jakarta\n2,?,Bandung\n3,22,Jakarta\n'
+
+
+class UploadedCsv(io.BytesIO):
+    """Mirip UploadedFile Streamlit, tetapi gagal jika seluruh isi disalin."""
+
+    def getvalue(self):
+        raise AssertionError("upload tidak boleh disalin utuh lewat getvalue()")
+
+
+def test_upload_is_hashed_from_file_object(tmp_path):
+    path = tmp_path / 'data.csv'
+    path.write_bytes(CSV)
+    upload = UploadedCsv(CSV)
+    upload.seek(10)
+
+    assert source_key(upload) == source_key(str(path)) == source_key(CSV)
+    assert upload.tell() == 0
+
+
+def test_upload_is_parsed_without_getvalue():
+    clear_cache()
+    df, key = load_csv(UploadedCsv(CSV))
+    cached, cached_key = load_csv(UploadedCsv(CSV))
+
+    assert key == cached_key
+    assert cached is df
+    assert df['Age'].isna().sum() == 1
@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+
+from utils.memory import TracedMemory
+
+
+def test_traced_memory_records_peak_of_block():
+    with TracedMemory() as memory:
+        block = np.ones(1024 * 1024)
+        del block
+    assert memory.peak_bytes >= 8 * 1024 * 1024
+    assert memory.retained_bytes < memory.peak_bytes
+
+
+def test_optional_measurement_is_skipped_while_tracing():
+    with TracedMemory():
+        with TracedMemory(optional=True) as inner:
+            np.ones(1024)
+        with pytest.raises(RuntimeError):
+            with TracedMemory():
+                pass
+    assert inner.peak_bytes is None
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.compaction import compact_dtypes
+from utils.data_loader import NA_VALUES, clear_cache, load_csv
+from utils.preprocessing import DuplicateRemover, MissingValueHandler, build_pipeline
+from utils.preprocessing import build_code_table, encode_with_table
+
+
+def _write_csv(path):
+    pd.DataFrame({
+        'id': [1, 2, 3, 4, 5],
+        'Age': [20.0, None, 30.0, 25.0, 22.0],
+        # Kolom float tanpa NaN tetap berupa view read-only ke snapshot
+        'CGPA': [7.5, 8.1, 5.9, 6.5, 9.0],
+        'City': ['A', 'B', None, 'A', 'A'],
+        'Depression': [1, 0, 1, 0, 1],
+    }).to_csv(path, index=False)
+
+
+@pytest.mark.parametrize('method', ['mean', 'median', 'zero', 'drop'])
+def test_missing_handler_on_snapshot_matches_csv(tmp_path, method):
+    pytest.importorskip('pyarrow')
+    csv_path = str(tmp_path / 'data.csv')
+    _write_csv(csv_path)
+
+    clear_cache()
+    from_csv, _ = load_csv(csv_path, na_values=NA_VALUES, use_snapshot=False)
+    clear_cache()
+    load_csv(csv_path, na_values=NA_VALUES)  # menulis snapshot
+    clear_cache()
+    from_snapshot, _ = load_csv(csv_path, na_values=NA_VALUES)
+    clear_cache()
+    assert not from_snapshot['Age'].to_numpy().flags.writeable
+
+    expected = MissingValueHandler(method).fit_transform(from_csv)
+    result = MissingValueHandler(method).fit_transform(from_snapshot)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+    if method != 'drop':
+        assert result.isna().sum().sum() == 0
+
+
+def test_median_fill_values():
+    df = pd.DataFrame({'Age': [20.0, np.nan, 30.0, 25.0], 'Depression': [1, 0, 1, 0]})
+    handler = build_pipeline({'handle_missing': True, 'missing_method': 'median'}).steps[0][1]
+    result = handler.fit_transform(df)
+    assert handler.fill_values_['Age'] == 25.0
+    assert result['Age'].tolist() == [20.0, 25.0, 30.0, 25.0]
+
+
+@pytest.mark.parametrize('method', ['mean', 'median'])
+def test_fill_values_on_compact_frame_use_float64(method):
+    rng = np.random.default_rng(0)
+    values = rng.normal(7.0, 1.5, size=1001)
+    values[::50] = np.nan
+    df = pd.DataFrame({'CGPA': values, 'Depression': rng.integers(0, 2, size=1001)})
+    compact = compact_dtypes(df)
+    assert compact['CGPA'].dtype == np.float32
+
+    handler = MissingValueHandler(method).fit(compact)
+    column = compact['CGPA'].to_numpy(dtype=np.float64)
+    expected = np.nanmean(column) if method == 'mean' else np.nanmedian(column)
+    assert handler.fill_values_['CGPA'] == expected
+
+    result = handler.transform(compact)
+    assert result['CGPA'].dtype == np.float32
+    assert result['CGPA'].iloc[0] == np.float32(expected)
+
+
+@pytest.mark.parametrize('subset', [None, [], ['zzz'], ['zzz', 'City', 'Age']])
+def test_duplicate_subset_without_known_columns_uses_default_keys(subset):
+    df = pd.DataFrame({
+        'id': [1, 2, 3],
+        'City': ['A', 'A', 'B'],
+        'Age': [20, 20, 30],
+    })
+    result = DuplicateRemover(subset=subset).fit_transform(df)
+    assert result['id'].tolist() == [1, 3]
+
+
+@pytest.mark.parametrize('values', [['Delhi', 'Agra', 'Delhi'], ['Delhi', None, 'Agra']])
+def test_code_table_ignores_unused_categories(values):
+    from sklearn.preprocessing import LabelEncoder
+
+    # Kategori 'Bhopal' tersisa dari baris yang sudah dibuang
+    series = pd.Series(values).astype(pd.CategoricalDtype(['Agra', 'Bhopal', 'Delhi']))
+    table = build_code_table(series)
+    encoder = LabelEncoder().fit(series.astype(str))
+
+    assert table.tolist() == encoder.classes_.tolist()
+    assert encode_with_table(series, table).tolist() == encoder.transform(series.astype(str)).tolist()
@@ -0,0 +1,13 @@
+"""Modul pendukung yang dipakai bersama oleh halaman-halaman Streamlit."""
+import pandas as pd
+
+# Setting pandas untuk seluruh proses, diaktifkan di sini secara eksplisit:
+# setiap halaman (juga benchmark dan test) mengimpor paket ``utils``, jadi
+# mode ini aktif sekali sebelum modul mana pun dipakai, tidak bergantung pada
+# modul mana yang diimpor lebih dulu. Frame di cache loader dan di
+# ``DatasetStore`` dipakai bersama oleh banyak session dan tidak boleh diubah
+# in-place; dengan Copy-on-Write setiap modifikasi otomatis membuat salinan
+# sendiri (default sejak pandas 3). Mode ini juga berlaku untuk pemanggilan
+# pandas dari sklearn/joblib di proses yang sama.
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
@@ -0,0 +1,173 @@
+"""Scoring batch CSV baru dengan model dari registry.
+
+File input dibaca per chunk, setiap chunk diproses dengan pipeline
+preprocessing yang tersimpan bersama model (mapping Sleep Duration,
+Financial Stress, dan tabel encoder) lalu diprediksi oleh worker process.
+Jumlah chunk yang sedang diproses dibatasi, dan hasilnya langsung ditulis
+ke file output sesuai urutan input, sehingga memori yang dipakai tidak
+bergantung pada ukuran file.
+"""
+import glob
+import os
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils.data_loader import NA_VALUES, normalize_frame
+
+DEFAULT_CHUNKSIZE = 20_000
+
+# Setiap scoring menulis ke file sendiri agar session lain tidak saling menimpa
+OUTPUT_DIR = 'data'
+OUTPUT_PREFIX = 'predictions_'
+# File hasil yang lebih tua dari ini dihapus saat scoring berikutnya (jam)
+OUTPUT_MAX_AGE_HOURS = float(os.environ.get("AKDAT_PREDICTIONS_MAX_AGE_HOURS", 24))
+
+# Prediksi untuk baris yang tidak bisa di-scoring (mis. masih ada nilai kosong)
+UNSCORED = -1
+
+# Kolom id yang ikut disalin ke output agar hasil bisa dicocokkan
+ID_COLUMN = 'id'
+
+# State worker: model & pipeline dikirim sekali saat worker dibuat
+_worker_state = {}
+
+
+def default_workers():
+    return max(1, (os.cpu_count() or 1) - 1)
+
+
+def new_output_path(directory=OUTPUT_DIR):
+    """Buat file output kosong dengan nama unik dan kembalikan path-nya."""
+    os.makedirs(directory, exist_ok=True)
+    fd, path = tempfile.mkstemp(prefix=OUTPUT_PREFIX, suffix='.csv', dir=directory)
+    os.close(fd)
+    return path
+
+
+def cleanup_outputs(max_age_hours=OUTPUT_MAX_AGE_HOURS, directory=OUTPUT_DIR, keep=()):
+    """Hapus file hasil scoring yang lebih tua dari ``max_age_hours`` (kecuali ``keep``)."""
+    keep = {os.path.abspath(path) for path in keep if path}
+    cutoff = time.time() - max_age_hours * 3600
+    for path in glob.glob(os.path.join(directory, f'{OUTPUT_PREFIX}*.csv')):
+        try:
+            if os.path.abspath(path) not in keep and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            # File bisa sudah dihapus oleh session lain
+            pass
+
+
+def _init_worker(model, pipeline, features):
+    # Paralelisme sudah di level process; thread per model akan berebut core
+    if 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=1)
+    _worker_state['model'] = model
+    _worker_state['pipeline'] = pipeline
+    _worker_state['features'] = features
+
+
+def _prepare_features(chunk, pipeline, features):
+    """Terapkan preprocessing ke chunk; kembalikan fitur dan mask baris valid."""
+    X = chunk
+    if pipeline is not None:
+        # Langkah 'duplicates' tidak membuang baris saat transform; langkah
+        # 'missing' dengan metode drop bisa membuang baris, jadi hasilnya
+        # disejajarkan kembali ke index chunk
+        X = pipeline.transform(chunk).reindex(chunk.index)
+    missing = [col for col in features if col not in X.columns]
+    if missing:
+        raise ValueError(f"Kolom tidak ditemukan di data input: {', '.join(missing)}")
+    X = X[features]
+    valid = X.notna().all(axis=1).to_numpy()
+    return X, valid
+
+
+def score_chunk(chunk, model, pipeline, features):
+    """Prediksi satu chunk; baris yang tidak valid mendapat ``UNSCORED``."""
+    X, valid = _prepare_features(chunk, pipeline, features)
+    predictions = np.full(len(chunk), UNSCORED, dtype=np.int64)
+    probability = np.full(len(chunk), np.nan)
+    if valid.any():
+        X_valid = X[valid]
+        proba = model.predict_proba(X_valid)
+        predictions[valid] = model.classes_[proba.argmax(axis=1)]
+        # Probabilitas kelas positif (Depression = 1), atau kelas terakhir
+        positive = list(model.classes_).index(1) if 1 in model.classes_ else -1
+        probability[valid] = proba[:, positive]
+
+    result = pd.DataFrame({'prediction': predictions, 'probability': probability})
+    if ID_COLUMN in chunk.columns:
+        result.insert(0, ID_COLUMN, chunk[ID_COLUMN].to_numpy())
+    return result
+
+
+def _score_in_worker(chunk):
+    return score_chunk(chunk, _worker_state['model'], _worker_state['pipeline'], _worker_state['features'])
+
+
+def score_csv(source, registered, output_path, chunksize=DEFAULT_CHUNKSIZE, n_workers=None,
+              na_values=None, progress_callback=None):
+    """Scoring file CSV ``source`` dan tulis hasilnya ke ``output_path``.
+
+    ``registered`` adalah ``RegisteredModel`` dari registry. Dengan
+    ``n_workers > 1`` chunk diproses paralel oleh worker process; maksimal
+    ``2 * n_workers`` chunk berada di memori sekaligus.
+    ``progress_callback(jumlah_baris)`` dipanggil setiap satu chunk selesai.
+
+    Mengembalikan dict ringkasan: ``rows``, ``scored``, ``positive``,
+    ``seconds``, dan ``rows_per_second``.
+    """
+    if na_values is None:
+        na_values = NA_VALUES
+    if n_workers is None:
+        n_workers = default_workers()
+
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    summary = {'rows': 0, 'scored': 0, 'positive': 0}
+    started = time.perf_counter()
+
+    def write(result, first):
+        result.to_csv(output_path, mode='w' if first else 'a', header=first, index=False)
+        summary['rows'] += len(result)
+        summary['scored'] += int((result['prediction'] != UNSCORED).sum())
+        summary['positive'] += int((result['prediction'] == 1).sum())
+        if progress_callback is not None:
+            progress_callback(summary['rows'])
+
+    model, pipeline, features = registered.model, registered.pipeline, registered.features
+    with pd.read_csv(source, na_values=na_values, chunksize=chunksize) as reader:
+        chunks = (normalize_frame(chunk) for chunk in reader)
+        first = True
+        if n_workers <= 1:
+            for chunk in chunks:
+                write(score_chunk(chunk, model, pipeline, features), first)
+                first = False
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                     initargs=(model, pipeline, features)) as executor:
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(executor.submit(_score_in_worker, chunk))
+                    # Tulis hasil paling awal dulu agar urutan output = urutan input
+                    while len(pending) >= 2 * n_workers:
+                        write(pending.popleft().result(), first)
+                        first = False
+                while pending:
+                    write(pending.popleft().result(), first)
+                    first = False
+
+        if first:
+            # File input kosong: tetap tulis header
+            pd.DataFrame(columns=['prediction', 'probability']).to_csv(output_path, index=False)
+
+    summary['seconds'] = time.perf_counter() - started
+    summary['rows_per_second'] = summary['rows'] / summary['seconds'] if summary['seconds'] > 0 else 0.0
+    return summary
@@ -0,0 +1,79 @@
+"""Kompresi tipe data DataFrame untuk menghemat memori.
+
+- Kolom teks dengan sedikit nilai unik (mis. City, Gender, Sleep Duration)
+  diubah menjadi ``category``.
+- Kolom integer di-downcast ke tipe terkecil yang cukup (mis. int8 untuk skor
+  0-5), kolom float menjadi float32. Random Forest sklearn memang bekerja
+  dengan float32, sehingga hasil model tidak berubah.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from utils.data_loader import derive_key, get_cached_frame, put_cached_frame
+
+# Kolom teks dijadikan category jika rasio nilai unik / jumlah baris <= batas ini
+CATEGORY_MAX_RATIO = 0.5
+
+MAX_CACHED_REPORTS = 64
+
+
+def compact_dtypes(df, category_max_ratio=CATEGORY_MAX_RATIO):
+    """Kembalikan salinan ``df`` dengan tipe data yang lebih hemat memori."""
+    compact = df.copy(deep=False)
+    n_rows = max(len(df), 1)
+    for col in df.columns:
+        series = df[col]
+        if series.dtype == object:
+            if series.nunique(dropna=True) / n_rows <= category_max_ratio:
+                compact[col] = series.astype('category')
+        elif pd.api.types.is_bool_dtype(series):
+            continue
+        elif pd.api.types.is_integer_dtype(series):
+            compact[col] = pd.to_numeric(series, downcast='integer')
+        elif pd.api.types.is_float_dtype(series) and series.dtype != np.float32:
+            compact[col] = series.astype('float32')
+    return compact
+
+
+def memory_report(before, after):
+    """Perbandingan tipe data dan memori per kolom sebelum/sesudah kompresi."""
+    bytes_before = before.memory_usage(deep=True, index=False)
+    bytes_after = after.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        'column': before.columns,
+        'dtype_before': before.dtypes.astype(str).values,
+        'dtype_after': after.dtypes.astype(str).values,
+        'bytes_before': bytes_before.values,
+        'bytes_after': bytes_after.values,
+    })
+    report['saving_pct'] = (1 - report['bytes_after'] / report['bytes_before'].clip(lower=1)) * 100
+    return report
+
+
+_reports = OrderedDict()
+_reports_lock = threading.Lock()
+
+
+def load_compact(df, data_key):
+    """Versi kompak dari ``df`` beserta laporan memorinya, di-cache per versi data.
+
+    Mengembalikan tuple ``(compact_df, compact_key, report)``.
+    """
+    compact_key = derive_key(data_key, compact=True)
+    compact = get_cached_frame(compact_key)
+    with _reports_lock:
+        report = _reports.get(compact_key)
+
+    if compact is None or report is None:
+        compact = compact_dtypes(df)
+        report = memory_report(df, compact)
+        put_cached_frame(compact_key, compact)
+        with _reports_lock:
+            _reports[compact_key] = report
+            while len(_reports) > MAX_CACHED_REPORTS:
+                _reports.popitem(last=False)
+
+    return compact, compact_key, report
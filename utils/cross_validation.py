@@ -0,0 +1,101 @@
+"""Stratified k-fold cross-validation Random Forest yang paralel antar fold.
+
+Akurasi dari satu split train/test berubah-ubah tergantung ``random_state``;
+rata-rata dan standar deviasi beberapa fold menunjukkan apakah perbedaan
+antar konfigurasi nyata atau hanya noise.
+
+Setiap fold di-fit di worker process sendiri. Jumlah thread di dalam setiap
+forest (``n_jobs``) dibagi dari jumlah core, sehingga total thread tidak
+melebihi jumlah core: dengan core yang cukup, k fold selesai kira-kira
+secepat satu kali fit.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, precision_score, recall_score
+from sklearn.model_selection import StratifiedKFold
+
+METRIC_NAMES = ('accuracy', 'precision', 'recall')
+
+# Data per worker: dikirim sekali saat worker dibuat
+_worker_data = {}
+
+
+def _init_worker(X, y):
+    _worker_data['X'] = X
+    _worker_data['y'] = y
+
+
+def plan_workers(n_splits, n_workers=None, n_cores=None):
+    """``(jumlah worker, n_jobs per forest)`` agar total thread <= jumlah core."""
+    n_cores = n_cores or os.cpu_count() or 1
+    n_workers = max(1, min(n_workers or n_cores, n_splits, n_cores))
+    return n_workers, max(1, n_cores // n_workers)
+
+
+def evaluate_fold(X, y, train_positions, test_positions, params, n_jobs=1):
+    """Fit satu fold dan kembalikan metrik di data test fold itu."""
+    started = time.perf_counter()
+    model = RandomForestClassifier(n_jobs=n_jobs, **params)
+    model.fit(X[train_positions], y[train_positions])
+    fit_seconds = time.perf_counter() - started
+    y_pred = model.predict(X[test_positions])
+    y_true = y[test_positions]
+    return {
+        'accuracy': accuracy_score(y_true, y_pred),
+        'precision': precision_score(y_true, y_pred, average='weighted', zero_division=0),
+        'recall': recall_score(y_true, y_pred, average='weighted', zero_division=0),
+        'fit_seconds': fit_seconds,
+    }
+
+
+def _evaluate_in_worker(train_positions, test_positions, params, n_jobs):
+    return evaluate_fold(_worker_data['X'], _worker_data['y'], train_positions, test_positions, params, n_jobs)
+
+
+def cross_validate_forest(X, y, params, n_splits=5, random_state=42, n_workers=None, progress_callback=None):
+    """Stratified k-fold CV; kembalikan ``(hasil_per_fold, ringkasan)``.
+
+    ``hasil_per_fold`` berisi metrik dan waktu fit setiap fold;
+    ``ringkasan`` berisi mean dan std setiap metrik (``'metrics'``), waktu
+    total (``'wall_seconds'``) dan jumlah worker / thread per forest.
+    ``progress_callback(selesai, total)`` dipanggil setiap satu fold selesai.
+    """
+    X = np.ascontiguousarray(np.asarray(X, dtype=np.float32))
+    y = np.asarray(y)
+    folds = list(StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state).split(X, y))
+    n_workers, n_jobs = plan_workers(n_splits, n_workers)
+
+    started = time.perf_counter()
+    results = {}
+    if n_workers == 1:
+        for fold, (train_positions, test_positions) in enumerate(folds, start=1):
+            results[fold] = evaluate_fold(X, y, train_positions, test_positions, params, n_jobs)
+            if progress_callback is not None:
+                progress_callback(len(results), n_splits)
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker, initargs=(X, y)) as executor:
+            futures = {
+                executor.submit(_evaluate_in_worker, train_positions, test_positions, params, n_jobs): fold
+                for fold, (train_positions, test_positions) in enumerate(folds, start=1)
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                if progress_callback is not None:
+                    progress_callback(len(results), n_splits)
+    wall_seconds = time.perf_counter() - started
+
+    fold_results = pd.DataFrame([{'fold': fold, **results[fold]} for fold in sorted(results)])
+    metrics = fold_results[list(METRIC_NAMES)]
+    summary = {
+        'metrics': pd.DataFrame({'mean': metrics.mean(), 'std': metrics.std(ddof=1)}),
+        'wall_seconds': wall_seconds,
+        'fit_seconds': float(fold_results['fit_seconds'].sum()),
+        'n_workers': n_workers,
+        'n_jobs': n_jobs,
+    }
+    return fold_results, summary
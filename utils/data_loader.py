@@ -0,0 +1,290 @@
+"""Loader dataset bersama dengan cache berbasis hash isi file.
+
+Dataset yang sama (isi file + opsi parsing identik) hanya di-parse sekali per
+proses server, lalu dipakai ulang oleh semua session. Cache dibatasi ukuran
+memori (LRU) supaya banyak upload besar tidak menghabiskan RAM server.
+
+Untuk file CSV di disk (mis. dataset default), hasil parsing juga disimpan
+sebagai snapshot Arrow IPC di samping CSV. Load berikutnya membaca snapshot
+tersebut lewat memory-map, dan kembali ke CSV jika snapshot sudah basi.
+"""
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+except ImportError:  # pragma: no cover - pyarrow opsional
+    pa = None
+
+DEFAULT_DATASET_PATH = "student_depression_dataset.csv"
+NA_VALUES = ['?', 'NA', 'N/A', '']
+
+# Ukuran blok saat menghitung hash isi file
+HASH_BLOCK_BYTES = 1024 * 1024
+
+SNAPSHOT_SUFFIX = '.arrow'
+# Naikkan jika cara normalisasi data berubah agar snapshot lama dianggap basi
+SNAPSHOT_VERSION = '1'
+
+# Batas total memori frame yang disimpan di cache (MB), bisa diatur lewat env
+MAX_CACHE_MB = int(os.environ.get("AKDAT_CACHE_MB", "512"))
+
+# Frame di cache dipakai bersama oleh banyak session, jadi tidak boleh diubah
+# in-place; mode Copy-on-Write pandas diaktifkan di ``utils/__init__.py``.
+
+
+class FrameCache:
+    """Cache LRU untuk DataFrame dengan batas total ukuran dalam byte.
+
+    Selain DataFrame, entry boleh berupa objek lain yang memuat frame (mis.
+    tuple transformer + hasil); ukurannya tetap dihitung dari frame tersebut.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, df, value=None):
+        """Simpan ``df`` (atau ``value`` yang ukurannya dihitung dari ``df``)."""
+        nbytes = int(df.memory_usage(deep=True).sum())
+        if nbytes > self.max_bytes:
+            # Frame lebih besar dari seluruh budget: jangan di-cache
+            return
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (df if value is None else value, nbytes)
+            self._total_bytes += nbytes
+            while self._total_bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_bytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+_frame_cache = FrameCache(MAX_CACHE_MB * 1024 * 1024)
+
+# Hash file di disk disimpan per (path, mtime, size) agar file default tidak
+# perlu dibaca ulang hanya untuk dihitung hash-nya
+_path_hashes = {}
+_path_hashes_lock = threading.Lock()
+
+
+def _hash_bytes(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _hash_stream(f):
+    # Dibaca per blok agar isi file tidak perlu disalin utuh ke memori
+    hasher = hashlib.blake2b(digest_size=16)
+    for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b''):
+        hasher.update(block)
+    return hasher.hexdigest()
+
+
+def _hash_path(path):
+    stat = os.stat(path)
+    stamp = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    with _path_hashes_lock:
+        cached = _path_hashes.get(stamp)
+    if cached is not None:
+        return cached
+
+    with open(path, 'rb') as f:
+        digest = _hash_stream(f)
+    with _path_hashes_lock:
+        _path_hashes[stamp] = digest
+    return digest
+
+
+def make_cache_key(content_hash, na_values):
+    """Gabungkan hash isi file dengan opsi parsing menjadi satu key."""
+    options = repr(sorted(na_values))
+    return f"{content_hash}:{_hash_bytes(options.encode())[:8]}"
+
+
+def derive_key(parent_key, **params):
+    """Key untuk versi data turunan (mis. hasil preprocessing) dari ``parent_key``."""
+    description = f"{parent_key}|{sorted(params.items())!r}"
+    return _hash_bytes(description.encode())
+
+
+def normalize_frame(df):
+    """Rapikan hasil parsing CSV.
+
+    - Hapus tanda kutip yang menempel di nilai teks (mis. ``'5-6 hours'``)
+    - Kolom float yang seluruhnya bilangan bulat tanpa NaN dijadikan int64
+    """
+    for col in df.columns:
+        series = df[col]
+        if series.dtype == object:
+            stripped = series.str.strip("'\"")
+            if not stripped.equals(series):
+                df[col] = stripped
+        elif series.dtype == 'float64' and series.notna().all():
+            values = series.to_numpy()
+            if (values == values.astype('int64')).all():
+                df[col] = series.astype('int64')
+    return df
+
+
+def snapshot_path(csv_path):
+    """Path snapshot Arrow untuk sebuah file CSV."""
+    root, _ = os.path.splitext(csv_path)
+    return root + SNAPSHOT_SUFFIX
+
+
+def _read_snapshot(path, data_key):
+    """Baca snapshot via memory-map, atau None jika tidak ada/basi."""
+    if pa is None or not os.path.exists(path):
+        return None
+    try:
+        source = pa.memory_map(path, 'r')
+        reader = pa_ipc.open_file(source)
+        metadata = reader.schema.metadata or {}
+        if (metadata.get(b'akdat_data_key') != data_key.encode()
+                or metadata.get(b'akdat_version') != SNAPSHOT_VERSION.encode()):
+            return None
+        table = reader.read_all()
+    except (OSError, pa.ArrowException):
+        return None
+    # split_blocks menghindari konsolidasi blok, sehingga kolom numerik tetap
+    # berupa view read-only ke file yang di-mmap (tanpa salinan)
+    return table.to_pandas(split_blocks=True)
+
+
+def _write_snapshot(path, df, data_key):
+    """Tulis snapshot Arrow IPC (tanpa kompresi agar bisa di-mmap)."""
+    if pa is None:
+        return
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            b'akdat_data_key': data_key.encode(),
+            b'akdat_version': SNAPSHOT_VERSION.encode(),
+        })
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa_ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+    except (OSError, pa.ArrowException):
+        # Snapshot hanya optimasi; kegagalan menulis tidak boleh menggagalkan load
+        pass
+
+
+def _hash_file(source):
+    # UploadedFile Streamlit (turunan BytesIO) di-hash langsung dari file
+    # object, bukan lewat getvalue() yang menyalin seluruh isi file.
+    # Posisi baca dikembalikan ke awal agar file bisa langsung di-parse.
+    source.seek(0)
+    try:
+        return _hash_stream(source)
+    finally:
+        source.seek(0)
+
+
+def source_key(source, na_values=None):
+    """Hitung key cache (hash isi + opsi parsing) tanpa mem-parse file."""
+    if na_values is None:
+        na_values = NA_VALUES
+    if isinstance(source, (str, os.PathLike)):
+        content_hash = _hash_path(source)
+    elif hasattr(source, 'read'):
+        content_hash = _hash_file(source)
+    else:
+        content_hash = _hash_bytes(bytes(source))
+    return make_cache_key(content_hash, na_values)
+
+
+def load_csv(source, na_values=None, use_snapshot=True):
+    """Load CSV dari path atau file upload, memakai cache jika tersedia.
+
+    Mengembalikan tuple ``(df, data_key)``. ``data_key`` adalah identitas isi
+    dataset yang bisa dipakai sebagai versi data oleh halaman lain. Frame yang
+    dikembalikan dipakai bersama, jadi jangan diubah in-place.
+
+    Untuk source berupa path dan ``use_snapshot=True``, snapshot Arrow di
+    samping CSV dipakai jika masih cocok dengan isi CSV; jika tidak, CSV
+    di-parse ulang dan snapshot ditulis ulang.
+    """
+    if na_values is None:
+        na_values = NA_VALUES
+
+    is_path = isinstance(source, (str, os.PathLike))
+    data_key = source_key(source, na_values)
+    df = _frame_cache.get(data_key)
+    if df is not None:
+        return df, data_key
+
+    if is_path and use_snapshot:
+        df = _read_snapshot(snapshot_path(source), data_key)
+        if df is not None:
+            _frame_cache.put(data_key, df)
+            return df, data_key
+
+    if is_path or hasattr(source, 'read'):
+        df = pd.read_csv(source, na_values=na_values)
+    else:
+        df = pd.read_csv(io.BytesIO(source), na_values=na_values)
+    df = normalize_frame(df)
+
+    if is_path and use_snapshot:
+        _write_snapshot(snapshot_path(source), df, data_key)
+
+    _frame_cache.put(data_key, df)
+    return df, data_key
+
+
+def get_cached_frame(key):
+    """Ambil frame dari cache bersama (mis. versi turunan), atau None."""
+    return _frame_cache.get(key)
+
+
+def put_cached_frame(key, df):
+    """Simpan frame turunan ke cache bersama dengan batas memori yang sama."""
+    _frame_cache.put(key, df)
+
+
+def cache_stats():
+    """Statistik cache dataset (jumlah entry, ukuran, hit/miss)."""
+    return _frame_cache.stats()
+
+
+def clear_cache():
+    """Kosongkan cache dataset bersama (mis. agar load berikutnya benar-benar dingin)."""
+    _frame_cache.clear()
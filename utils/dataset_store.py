@@ -0,0 +1,82 @@
+"""Penyimpanan versi dataset per session tanpa menyalin DataFrame.
+
+Setiap versi data (hasil load, hasil preprocessing, ...) disimpan sekali
+dengan key versinya, lalu halaman-halaman memegang referensi lewat nama
+(``'original'``, ``'current'``, ``'processed'``). Frame di store tidak boleh
+diubah in-place: langkah yang memodifikasi data harus bekerja pada
+``df.copy(deep=False)``. Dengan Copy-on-Write pandas (diaktifkan di
+``utils/__init__.py``), hanya kolom yang benar-benar diubah yang disalin,
+sehingga versi turunan berbagi memori dengan induknya.
+"""
+from collections import OrderedDict
+
+SESSION_KEY = 'dataset_store'
+
+
+class DatasetStore:
+    """Kumpulan versi dataset immutable dengan referensi bernama."""
+
+    def __init__(self):
+        self._versions = OrderedDict()
+        self._refs = {}
+
+    def put(self, df, key, parent_key=None, description=''):
+        """Simpan ``df`` sebagai versi ``key`` (tanpa menyalin)."""
+        self._versions[key] = {
+            'df': df,
+            'parent_key': parent_key,
+            'description': description,
+        }
+        return key
+
+    def point(self, name, key):
+        """Arahkan referensi ``name`` ke versi ``key``."""
+        if key not in self._versions:
+            raise KeyError(f"Versi data '{key}' tidak ada di store")
+        self._refs[name] = key
+        self._prune()
+
+    def unpoint(self, name):
+        self._refs.pop(name, None)
+        self._prune()
+
+    def get(self, name):
+        """Frame yang ditunjuk ``name``, atau None jika belum ada."""
+        key = self._refs.get(name)
+        if key is None:
+            return None
+        return self._versions[key]['df']
+
+    def key(self, name):
+        """Key versi yang ditunjuk ``name``, atau None jika belum ada."""
+        return self._refs.get(name)
+
+    def __contains__(self, name):
+        return name in self._refs
+
+    def versions(self):
+        """Daftar versi yang tersimpan beserta induk dan deskripsinya."""
+        return [
+            {
+                'key': key,
+                'parent_key': version['parent_key'],
+                'description': version['description'],
+                'names': [name for name, ref in self._refs.items() if ref == key],
+                'shape': version['df'].shape,
+            }
+            for key, version in self._versions.items()
+        ]
+
+    def _prune(self):
+        # Versi yang tidak lagi ditunjuk nama mana pun dilepas dari memori
+        referenced = set(self._refs.values())
+        for key in list(self._versions):
+            if key not in referenced:
+                del self._versions[key]
+
+
+def get_store(session_state):
+    """Ambil store milik session, buat baru jika belum ada."""
+    if SESSION_KEY not in session_state:
+        session_state[SESSION_KEY] = DatasetStore()
+    return session_state[SESSION_KEY]
@@ -0,0 +1,247 @@
+"""Deteksi baris duplikat berbasis hash pada kolom kunci.
+
+Setiap baris di-hash (uint64) secara vektor hanya pada kolom kunci yang
+dipilih; kolom identitas seperti ``id`` dikecualikan secara default karena
+nilainya selalu unik sehingga survei yang dikirim ulang tidak akan pernah
+terdeteksi. Hasilnya berupa ``DuplicateIndex`` yang menyimpan posisi baris
+dalam grup duplikat, sehingga tampilan baris duplikat tidak perlu memindai
+ulang data.
+
+Untuk data yang lebih besar dari memori, ``PartitionedHashIndex`` menyimpan
+pasangan (hash, posisi) ke file sementara yang dipartisi berdasarkan hash,
+lalu memproses satu partisi sekaligus. Baris dengan hash sama selalu berada
+di partisi yang sama, jadi setiap grup duplikat lengkap dalam satu partisi.
+"""
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Nama kolom identitas (case-insensitive) yang tidak ikut dibandingkan
+ID_COLUMNS = ('id', 'index')
+
+MAX_CACHED_INDEXES = 32
+
+_PAIR_DTYPE = np.dtype([('hash', '<u8'), ('position', '<i8')])
+
+
+def default_key_columns(columns):
+    """Semua kolom kecuali kolom identitas (mis. ``id``)."""
+    return [col for col in columns if str(col).lower() not in ID_COLUMNS]
+
+
+def hash_column(series):
+    """Hash setiap nilai kolom (uint64), konsisten antar chunk dan dtype.
+
+    Kolom numerik bisa terbaca int64 di satu chunk dan float64 di chunk lain
+    (karena NaN), jadi semua numerik di-hash sebagai float64.
+    """
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        values = series.to_numpy(dtype='float64', na_value=np.nan)
+    else:
+        values = series.to_numpy(dtype=object)
+    return pd.util.hash_array(values)
+
+
+def combine_hashes(row_hashes, col_hashes):
+    """Gabungkan hash kolom ke hash baris (ala FNV; urutan kolom berpengaruh)."""
+    with np.errstate(over='ignore'):
+        return (row_hashes ^ col_hashes) * np.uint64(0x100000001B3)
+
+
+def hash_rows(df, key_columns=None):
+    """Hash uint64 per baris berdasarkan ``key_columns``."""
+    if key_columns is None:
+        key_columns = default_key_columns(df.columns)
+    row_hashes = np.zeros(len(df), dtype='uint64')
+    for col in key_columns:
+        row_hashes = combine_hashes(row_hashes, hash_column(df[col]))
+    return row_hashes
+
+
+class DuplicateIndex:
+    """Posisi baris yang termasuk grup duplikat beserta nomor grupnya.
+
+    ``positions`` adalah posisi baris (0-based), diurutkan per grup lalu per
+    posisi; baris pertama setiap grup dianggap asli, sisanya duplikat.
+    """
+
+    def __init__(self, key_columns, n_rows, positions, group_ids):
+        self.key_columns = list(key_columns)
+        self.n_rows = n_rows
+        self.positions = positions
+        self.group_ids = group_ids
+
+    @property
+    def n_groups(self):
+        return int(self.group_ids.max()) + 1 if len(self.group_ids) else 0
+
+    @property
+    def n_duplicates(self):
+        """Jumlah baris yang merupakan duplikat dari baris sebelumnya."""
+        return len(self.positions) - self.n_groups
+
+    def duplicated_mask(self, keep='first'):
+        """Mask boolean setara ``DataFrame.duplicated(subset, keep)``.
+
+        ``keep='first'`` menandai semua kecuali baris pertama tiap grup,
+        ``keep=False`` menandai semua baris dalam grup duplikat.
+        """
+        mask = np.zeros(self.n_rows, dtype=bool)
+        if keep is False:
+            mask[self.positions] = True
+        else:
+            is_first = np.ones(len(self.group_ids), dtype=bool)
+            is_first[1:] = self.group_ids[1:] != self.group_ids[:-1]
+            mask[self.positions[~is_first]] = True
+        return mask
+
+    def group_summary(self):
+        """Tabel grup duplikat: nomor grup, ukuran, dan posisi baris pertama."""
+        if len(self.positions) == 0:
+            return pd.DataFrame({'group': [], 'size': [], 'first_position': []}, dtype='int64')
+        starts = np.flatnonzero(np.r_[True, self.group_ids[1:] != self.group_ids[:-1]])
+        sizes = np.diff(np.r_[starts, len(self.group_ids)])
+        return pd.DataFrame({
+            'group': self.group_ids[starts],
+            'size': sizes,
+            'first_position': self.positions[starts],
+        }).sort_values('size', ascending=False, kind='stable').reset_index(drop=True)
+
+    def take(self, df, max_rows=None):
+        """Ambil baris duplikat dari ``df`` (dikelompokkan per grup)."""
+        positions = self.positions if max_rows is None else self.positions[:max_rows]
+        rows = df.iloc[positions]
+        return rows, self.group_ids[:len(positions)]
+
+
+def _index_from_hashes(hashes, positions, key_columns, n_rows):
+    # factorize memakai hash table (O(n)); kode grup urut kemunculan pertama
+    codes, _ = pd.factorize(hashes)
+    counts = np.bincount(codes)
+    in_group = counts[codes] > 1
+    dup_positions = positions[in_group]
+    dup_codes = codes[in_group]
+    order = np.lexsort((dup_positions, dup_codes))
+    dup_positions = dup_positions[order]
+    _, group_ids = np.unique(dup_codes[order], return_inverse=True)
+    return DuplicateIndex(key_columns, n_rows, dup_positions, group_ids)
+
+
+def build_duplicate_index(df, key_columns=None):
+    """Bangun ``DuplicateIndex`` untuk DataFrame di memori."""
+    if key_columns is None:
+        key_columns = default_key_columns(df.columns)
+    hashes = hash_rows(df, key_columns)
+    return _index_from_hashes(hashes, np.arange(len(df)), key_columns, len(df))
+
+
+class PartitionedHashIndex:
+    """Akumulator hash baris yang bisa di-spill ke disk per partisi hash.
+
+    Selama jumlah hash di memori di bawah ``max_rows_in_memory``, semuanya
+    disimpan di memori. Jika terlampaui, pasangan (hash, posisi) ditulis ke
+    ``n_partitions`` file sementara berdasarkan ``hash % n_partitions``,
+    sehingga saat ``finalize`` hanya satu partisi yang dimuat sekaligus.
+    """
+
+    def __init__(self, key_columns, n_partitions=16, max_rows_in_memory=5_000_000):
+        self.key_columns = list(key_columns)
+        self.n_partitions = n_partitions
+        self.max_rows_in_memory = max_rows_in_memory
+        self.n_rows = 0
+        self._buffers = []
+        self._buffered_rows = 0
+        self._tmpdir = None
+
+    def add(self, hashes, positions=None):
+        if positions is None:
+            positions = np.arange(self.n_rows, self.n_rows + len(hashes))
+        pairs = np.empty(len(hashes), dtype=_PAIR_DTYPE)
+        pairs['hash'] = hashes
+        pairs['position'] = positions
+        self._buffers.append(pairs)
+        self._buffered_rows += len(pairs)
+        self.n_rows += len(pairs)
+        if self._buffered_rows > self.max_rows_in_memory:
+            self._spill()
+
+    def _partition_path(self, partition):
+        return os.path.join(self._tmpdir, f"part-{partition:04d}.bin")
+
+    def _spill(self):
+        if not self._buffers:
+            return
+        if self._tmpdir is None:
+            self._tmpdir = tempfile.mkdtemp(prefix='akdat-dup-')
+        pairs = np.concatenate(self._buffers)
+        partitions = (pairs['hash'] % np.uint64(self.n_partitions)).astype(np.int64)
+        order = np.argsort(partitions, kind='stable')
+        pairs, partitions = pairs[order], partitions[order]
+        bounds = np.searchsorted(partitions, np.arange(self.n_partitions + 1))
+        for partition in range(self.n_partitions):
+            part = pairs[bounds[partition]:bounds[partition + 1]]
+            if len(part):
+                with open(self._partition_path(partition), 'ab') as f:
+                    part.tofile(f)
+        self._buffers = []
+        self._buffered_rows = 0
+
+    def finalize(self):
+        """Bangun ``DuplicateIndex`` dari semua hash yang sudah ditambahkan."""
+        if self._tmpdir is None:
+            pairs = np.concatenate(self._buffers) if self._buffers else np.empty(0, dtype=_PAIR_DTYPE)
+            return _index_from_hashes(pairs['hash'], pairs['position'], self.key_columns, self.n_rows)
+
+        self._spill()
+        try:
+            parts = []
+            group_offset = 0
+            for partition in range(self.n_partitions):
+                path = self._partition_path(partition)
+                if not os.path.exists(path):
+                    continue
+                pairs = np.fromfile(path, dtype=_PAIR_DTYPE)
+                part = _index_from_hashes(pairs['hash'], pairs['position'], self.key_columns, self.n_rows)
+                # Nomor grup dibuat unik lintas partisi
+                n_groups = part.n_groups
+                part.group_ids = part.group_ids + group_offset
+                group_offset += n_groups
+                parts.append(part)
+        finally:
+            shutil.rmtree(self._tmpdir, ignore_errors=True)
+            self._tmpdir = None
+
+        positions = np.concatenate([p.positions for p in parts]) if parts else np.empty(0, dtype=np.int64)
+        group_ids = np.concatenate([p.group_ids for p in parts]) if parts else np.empty(0, dtype=np.int64)
+        return DuplicateIndex(self.key_columns, self.n_rows, positions, group_ids)
+
+
+_index_cache = OrderedDict()
+_index_cache_lock = threading.Lock()
+
+
+def get_duplicate_index(df, data_key, key_columns=None):
+    """``DuplicateIndex`` untuk versi data ``data_key``, di-cache per kolom kunci."""
+    if key_columns is None:
+        key_columns = default_key_columns(df.columns)
+    if data_key is None:
+        return build_duplicate_index(df, key_columns)
+
+    cache_key = (data_key, tuple(key_columns))
+    with _index_cache_lock:
+        index = _index_cache.get(cache_key)
+        if index is not None:
+            _index_cache.move_to_end(cache_key)
+            return index
+
+    index = build_duplicate_index(df, key_columns)
+    with _index_cache_lock:
+        _index_cache[cache_key] = index
+        while len(_index_cache) > MAX_CACHED_INDEXES:
+            _index_cache.popitem(last=False)
+    return index
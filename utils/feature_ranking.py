@@ -0,0 +1,132 @@
+"""Ranking feature tanpa training forest per percobaan.
+
+Tiga ukuran dihitung pada data hasil preprocessing:
+
+- mutual information (``mutual_info_classif``): ketergantungan non-linear
+  antara feature dan target; kolom integer (hasil encoding) diperlakukan
+  diskrit
+- chi-square (``chi2``) pada nilai yang diskalakan ke [0, 1] (chi2 butuh
+  nilai non-negatif, sedangkan kode kategori tidak dikenal bernilai -1)
+- recursive feature elimination dengan cross-validation (``RFECV``) memakai
+  forest kecil: urutan eliminasi dan kurva accuracy untuk setiap jumlah
+  feature; fold dijalankan paralel
+
+Subsampel berstrata membatasi biaya pada data berukuran jutaan baris. Hasil
+disimpan per versi data (key ``DatasetStore``) di cache proses.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.feature_selection import RFECV, chi2, mutual_info_classif
+from sklearn.model_selection import StratifiedKFold
+from sklearn.preprocessing import MinMaxScaler
+
+from utils.importance import stratified_sample
+
+DEFAULT_SAMPLE_SIZE = 20_000
+
+# Forest kecil untuk RFE: cukup untuk mengurutkan feature, jauh lebih murah dari model final
+RFE_PARAMS = {'n_estimators': 50, 'max_depth': 10}
+RFE_CV = 3
+
+RANKING_METHODS = {
+    'combined': 'Gabungan (rata-rata rank)',
+    'mutual_info': 'Mutual Information',
+    'chi2': 'Chi-Square',
+    'rfe': 'Recursive Elimination',
+}
+
+MAX_CACHED_RANKINGS = 8
+
+
+def rank_features(X, y, n_samples=DEFAULT_SAMPLE_SIZE, with_rfe=True, n_workers=1, random_state=42):
+    """Ranking setiap feature; kembalikan ``(ranking, kurva_rfe)``.
+
+    ``ranking`` berisi skor dan rank (1 = terbaik) per metode serta rank
+    gabungan, diurutkan dari yang terbaik. ``kurva_rfe`` berisi accuracy CV
+    untuk setiap jumlah feature (None jika ``with_rfe=False``).
+    """
+    X_sample, y_sample = stratified_sample(X, y, n_samples, random_state)
+    X_values = X_sample.to_numpy(dtype=np.float64)
+    y_values = np.asarray(y_sample)
+
+    discrete = np.array([pd.api.types.is_integer_dtype(X_sample[col]) for col in X_sample.columns])
+    mutual_info = mutual_info_classif(X_values, y_values, discrete_features=discrete, random_state=random_state)
+    chi2_scores, chi2_pvalues = chi2(MinMaxScaler().fit_transform(X_values), y_values)
+
+    ranking = pd.DataFrame({
+        'Feature': list(X_sample.columns),
+        'Mutual Information': mutual_info,
+        'Chi-Square': np.nan_to_num(chi2_scores),
+        'p-value': chi2_pvalues,
+    })
+    ranking['Rank MI'] = ranking['Mutual Information'].rank(ascending=False, method='min').astype(int)
+    ranking['Rank Chi2'] = ranking['Chi-Square'].rank(ascending=False, method='min').astype(int)
+    rank_columns = ['Rank MI', 'Rank Chi2']
+
+    rfe_curve = None
+    if with_rfe:
+        selector = RFECV(
+            RandomForestClassifier(n_jobs=1, random_state=random_state, **RFE_PARAMS),
+            step=1,
+            min_features_to_select=1,
+            cv=StratifiedKFold(n_splits=RFE_CV, shuffle=True, random_state=random_state),
+            scoring='accuracy',
+            n_jobs=n_workers,
+        )
+        selector.fit(X_values, y_values)
+        # ranking_ = 1 untuk semua feature terpilih; urutkan dengan importance
+        # forest terakhir, feature yang dieliminasi menyusul sesuai urutan eliminasi
+        selected = selector.ranking_ == 1
+        n_selected = int(selected.sum())
+        rfe_rank = selector.ranking_ + n_selected - 1
+        order = np.argsort(-selector.estimator_.feature_importances_)
+        rfe_rank[np.flatnonzero(selected)[order]] = np.arange(1, n_selected + 1)
+        ranking['Rank RFE'] = rfe_rank
+        rank_columns.append('Rank RFE')
+
+        rfe_curve = pd.DataFrame({
+            'Jumlah Features': np.arange(1, len(selector.cv_results_['mean_test_score']) + 1),
+            'CV Accuracy': selector.cv_results_['mean_test_score'],
+            'Std': selector.cv_results_['std_test_score'],
+        })
+
+    ranking['Rank Gabungan'] = ranking[rank_columns].mean(axis=1).rank(method='min').astype(int)
+    ranking = ranking.sort_values(['Rank Gabungan', 'Rank MI']).reset_index(drop=True)
+    return ranking, rfe_curve
+
+
+def select_top_features(ranking, method, k):
+    """``k`` feature terbaik menurut ``method`` (key ``RANKING_METHODS``)."""
+    column = {
+        'combined': 'Rank Gabungan',
+        'mutual_info': 'Rank MI',
+        'chi2': 'Rank Chi2',
+        'rfe': 'Rank RFE',
+    }[method]
+    return ranking.sort_values([column, 'Rank Gabungan'])['Feature'].head(k).tolist()
+
+
+_rankings = OrderedDict()
+_rankings_lock = threading.Lock()
+
+
+def get_cached_ranking(key):
+    """Ranking yang sudah dihitung untuk ``key``, atau None."""
+    with _rankings_lock:
+        result = _rankings.get(key)
+        if result is not None:
+            _rankings.move_to_end(key)
+        return result
+
+
+def cache_ranking(key, result):
+    with _rankings_lock:
+        _rankings[key] = result
+        _rankings.move_to_end(key)
+        while len(_rankings) > MAX_CACHED_RANKINGS:
+            _rankings.popitem(last=False)
+    return result
@@ -0,0 +1,207 @@
+"""Evaluator Random Forest berbasis array NumPy yang diratakan (flattened).
+
+Semua tree di forest digabung menjadi satu set array node yang bersebelahan:
+``feature``, ``threshold``, ``children`` (index node global anak kanan dan
+kiri, berselang-seling) dan ``value`` (probabilitas kelas per node yang sudah dinormalisasi). Batch
+dievaluasi untuk semua tree sekaligus dengan operasi vektor, satu langkah
+per level kedalaman, sehingga tidak ada overhead per tree seperti pada
+``model.predict``.
+
+Hasilnya identik dengan sklearn: input diubah ke float32 seperti sklearn,
+threshold tetap float64, dan probabilitas dijumlahkan berurutan per tree
+lalu dibagi jumlah tree.
+
+Array bisa disimpan sebagai file ``.npy`` per array dan dimuat dengan
+memory-map, sehingga beberapa proses bisa berbagi node forest yang sama.
+
+Evaluasi per level kedalaman unggul untuk batch kecil (overhead per panggilan
+dan per tree hilang); untuk batch besar traversal Cython milik sklearn tetap
+lebih cepat, lihat ``benchmark``.
+"""
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+ARRAY_NAMES = ('feature', 'threshold', 'children', 'value', 'roots', 'classes')
+META_NAME = 'depth.npy'
+
+TREE_LEAF = -1
+
+
+class FlatForest:
+    """Forest dalam bentuk array node yang bersebelahan."""
+
+    def __init__(self, feature, threshold, children, value, roots, classes, max_depth):
+        self.feature = feature
+        self.threshold = threshold
+        # Anak kanan/kiri berselang-seling: children[2*node + (x <= threshold)]
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.classes = classes
+        self.max_depth = int(max_depth)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in ARRAY_NAMES)
+
+    @classmethod
+    def from_model(cls, model):
+        """Ekspor ``RandomForestClassifier`` yang sudah di-fit."""
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(offset, offset + n_nodes, dtype=np.int32)
+            is_leaf = tree.children_left == TREE_LEAF
+
+            # Leaf menunjuk ke dirinya sendiri, sehingga evaluasi bisa berjalan
+            # max_depth langkah tanpa cek leaf di setiap langkah
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+            left = np.where(is_leaf, node_ids, tree.children_left + offset)
+            right = np.where(is_leaf, node_ids, tree.children_right + offset)
+            children.append(np.stack([right, left], axis=1).astype(np.int32).ravel())
+
+            # Normalisasi sama seperti DecisionTreeClassifier.predict_proba
+            value = tree.value[:, 0, :].astype(np.float64)
+            normalizer = value.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(value / normalizer)
+
+            roots.append(offset)
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            children=np.concatenate(children),
+            value=np.ascontiguousarray(np.concatenate(values)),
+            roots=np.asarray(roots, dtype=np.int32),
+            classes=np.asarray(model.classes_),
+            max_depth=max_depth,
+        )
+
+    def apply(self, X):
+        """Index node leaf (global) untuk setiap (tree, baris): shape (n_trees, n)."""
+        X = np.ascontiguousarray(np.asarray(X, dtype=np.float32))
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        row_offsets = np.arange(n_rows, dtype=np.int64) * n_features
+
+        nodes = np.repeat(self.roots[:, np.newaxis], n_rows, axis=1)
+        for _ in range(self.max_depth):
+            # float32 <= float64 dibandingkan dalam float64, sama seperti sklearn
+            go_left = flat_X[row_offsets + self.feature[nodes]] <= self.threshold[nodes]
+            nodes = self.children[nodes * 2 + go_left]
+        return nodes
+
+    def predict_proba(self, X):
+        leaves = self.apply(X)
+        proba = np.zeros((leaves.shape[1], self.value.shape[1]))
+        for tree_leaves in leaves:
+            proba += self.value[tree_leaves]
+        return proba / self.n_trees
+
+    def predict(self, X):
+        return self.classes.take(self.predict_proba(X).argmax(axis=1), axis=0)
+
+    def contributions(self, X, class_index=-1):
+        """Atribusi per baris per fitur untuk probabilitas kelas ``class_index``.
+
+        Setiap langkah dari node ke anaknya mengubah probabilitas kelas;
+        perubahan itu diberikan ke fitur yang dipakai untuk split di node
+        tersebut (dekomposisi path, gaya Saabas), lalu dirata-rata semua tree.
+        Mengembalikan ``(bias, kontribusi)`` dengan
+        ``bias + kontribusi.sum(axis=1) == predict_proba(X)[:, class_index]``.
+        """
+        X = np.ascontiguousarray(np.asarray(X, dtype=np.float32))
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        row_offsets = np.arange(n_rows, dtype=np.int64) * n_features
+        class_value = self.value[:, class_index]
+
+        totals = np.zeros(n_rows * n_features)
+        nodes = np.repeat(self.roots[:, np.newaxis], n_rows, axis=1)
+        for _ in range(self.max_depth):
+            features = self.feature[nodes]
+            go_left = flat_X[row_offsets + features] <= self.threshold[nodes]
+            children = self.children[nodes * 2 + go_left]
+            # Leaf menunjuk ke dirinya sendiri, jadi perubahannya nol
+            delta = class_value[children] - class_value[nodes]
+            totals += np.bincount((row_offsets + features).ravel(), weights=delta.ravel(), minlength=len(totals))
+            nodes = children
+        bias = float(class_value[self.roots].mean())
+        return bias, totals.reshape(n_rows, n_features) / self.n_trees
+
+    def save(self, directory):
+        """Simpan setiap array sebagai ``.npy`` agar bisa di-memory-map."""
+        os.makedirs(directory, exist_ok=True)
+        for name in ARRAY_NAMES:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        np.save(os.path.join(directory, META_NAME), np.asarray(self.max_depth))
+        return directory
+
+    @classmethod
+    def load(cls, directory, mmap_mode='r'):
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode, allow_pickle=False)
+            for name in ARRAY_NAMES
+        }
+        max_depth = np.load(os.path.join(directory, META_NAME))
+        return cls(max_depth=int(max_depth), **arrays)
+
+
+def is_supported(model):
+    """True jika ``model`` adalah forest klasifikasi sklearn yang bisa diekspor."""
+    estimators = getattr(model, 'estimators_', None)
+    return bool(estimators) and all(hasattr(estimator, 'tree_') for estimator in estimators)
+
+
+def benchmark(forest, model, X, batch_sizes=(1, 10, 100, 1000, 10000), repeat=5):
+    """Bandingkan waktu ``model.predict`` dengan ``forest.predict`` per ukuran batch.
+
+    Setiap ukuran batch diukur ``repeat`` kali dan diambil median. Kolom
+    ``identical`` memastikan kedua evaluator menghasilkan prediksi yang sama.
+    """
+    X = pd.DataFrame(X)
+    rows = []
+    for batch_size in batch_sizes:
+        if batch_size > len(X):
+            continue
+        batch = X.iloc[:batch_size]
+        batch_array = batch.to_numpy(dtype=np.float32)
+
+        sklearn_times, flat_times = [], []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            expected = model.predict(batch)
+            sklearn_times.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            actual = forest.predict(batch_array)
+            flat_times.append(time.perf_counter() - started)
+
+        sklearn_ms = float(np.median(sklearn_times)) * 1000
+        flat_ms = float(np.median(flat_times)) * 1000
+        rows.append({
+            'batch_size': batch_size,
+            'sklearn_ms': sklearn_ms,
+            'flat_ms': flat_ms,
+            'speedup': sklearn_ms / flat_ms if flat_ms > 0 else float('inf'),
+            'identical': bool(np.array_equal(expected, actual)),
+        })
+    return pd.DataFrame(rows)
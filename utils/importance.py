@@ -0,0 +1,114 @@
+"""Permutation importance dan atribusi per baris untuk model hasil training.
+
+Impurity importance (``model.feature_importances_``) bias ke kolom dengan
+banyak nilai unik seperti City dan Profession hasil label encoding.
+Permutation importance mengukur turunnya akurasi saat satu kolom diacak,
+sehingga tidak terpengaruh jumlah kategori.
+
+Biaya dibatasi dengan subsampel berstrata (ukurannya menentukan lama
+perhitungan), dan pengacakan dijalankan paralel di beberapa worker. Atribusi
+per baris (gaya SHAP) memakai dekomposisi path di ``FlatForest``.
+
+Hasil disimpan per model di cache proses, sehingga grafik tidak dihitung
+ulang setiap rerun.
+"""
+import copy
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from sklearn.inspection import permutation_importance
+from sklearn.model_selection import train_test_split
+
+from utils.forest_eval import FlatForest, is_supported
+
+DEFAULT_SAMPLE_SIZE = 5_000
+DEFAULT_REPEATS = 5
+# Atribusi per baris menyimpan array (n_baris, n_fitur); cukup sebagian kecil
+MAX_ATTRIBUTION_ROWS = 2_000
+
+MAX_CACHED_IMPORTANCES = 16
+
+
+def stratified_sample(X, y, n_samples, random_state=42):
+    """Subsampel ``(X, y)`` berstrata berukuran ``n_samples`` (semua jika cukup)."""
+    if n_samples >= len(y):
+        return X, y
+    X_sample, _, y_sample, _ = train_test_split(
+        X, y, train_size=n_samples, stratify=y, random_state=random_state
+    )
+    return X_sample, y_sample
+
+
+def compute_permutation_importance(model, X, y, n_samples=DEFAULT_SAMPLE_SIZE, n_repeats=DEFAULT_REPEATS,
+                                   n_workers=1, random_state=42):
+    """Permutation importance (turunnya accuracy) per fitur sebagai DataFrame.
+
+    Kolom diacak ``n_repeats`` kali pada subsampel berstrata berukuran
+    ``n_samples``; pengacakan dibagi ke ``n_workers`` worker.
+    """
+    X_sample, y_sample = stratified_sample(X, y, n_samples, random_state)
+    # Paralel di level kolom; forest sendiri cukup satu thread per worker
+    scorer_model = copy.copy(model)
+    if hasattr(scorer_model, 'n_jobs'):
+        scorer_model.n_jobs = 1
+    result = permutation_importance(
+        scorer_model, X_sample, y_sample,
+        scoring='accuracy',
+        n_repeats=n_repeats,
+        n_jobs=n_workers,
+        random_state=random_state,
+    )
+    return pd.DataFrame({
+        'Feature': list(X.columns),
+        'Importance': result.importances_mean,
+        'Std': result.importances_std,
+    }).sort_values('Importance', ascending=False).reset_index(drop=True)
+
+
+def compute_attributions(model, X, n_rows=MAX_ATTRIBUTION_ROWS, forest=None, random_state=42):
+    """Atribusi per baris untuk probabilitas kelas positif.
+
+    Mengembalikan ``(bias, attributions)``: ``attributions`` adalah DataFrame
+    (index sama dengan baris ``X`` yang dipakai) dengan satu kolom per fitur.
+    ``forest`` bisa diisi ``FlatForest`` yang sudah ada (mis. dari registry).
+    """
+    if forest is None:
+        if not is_supported(model):
+            raise ValueError("Atribusi per baris hanya tersedia untuk model Random Forest")
+        forest = FlatForest.from_model(model)
+    if len(X) > n_rows:
+        X = X.sample(n=n_rows, random_state=random_state)
+    bias, contributions = forest.contributions(X.to_numpy(dtype=np.float32))
+    return bias, pd.DataFrame(contributions, index=X.index, columns=X.columns)
+
+
+def summarize_attributions(attributions):
+    """Rata-rata |atribusi| per fitur, diurutkan dari yang terbesar."""
+    return pd.DataFrame({
+        'Feature': attributions.columns,
+        'Mean |Attribution|': attributions.abs().mean().to_numpy(),
+    }).sort_values('Mean |Attribution|', ascending=False).reset_index(drop=True)
+
+
+_importances = OrderedDict()
+_importances_lock = threading.Lock()
+
+
+def get_cached_importance(key):
+    """Hasil yang sudah dihitung untuk ``key``, atau None."""
+    with _importances_lock:
+        result = _importances.get(key)
+        if result is not None:
+            _importances.move_to_end(key)
+        return result
+
+
+def cache_importance(key, result):
+    with _importances_lock:
+        _importances[key] = result
+        _importances.move_to_end(key)
+        while len(_importances) > MAX_CACHED_IMPORTANCES:
+            _importances.popitem(last=False)
+    return result
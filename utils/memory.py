@@ -0,0 +1,73 @@
+"""Pengukuran memori tanpa dependensi tambahan.
+
+``frame_nbytes`` menghitung ukuran data sebuah frame dari ``nbytes`` array
+kolomnya. Nilainya pasti dan tidak dipengaruhi aktivitas lain di proses,
+jadi dipakai untuk laporan di UI.
+
+``TracedMemory`` mengukur alokasi selama suatu blok kode dengan
+``tracemalloc``. Tracing berlaku untuk seluruh proses: selama blok berjalan
+alokasi Python di thread lain ikut melambat dan ikut terhitung. Yang
+terhitung hanya alokasi lewat allocator Python/NumPy; buffer Arrow atau
+memori yang dialokasikan langsung oleh C extension (mis. node tree sklearn)
+tidak ikut terhitung.
+"""
+import threading
+import tracemalloc
+
+# tracemalloc hanya bisa dipakai satu pengukuran dalam satu waktu
+_tracing_lock = threading.Lock()
+
+
+def frame_nbytes(df, n_rows=None):
+    """Ukuran data kolom ``df`` dalam byte (tanpa index), dari ``nbytes``.
+
+    Dengan ``n_rows``, ukuran diskalakan ke jumlah baris tersebut, mis. untuk
+    subset baris yang tidak perlu dibuat hanya untuk diukur.
+    """
+    nbytes = int(df.memory_usage(index=False).sum())
+    if n_rows is None or len(df) == 0:
+        return nbytes
+    return nbytes * n_rows // len(df)
+
+
+class TracedMemory:
+    """Context manager: puncak alokasi dan alokasi yang tersisa selama blok berjalan.
+
+    Hanya alokasi sejak blok dimulai yang dilacak, jadi ``peak_bytes`` adalah
+    tambahan memori terbesar di atas kondisi awal. ``retained_bytes`` adalah
+    alokasi blok yang masih dipegang setelah blok selesai (mis. hasilnya).
+
+    Jika tracing sudah aktif (pengukuran lain sedang berjalan), ``optional=True``
+    menjalankan blok tanpa mengukur dan kedua nilai tetap None; tanpanya
+    RuntimeError.
+
+    Contoh::
+
+        with TracedMemory() as memory:
+            df.fillna(0)
+        memory.peak_bytes, memory.retained_bytes
+    """
+
+    def __init__(self, optional=False):
+        self.optional = optional
+        self.peak_bytes = None
+        self.retained_bytes = None
+        self._started = False
+
+    def __enter__(self):
+        with _tracing_lock:
+            if tracemalloc.is_tracing():
+                if self.optional:
+                    return self
+                raise RuntimeError("tracemalloc sudah aktif; TracedMemory tidak bisa dipakai bertingkat")
+            tracemalloc.start()
+            self._started = True
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._started:
+            with _tracing_lock:
+                self.retained_bytes, self.peak_bytes = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+            self._started = False
+        return False
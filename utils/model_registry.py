@@ -0,0 +1,211 @@
+"""Registry model hasil training yang tersimpan di disk.
+
+Setiap model disimpan di folder sendiri di bawah ``REGISTRY_DIR``:
+
+- ``model.joblib``: artefak terkompresi berisi forest, tabel encoder, dan
+  pipeline preprocessing yang dipakai saat training
+- ``flat/``: node forest dalam bentuk array ``.npy`` (lihat
+  ``utils.forest_eval``) yang dimuat dengan memory-map
+- ``meta.json``: fitur, parameter, metrik, hasil evaluasi, skema input form
+  prediksi, dan fingerprint data training (key versi data dari
+  ``DatasetStore``)
+
+ID model diturunkan dari fingerprint data, fitur, dan parameter, sehingga
+training ulang dengan konfigurasi yang sama menghasilkan ID yang sama.
+Model yang sudah dimuat disimpan per proses dan dipakai bersama oleh semua
+session.
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+import joblib
+
+from utils.data_loader import derive_key
+from utils.forest_eval import FlatForest, is_supported
+
+REGISTRY_DIR = os.environ.get("AKDAT_MODEL_DIR", os.path.join('model', 'registry'))
+MODEL_FILENAME = 'model.joblib'
+META_FILENAME = 'meta.json'
+FLAT_DIRNAME = 'flat'
+COMPRESS_LEVEL = 3
+
+# Jumlah model yang disimpan di memori proses (forest bisa berukuran besar)
+MAX_LOADED_MODELS = 4
+
+# Jumlah model di disk; model terlama dihapus setelah training baru
+MAX_REGISTERED_MODELS = int(os.environ.get("AKDAT_MAX_REGISTERED_MODELS", 20))
+
+
+class RegisteredModel:
+    """Model dari registry beserta artefak pendukung dan metadatanya."""
+
+    def __init__(self, model_id, model, meta, encoders=None, pipeline=None, extras=None):
+        self.model_id = model_id
+        self.model = model
+        self.meta = meta
+        self.encoders = encoders
+        self.pipeline = pipeline
+        self.extras = extras or {}
+
+    @property
+    def features(self):
+        return self.meta['features']
+
+    @property
+    def metrics(self):
+        return self.meta.get('metrics', {})
+
+
+def make_model_id(data_key, features, params):
+    """ID model dari fingerprint data training, daftar fitur, dan parameter."""
+    return derive_key(data_key, features=tuple(features), **params)[:20]
+
+
+def headline_accuracy(metrics):
+    """Akurasi utama model: test accuracy, atau akurasi OOB jika tanpa test set."""
+    if metrics.get('test_accuracy') is not None:
+        return metrics['test_accuracy']
+    return metrics.get('oob_accuracy', 0)
+
+
+def _to_builtin(value):
+    # Skalar/array numpy (mis. support di classification report) ke tipe JSON
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f"Tipe {type(value).__name__} tidak bisa disimpan ke JSON")
+
+
+def _model_dir(model_id, registry_dir):
+    return os.path.join(registry_dir, model_id)
+
+
+def register_model(model, features, params, metrics, data_key, encoders=None,
+                   pipeline=None, evaluation=None, feature_schema=None, extras=None,
+                   registry_dir=REGISTRY_DIR):
+    """Simpan model ke registry dan kembalikan ID-nya.
+
+    ``evaluation`` (opsional) berisi hasil evaluasi yang bisa diserialisasi
+    JSON (mis. confusion matrix, classification report) agar tampilan hasil
+    training bisa dipulihkan tanpa training ulang. ``feature_schema``
+    (opsional) menjelaskan input yang valid per fitur untuk form prediksi.
+    ``extras`` (opsional) berisi objek tambahan non-JSON (mis. index split dan
+    prediksi test) yang ikut disimpan di artefak model.
+    """
+    model_id = make_model_id(data_key, features, params)
+    meta = {
+        'model_id': model_id,
+        'model_type': type(model).__name__,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'data_key': data_key,
+        'features': list(features),
+        'params': params,
+        'metrics': metrics,
+        'evaluation': evaluation or {},
+        'feature_schema': feature_schema or {},
+    }
+    artifact = {'model': model, 'encoders': encoders, 'pipeline': pipeline, 'extras': extras or {}}
+
+    # Tulis ke folder sementara lalu rename, agar pembaca tidak pernah melihat
+    # model yang setengah tersimpan
+    os.makedirs(registry_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=f".{model_id}-", dir=registry_dir)
+    try:
+        joblib.dump(artifact, os.path.join(tmp_dir, MODEL_FILENAME), compress=COMPRESS_LEVEL)
+        meta['size_bytes'] = os.path.getsize(os.path.join(tmp_dir, MODEL_FILENAME))
+        if is_supported(model):
+            FlatForest.from_model(model).save(os.path.join(tmp_dir, FLAT_DIRNAME))
+        with open(os.path.join(tmp_dir, META_FILENAME), 'w') as f:
+            json.dump(meta, f, indent=2, default=_to_builtin)
+
+        final_dir = _model_dir(model_id, registry_dir)
+        if os.path.exists(final_dir):
+            shutil.rmtree(final_dir)
+        os.replace(tmp_dir, final_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    with _loaded_lock:
+        _loaded.pop((registry_dir, model_id), None)
+    return model_id
+
+
+def read_meta(model_id, registry_dir=REGISTRY_DIR):
+    with open(os.path.join(_model_dir(model_id, registry_dir), META_FILENAME)) as f:
+        return json.load(f)
+
+
+def list_models(registry_dir=REGISTRY_DIR):
+    """Metadata semua model di registry, terbaru lebih dulu."""
+    if not os.path.isdir(registry_dir):
+        return []
+    models = []
+    for name in os.listdir(registry_dir):
+        if name.startswith('.'):
+            continue
+        try:
+            models.append(read_meta(name, registry_dir))
+        except (OSError, ValueError):
+            continue
+    return sorted(models, key=lambda meta: meta.get('created_at', ''), reverse=True)
+
+
+_loaded = OrderedDict()
+_loaded_lock = threading.Lock()
+
+
+def load_model(model_id, registry_dir=REGISTRY_DIR):
+    """Muat model dari registry; hasilnya dipakai bersama lintas session."""
+    cache_key = (registry_dir, model_id)
+    with _loaded_lock:
+        registered = _loaded.get(cache_key)
+        if registered is not None:
+            _loaded.move_to_end(cache_key)
+            return registered
+
+    meta = read_meta(model_id, registry_dir)
+    artifact = joblib.load(os.path.join(_model_dir(model_id, registry_dir), MODEL_FILENAME))
+    registered = RegisteredModel(
+        model_id, artifact['model'], meta,
+        encoders=artifact.get('encoders'),
+        pipeline=artifact.get('pipeline'),
+        extras=artifact.get('extras'),
+    )
+    with _loaded_lock:
+        _loaded[cache_key] = registered
+        while len(_loaded) > MAX_LOADED_MODELS:
+            _loaded.popitem(last=False)
+    return registered
+
+
+def load_flat_forest(model_id, registry_dir=REGISTRY_DIR):
+    """``FlatForest`` milik model (memory-mapped), atau None jika tidak ada.
+
+    Array dibaca lewat page cache OS, jadi semua proses yang memuat model
+    yang sama berbagi memori fisik yang sama.
+    """
+    directory = os.path.join(_model_dir(model_id, registry_dir), FLAT_DIRNAME)
+    if not os.path.isdir(directory):
+        return None
+    return FlatForest.load(directory, mmap_mode='r')
+
+
+def delete_model(model_id, registry_dir=REGISTRY_DIR):
+    with _loaded_lock:
+        _loaded.pop((registry_dir, model_id), None)
+    shutil.rmtree(_model_dir(model_id, registry_dir), ignore_errors=True)
+
+
+def prune_registry(max_models=MAX_REGISTERED_MODELS, keep=(), registry_dir=REGISTRY_DIR):
+    """Hapus model terlama sampai tersisa ``max_models``; ID di ``keep`` dilewati."""
+    removed = []
+    for meta in list_models(registry_dir)[max_models:]:
+        if meta['model_id'] not in keep:
+            delete_model(meta['model_id'], registry_dir)
+            removed.append(meta['model_id'])
+    return removed
@@ -0,0 +1,154 @@
+"""Prediksi satu mahasiswa dengan latency rendah.
+
+``StudentPredictor`` menyiapkan semua yang dibutuhkan sekali saat dibuat
+(lookup kode kategori, mapping Sleep Duration, urutan fitur), sehingga satu
+prediksi hanya berupa beberapa lookup dict dan evaluasi ``FlatForest`` tanpa
+membuat DataFrame. Predictor disimpan per proses untuk setiap model, sehingga
+model tetap "hangat" untuk semua session.
+
+Hasil encoding sama dengan ``CategoricalEncoder`` di pipeline preprocessing.
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+
+import numpy as np
+import pandas as pd
+
+from utils.forest_eval import FlatForest, is_supported
+from utils.model_registry import load_flat_forest, load_model
+from utils.preprocessing import FINANCIAL_STRESS_DEFAULT, SLEEP_DEFAULT, SLEEP_HOURS, UNKNOWN_CODE
+
+# Jumlah pengukuran latency terakhir yang dipakai untuk p50/p99
+LATENCY_WINDOW = 1000
+
+MAX_CACHED_PREDICTORS = 4
+
+
+def build_feature_schema(df, features, encoders=None):
+    """Skema input form untuk setiap fitur (pilihan kategori atau rentang angka).
+
+    ``df`` adalah data hasil preprocessing yang dipakai training; kolom
+    kategorikal mengambil pilihan dari tabel encoder, bukan dari kode.
+    """
+    encoders = encoders or {}
+    schema = {}
+    for col in features:
+        if col in encoders:
+            schema[col] = {'type': 'category', 'options': [label for label in encoders[col] if label != 'nan']}
+        elif col == 'Sleep Duration':
+            schema[col] = {'type': 'category', 'options': list(SLEEP_HOURS)}
+        else:
+            values = pd.to_numeric(df[col], errors='coerce')
+            schema[col] = {
+                'type': 'number',
+                'min': float(values.min()),
+                'max': float(values.max()),
+                'default': float(values.median()),
+                'integer': bool(pd.api.types.is_integer_dtype(df[col])),
+            }
+    return schema
+
+
+class StudentPredictor:
+    """Encoder + forest yang siap memprediksi satu baris input mentah."""
+
+    def __init__(self, registered):
+        self.model_id = registered.model_id
+        self.features = list(registered.features)
+        self.model = registered.model
+        # Forest yang diratakan dari registry (memory-map); model lama tanpa
+        # folder flat/ diekspor di memori
+        self.forest = load_flat_forest(registered.model_id)
+        if self.forest is None and is_supported(self.model):
+            self.forest = FlatForest.from_model(self.model)
+        self.schema = registered.meta.get('feature_schema') or {}
+
+        encoders = registered.encoders or {}
+        # Lookup label -> kode per kolom (dict Python lebih cepat dari Index untuk 1 nilai)
+        self._codes = {
+            col: {label: code for code, label in enumerate(encoders[col])}
+            for col in self.features if col in encoders
+        }
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+        # Prediksi pertama memuat halaman array memory-map; lakukan sekarang
+        self.predict_proba(self.default_values(), record=False)
+
+    def default_values(self):
+        values = {}
+        for col in self.features:
+            spec = self.schema.get(col, {})
+            if spec.get('type') == 'category':
+                values[col] = spec['options'][0] if spec['options'] else ''
+            else:
+                values[col] = spec.get('default', 0.0)
+        return values
+
+    def encode(self, values):
+        """Ubah dict input mentah menjadi array fitur float32 berbentuk (1, n)."""
+        row = np.empty((1, len(self.features)), dtype=np.float32)
+        for i, col in enumerate(self.features):
+            value = values[col]
+            if col in self._codes:
+                row[0, i] = self._codes[col].get(str(value), UNKNOWN_CODE)
+            elif col == 'Sleep Duration':
+                row[0, i] = SLEEP_HOURS.get(str(value).strip("'\""), SLEEP_DEFAULT)
+            elif col == 'Financial Stress':
+                number = pd.to_numeric(value, errors='coerce')
+                row[0, i] = int(FINANCIAL_STRESS_DEFAULT if pd.isna(number) else number)
+            else:
+                row[0, i] = value
+        return row
+
+    def _forest_proba(self, X):
+        if self.forest is not None:
+            return self.forest.predict_proba(X)
+        return self.model.predict_proba(X)
+
+    def predict_proba(self, values, record=True):
+        """Probabilitas per kelas untuk satu input; latency ikut dicatat."""
+        started = time.perf_counter()
+        proba = self._forest_proba(self.encode(values))[0]
+        elapsed = time.perf_counter() - started
+        if record:
+            with self._lock:
+                self._latencies.append(elapsed)
+        return proba
+
+    def predict(self, values):
+        """Kembalikan ``(kelas, probabilitas_depression)`` untuk satu input."""
+        proba = self.predict_proba(values)
+        classes = list(self.model.classes_)
+        positive = classes.index(1) if 1 in classes else len(classes) - 1
+        return classes[int(proba.argmax())], float(proba[positive])
+
+    def latency_stats(self):
+        """Jumlah pengukuran serta p50 & p99 latency (milidetik)."""
+        with self._lock:
+            latencies = np.array(self._latencies)
+        if len(latencies) == 0:
+            return {'count': 0, 'p50_ms': None, 'p99_ms': None}
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+        return {'count': len(latencies), 'p50_ms': float(p50), 'p99_ms': float(p99)}
+
+
+_predictors = OrderedDict()
+_predictors_lock = threading.Lock()
+
+
+def get_predictor(model_id):
+    """Predictor untuk ``model_id``, dibuat sekali per proses."""
+    with _predictors_lock:
+        predictor = _predictors.get(model_id)
+        if predictor is not None:
+            _predictors.move_to_end(model_id)
+            return predictor
+
+    predictor = StudentPredictor(load_model(model_id))
+    with _predictors_lock:
+        predictor = _predictors.setdefault(model_id, predictor)
+        while len(_predictors) > MAX_CACHED_PREDICTORS:
+            _predictors.popitem(last=False)
+    return predictor
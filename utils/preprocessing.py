@@ -0,0 +1,298 @@
+"""Pipeline preprocessing yang bisa di-fit sekali lalu dipakai ulang.
+
+Langkah-langkah yang dipilih di halaman Preprocessing (missing values,
+duplikat, encoding) dirangkai menjadi satu ``sklearn.pipeline.Pipeline``.
+Setelah di-fit, pipeline bisa disimpan ke disk dan diterapkan ke batch data
+baru dengan satu panggilan ``transform`` tanpa fit ulang.
+
+Semua transformer bekerja pada DataFrame dan mempertahankan index, sehingga
+baris yang dibuang (mis. ``dropna``) tetap bisa dicocokkan dengan data asal.
+"""
+import io
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.pipeline import Pipeline
+
+from utils.data_loader import FrameCache, derive_key
+from utils.duplicates import build_duplicate_index
+
+PIPELINE_PATH = os.path.join('model', 'preprocessing_pipeline.joblib')
+
+# Batas memori cache hasil per langkah untuk setiap session (MB)
+MAX_STEP_CACHE_MB = int(os.environ.get("AKDAT_STEP_CACHE_MB", "256"))
+STEP_CACHE_SESSION_KEY = 'preprocessing_step_cache'
+
+TARGET_COL = 'Depression'
+
+# Jam tidur per kategori Sleep Duration (tanda kutip dibuang sebelum lookup)
+SLEEP_HOURS = {
+    "Less than 5 hours": 4.0,
+    "5-6 hours": 5.5,
+    "7-8 hours": 7.5,
+    "More than 8 hours": 9.0,
+    "Others": 6.0  # Default value
+}
+SLEEP_DEFAULT = 6.0
+FINANCIAL_STRESS_DEFAULT = 3.0
+
+# Kode untuk kategori yang tidak ada saat fit (mis. kota baru di batch baru)
+UNKNOWN_CODE = -1
+
+
+def _as_categorical(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series
+    return series.astype('category')
+
+
+def _map_sleep_hours(series):
+    """Petakan Sleep Duration ke jam lewat kategori unik, bukan per baris."""
+    values = _as_categorical(series)
+    labels = values.cat.categories.astype(str).str.strip("'\"")
+    hours = np.append(pd.Series(labels).map(SLEEP_HOURS).to_numpy(dtype='float64'), np.nan)
+    # Kode -1 (missing) menunjuk ke elemen NaN terakhir
+    result = hours[values.cat.codes.to_numpy()]
+    return pd.Series(result, index=series.index).fillna(SLEEP_DEFAULT)
+
+
+def build_code_table(series):
+    """Tabel kode kategori terurut (string), setara ``LabelEncoder.classes_``.
+
+    Nilai kosong dikodekan sebagai kategori ``'nan'`` seperti ``astype(str)``.
+    Hanya nilai yang benar-benar muncul di data yang masuk tabel: kolom
+    category (hasil kompresi tipe data atau filter baris) bisa membawa
+    kategori yang sudah tidak terpakai, yang akan menggeser kode.
+    """
+    values = _as_categorical(series).cat.remove_unused_categories()
+    labels = values.cat.categories.astype(str).to_numpy(dtype=str)
+    if values.isna().any():
+        labels = np.append(labels, 'nan')
+    return pd.Index(np.unique(labels))
+
+
+def encode_with_table(series, table):
+    """Ubah kolom menjadi kode integer berdasarkan ``table``.
+
+    Kategori yang tidak ada di ``table`` mendapat ``UNKNOWN_CODE``. Lookup
+    dilakukan sekali per kategori unik lalu disebar ke semua baris.
+    """
+    values = _as_categorical(series)
+    lookup = table.get_indexer(values.cat.categories.astype(str))
+    missing_code = table.get_loc('nan') if 'nan' in table else UNKNOWN_CODE
+    lookup = np.append(np.where(lookup < 0, UNKNOWN_CODE, lookup), missing_code)
+    dtype = np.int16 if len(table) < np.iinfo(np.int16).max else np.int32
+    # Kode -1 (missing) menunjuk ke elemen missing_code terakhir
+    codes = lookup[values.cat.codes.to_numpy()].astype(dtype)
+    return pd.Series(codes, index=series.index)
+
+
+def _fill_column(series, value):
+    # Kolom category hanya bisa diisi nilai yang ada di kategorinya
+    if isinstance(series.dtype, pd.CategoricalDtype) and value not in series.cat.categories:
+        series = series.cat.add_categories([value])
+    elif series.dtype == np.float32 and isinstance(value, (int, float, np.number)):
+        # Nilai float64 mengubah kolom float32 (hasil kompresi) menjadi float64
+        value = np.float32(value)
+    return series.fillna(value)
+
+
+class MissingValueHandler(BaseEstimator, TransformerMixin):
+    """Tangani missing values: ``drop``, ``mean``, ``median``, atau ``zero``.
+
+    Untuk ``mean``/``median`` nilai pengisi (dan modus kolom kategorikal)
+    dihitung saat ``fit`` lalu dipakai apa adanya untuk batch baru.
+    Statistik selalu dihitung dalam float64, juga untuk kolom float32 hasil
+    kompresi tipe data; nilai pengisi baru dibulatkan ke float32 saat
+    ditulis ke kolom float32.
+    """
+
+    def __init__(self, method='drop'):
+        self.method = method
+
+    def fit(self, X, y=None):
+        self.fill_values_ = {}
+        if self.method in ('mean', 'median'):
+            numeric = X.select_dtypes(include=['number'])
+            # Hitung di salinan yang writable: frame dari snapshot Arrow memakai
+            # array read-only, sedangkan median pandas menulis ke buffer input
+            values = pd.DataFrame(
+                numeric.to_numpy(dtype=np.float64, na_value=np.nan, copy=True), columns=numeric.columns
+            )
+            stats = values.mean() if self.method == 'mean' else values.median()
+            self.fill_values_.update(stats.dropna().to_dict())
+            for col in X.select_dtypes(include=['object', 'category']).columns:
+                mode = X[col].mode()
+                self.fill_values_[col] = mode.iloc[0] if len(mode) > 0 else 'Unknown'
+        return self
+
+    def transform(self, X):
+        if self.method == 'drop':
+            return X.dropna()
+
+        X = X.copy(deep=False)
+        if self.method == 'zero':
+            fill_values = {col: 0 for col in X.columns}
+        else:
+            fill_values = self.fill_values_
+        for col, value in fill_values.items():
+            if col in X.columns and X[col].isnull().any():
+                X[col] = _fill_column(X[col], value)
+        return X
+
+
+class DuplicateRemover(BaseEstimator, TransformerMixin):
+    """Hapus baris duplikat dari data training.
+
+    Baris dibandingkan lewat hash pada kolom ``subset`` (default: semua kolom
+    kecuali ``id``); baris pertama setiap grup dipertahankan. Kolom ``subset``
+    yang tidak ada di data diabaikan; jika tidak ada yang tersisa (mis.
+    pilihan lama dari dataset lain), kolom default yang dipakai.
+
+    Hanya berlaku saat ``fit_transform``; ``transform`` pada batch baru tidak
+    membuang baris karena setiap baris tetap perlu diprediksi.
+    """
+
+    def __init__(self, subset=None):
+        self.subset = subset
+
+    def fit(self, X, y=None):
+        return self
+
+    def transform(self, X):
+        return X
+
+    def fit_transform(self, X, y=None, **fit_params):
+        subset = None if self.subset is None else [col for col in self.subset if col in X.columns]
+        # Subset kosong membuat semua baris ber-hash sama dan dataset menciut jadi satu baris
+        index = build_duplicate_index(X, subset or None)
+        if index.n_duplicates == 0:
+            return X
+        return X[~index.duplicated_mask(keep='first')]
+
+
+class CategoricalEncoder(BaseEstimator, TransformerMixin):
+    """Konversi Sleep Duration & Financial Stress lalu encoding kategorikal.
+
+    - Sleep Duration dipetakan ke jam (4, 5.5, 7.5, 9; lainnya 6)
+    - Financial Stress dijadikan integer (nilai kosong/'?' menjadi 3)
+    - Kolom kategorikal lain diubah menjadi kode integer dengan urutan yang
+      sama seperti ``LabelEncoder``; kategori baru saat ``transform`` diberi
+      ``UNKNOWN_CODE`` alih-alih error
+    """
+
+    def __init__(self, target_col=TARGET_COL):
+        self.target_col = target_col
+
+    def _convert_special(self, X):
+        X = X.copy(deep=False)
+        # Feature Engineering: Convert Sleep Duration to numerical
+        if 'Sleep Duration' in X.columns:
+            X['Sleep Duration'] = _map_sleep_hours(X['Sleep Duration'])
+
+        # Financial Stress is already numerical (1.0-5.0), convert to integer
+        if 'Financial Stress' in X.columns:
+            stress = pd.to_numeric(X['Financial Stress'], errors='coerce')
+            X['Financial Stress'] = stress.fillna(FINANCIAL_STRESS_DEFAULT).astype(int)
+        return X
+
+    def fit(self, X, y=None):
+        X = self._convert_special(X)
+        categorical_cols = X.select_dtypes(include=['object', 'category']).columns
+        self.encoders_ = {
+            col: build_code_table(X[col])
+            for col in categorical_cols
+            if col != self.target_col
+        }
+        return self
+
+    def transform(self, X):
+        X = self._convert_special(X)
+        for col, table in self.encoders_.items():
+            if col in X.columns:
+                X[col] = encode_with_table(X[col], table)
+        return X
+
+
+def build_pipeline(steps):
+    """Rangkai langkah preprocessing terpilih menjadi ``Pipeline`` (belum di-fit).
+
+    ``steps`` adalah dict opsi dari halaman Preprocessing: ``handle_missing``,
+    ``missing_method``, ``remove_duplicates``, ``duplicate_subset`` (kolom
+    kunci, None = semua kecuali ``id``), dan ``encode_categorical``.
+    """
+    pipeline_steps = []
+    if steps.get('handle_missing'):
+        pipeline_steps.append(('missing', MissingValueHandler(method=steps.get('missing_method', 'drop'))))
+    if steps.get('remove_duplicates'):
+        pipeline_steps.append(('duplicates', DuplicateRemover(subset=steps.get('duplicate_subset'))))
+    if steps.get('encode_categorical'):
+        pipeline_steps.append(('encode', CategoricalEncoder()))
+    if not pipeline_steps:
+        raise ValueError("Pilih minimal satu langkah preprocessing")
+    return Pipeline(pipeline_steps)
+
+
+def get_step_cache(session_state):
+    """Cache hasil per langkah milik session (LRU dengan batas memori)."""
+    if STEP_CACHE_SESSION_KEY not in session_state:
+        session_state[STEP_CACHE_SESSION_KEY] = FrameCache(MAX_STEP_CACHE_MB * 1024 * 1024)
+    return session_state[STEP_CACHE_SESSION_KEY]
+
+
+def run_pipeline_cached(df, data_key, steps, cache, progress_callback=None):
+    """Fit dan jalankan pipeline langkah demi langkah dengan memoization.
+
+    Hasil setiap langkah disimpan di ``cache`` dengan key dari versi input
+    langkah tersebut plus parameternya. Jika hanya langkah terakhir yang
+    berubah, hasil langkah-langkah sebelumnya diambil dari cache.
+
+    ``progress_callback(nomor_langkah, total, nama, dari_cache)`` dipanggil
+    sebelum setiap langkah. Mengembalikan tuple
+    ``(df_hasil, pipeline_fitted, key_hasil, jumlah_langkah_dari_cache)``.
+    """
+    pipeline = build_pipeline(steps)
+    fitted_steps = []
+    step_key = data_key
+    n_cached = 0
+    total = len(pipeline.steps)
+
+    for number, (name, transformer) in enumerate(pipeline.steps, start=1):
+        step_key = derive_key(step_key, step=name, **transformer.get_params())
+        cached = cache.get(step_key)
+        if progress_callback is not None:
+            progress_callback(number, total, name, cached is not None)
+
+        if cached is not None:
+            transformer, df = cached
+            n_cached += 1
+        else:
+            df = transformer.fit_transform(df)
+            cache.put(step_key, df, value=(transformer, df))
+        fitted_steps.append((name, transformer))
+
+    return df, Pipeline(fitted_steps), step_key, n_cached
+
+
+def save_pipeline(pipeline, path=PIPELINE_PATH):
+    """Simpan pipeline yang sudah di-fit ke disk (terkompresi)."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    joblib.dump(pipeline, path, compress=3)
+    return path
+
+
+def pipeline_to_bytes(pipeline):
+    """Serialisasi pipeline ke bytes (mis. untuk tombol download)."""
+    buffer = io.BytesIO()
+    joblib.dump(pipeline, buffer, compress=3)
+    return buffer.getvalue()
+
+
+def load_pipeline(path=PIPELINE_PATH):
+    """Muat pipeline yang sudah di-fit dari disk."""
+    return joblib.load(path)
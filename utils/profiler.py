@@ -0,0 +1,331 @@
+"""Profiling dataset satu kali jalan (single pass).
+
+``StreamingProfiler`` menerima data per chunk dan mengakumulasi jumlah baris,
+missing values, jumlah duplikat, kardinalitas per kolom, ringkasan numerik
+(setara ``describe()``), serta sampel baris acak berukuran tetap. Memori yang
+dipakai tidak bergantung pada jumlah baris kecuali hash baris untuk menghitung
+duplikat; hash tersebut dikelola ``PartitionedHashIndex`` yang bisa di-spill
+ke disk. Duplikat dihitung pada kolom kunci (semua kolom kecuali ``id``).
+
+``get_profile`` memprofiling DataFrame di memori sekali per versi data
+(``data_key``) dan menyimpan hasilnya untuk dipakai semua halaman.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from utils.data_loader import NA_VALUES, normalize_frame
+from utils.duplicates import PartitionedHashIndex, combine_hashes, default_key_columns, hash_column
+
+TARGET_COL = 'Depression'
+
+# Kolom dengan jumlah nilai unik melebihi batas ini berhenti dilacak secara
+# exact agar memori tetap terbatas pada kolom berkardinalitas tinggi (mis. id)
+MAX_TRACKED_UNIQUE = 1_000_000
+
+# Jumlah profile yang disimpan di cache (profile berukuran kecil)
+MAX_CACHED_PROFILES = 64
+
+
+class DatasetProfile:
+    """Hasil profiling sebuah dataset (read-only)."""
+
+    def __init__(self, n_rows, dtypes, kinds, missing, nunique, n_duplicates,
+                 numeric_summary, target_counts, nunique_capped=(), duplicate_index=None):
+        self.n_rows = n_rows
+        # dtypes: nama dtype asli (mis. 'int8', 'category');
+        # kinds: 'int64' / 'float64' / 'object' untuk pengelompokan kolom
+        self.dtypes = dtypes
+        self.kinds = kinds
+        self.missing = missing
+        self.nunique = nunique
+        # n_duplicates dihitung pada kolom kunci duplicate_index.key_columns
+        self.n_duplicates = n_duplicates
+        self.duplicate_index = duplicate_index
+        self.numeric_summary = numeric_summary
+        self.target_counts = target_counts
+        self.nunique_capped = frozenset(nunique_capped)
+
+    @property
+    def columns(self):
+        return self.dtypes.index.tolist()
+
+    @property
+    def n_cols(self):
+        return len(self.dtypes)
+
+    @property
+    def total_missing(self):
+        return int(self.missing.sum())
+
+    @property
+    def categorical_cols(self):
+        return [col for col, kind in self.kinds.items() if kind == 'object']
+
+    @property
+    def numerical_cols(self):
+        return [col for col, kind in self.kinds.items() if kind in ('int64', 'float64')]
+
+
+class StreamingProfiler:
+    """Akumulator statistik dataset yang diisi chunk demi chunk."""
+
+    def __init__(self, target_col=TARGET_COL, sample_size=200_000, random_state=42):
+        self.target_col = target_col
+        self.sample_size = sample_size
+        self._rng = np.random.default_rng(random_state)
+
+        self.n_rows = 0
+        self._dtypes = {}
+        self._dtype_names = {}
+        self._missing = {}
+        self._unique_hashes = {}
+        self._capped = set()
+        self._key_columns = None
+        self._row_hashes = None
+        self._target_counts = pd.Series(dtype='int64')
+
+        # Statistik numerik: count, mean, M2 (jumlah kuadrat deviasi), min, max
+        self._num_stats = {}
+
+        # Reservoir sampel baris: simpan baris dengan kunci acak terkecil
+        self._sample = None
+        self._sample_keys = np.empty(0)
+
+    def update(self, chunk):
+        if len(chunk) == 0:
+            return
+        offset = self.n_rows
+        self.n_rows += len(chunk)
+
+        if self._row_hashes is None:
+            self._key_columns = set(default_key_columns(chunk.columns))
+            self._row_hashes = PartitionedHashIndex(
+                [col for col in chunk.columns if col in self._key_columns]
+            )
+
+        row_hashes = np.zeros(len(chunk), dtype='uint64')
+        for col in chunk.columns:
+            series = chunk[col]
+            self._update_dtype(col, series)
+            notna = series.notna().to_numpy()
+            self._missing[col] = self._missing.get(col, 0) + int(len(notna) - notna.sum())
+            col_hashes = hash_column(series)
+            if col in self._key_columns:
+                row_hashes = combine_hashes(row_hashes, col_hashes)
+            self._update_unique(col, col_hashes[notna])
+            if self._dtypes[col] != 'object':
+                self._update_numeric(col, series)
+        self._row_hashes.add(row_hashes)
+
+        if self.target_col in chunk.columns:
+            counts = chunk[self.target_col].value_counts()
+            self._target_counts = self._target_counts.add(counts, fill_value=0).astype('int64')
+
+        self._update_sample(chunk, offset)
+
+    def _update_dtype(self, col, series):
+        if pd.api.types.is_integer_dtype(series):
+            dtype = 'int64'
+        elif pd.api.types.is_float_dtype(series):
+            dtype = 'float64'
+        else:
+            dtype = 'object'
+
+        name = str(series.dtype)
+        if self._dtype_names.setdefault(col, name) != name:
+            self._dtype_names[col] = None
+
+        previous = self._dtypes.get(col)
+        if previous is None or previous == dtype:
+            self._dtypes[col] = dtype
+        elif 'object' in (previous, dtype):
+            self._dtypes[col] = 'object'
+            self._num_stats.pop(col, None)
+        else:
+            # Campuran int64 dan float64 -> float64 (sama seperti read_csv)
+            self._dtypes[col] = 'float64'
+
+    def _update_unique(self, col, hashes):
+        if col in self._capped:
+            return
+        parts = self._unique_hashes.setdefault(col, [])
+        parts.append(np.unique(hashes))
+        if sum(len(p) for p in parts) > 2 * len(parts[0]) + 100_000:
+            # Gabungkan sesekali agar daftar potongan tidak tumbuh tanpa batas
+            merged = np.unique(np.concatenate(parts))
+            if len(merged) > MAX_TRACKED_UNIQUE:
+                self._capped.add(col)
+                self._unique_hashes[col] = [merged[:0]]
+            else:
+                self._unique_hashes[col] = [merged]
+
+    def _update_numeric(self, col, series):
+        values = pd.to_numeric(series, errors='coerce').dropna().to_numpy(dtype='float64')
+        if len(values) == 0:
+            return
+        n_b = len(values)
+        mean_b = values.mean()
+        m2_b = ((values - mean_b) ** 2).sum()
+        stats = self._num_stats.get(col)
+        if stats is None:
+            self._num_stats[col] = [n_b, mean_b, m2_b, values.min(), values.max()]
+            return
+        # Penggabungan varians paralel (Chan et al.)
+        n_a, mean_a, m2_a, min_a, max_a = stats
+        n = n_a + n_b
+        delta = mean_b - mean_a
+        stats[0] = n
+        stats[1] = mean_a + delta * n_b / n
+        stats[2] = m2_a + m2_b + delta ** 2 * n_a * n_b / n
+        stats[3] = min(min_a, values.min())
+        stats[4] = max(max_a, values.max())
+
+    def _update_sample(self, chunk, offset):
+        if self.sample_size == 0:
+            return
+        keys = self._rng.random(len(chunk))
+        rows = chunk.reset_index(drop=True)
+        rows.index = pd.RangeIndex(offset, offset + len(chunk))
+        if self._sample is None:
+            candidates, candidate_keys = rows, keys
+        else:
+            candidates = pd.concat([self._sample, rows])
+            candidate_keys = np.concatenate([self._sample_keys, keys])
+        if len(candidates) > self.sample_size:
+            keep = np.argpartition(candidate_keys, self.sample_size)[:self.sample_size]
+            keep.sort()
+            candidates = candidates.iloc[keep]
+            candidate_keys = candidate_keys[keep]
+        self._sample = candidates
+        self._sample_keys = candidate_keys
+
+    @property
+    def sample(self):
+        """Sampel baris acak (urutan asli) berukuran maksimal ``sample_size``."""
+        if self._sample is None:
+            return pd.DataFrame()
+        return self._sample.sort_index()
+
+    def _numeric_summary(self, quantile_source=None):
+        sample = self.sample if quantile_source is None else quantile_source
+        summary = {}
+        for col, (n, mean, m2, vmin, vmax) in self._num_stats.items():
+            if self._dtypes.get(col) == 'object':
+                continue
+            # Kuartil diestimasi dari sampel (exact jika semua baris masuk sampel)
+            values = pd.to_numeric(sample[col], errors='coerce').dropna()
+            q25, q50, q75 = np.percentile(values, [25, 50, 75]) if len(values) else (np.nan,) * 3
+            summary[col] = {
+                'count': float(n),
+                'mean': mean,
+                'std': np.sqrt(m2 / (n - 1)) if n > 1 else np.nan,
+                'min': vmin,
+                '25%': q25,
+                '50%': q50,
+                '75%': q75,
+                'max': vmax,
+            }
+        index = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+        return pd.DataFrame(summary, index=index)
+
+    def finalize(self, quantile_source=None):
+        """Bangun ``DatasetProfile`` dari semua chunk yang sudah diterima.
+
+        ``quantile_source`` (opsional) adalah frame lengkap untuk menghitung
+        kuartil secara exact; default-nya sampel reservoir.
+        """
+        columns = list(self._dtypes)
+        duplicate_index = self._row_hashes.finalize() if self._row_hashes is not None else None
+        n_duplicates = duplicate_index.n_duplicates if duplicate_index is not None else 0
+
+        nunique = {}
+        for col in columns:
+            if col in self._capped:
+                nunique[col] = MAX_TRACKED_UNIQUE
+            else:
+                nunique[col] = len(np.unique(np.concatenate(self._unique_hashes.get(col, [np.empty(0)]))))
+
+        return DatasetProfile(
+            n_rows=self.n_rows,
+            dtypes=pd.Series({
+                # dtype yang berbeda antar chunk ditampilkan sebagai jenisnya
+                col: self._dtype_names[col] or self._dtypes[col] for col in columns
+            }, dtype=object),
+            kinds=pd.Series(self._dtypes, dtype=object)[columns],
+            missing=pd.Series(self._missing, dtype='int64')[columns],
+            nunique=pd.Series(nunique, dtype='int64')[columns],
+            n_duplicates=int(n_duplicates),
+            numeric_summary=self._numeric_summary(quantile_source),
+            target_counts=self._target_counts.sort_index(),
+            nunique_capped=self._capped,
+            duplicate_index=duplicate_index,
+        )
+
+
+def profile_csv_stream(source, chunksize=100_000, na_values=None, sample_size=200_000,
+                       progress_callback=None):
+    """Profiling file CSV secara streaming, per ``chunksize`` baris.
+
+    ``source`` boleh path atau file-like (mis. ``UploadedFile``). Jika
+    ``progress_callback`` diberikan, fungsi ini dipanggil dengan
+    ``(fraksi_selesai, jumlah_baris)`` setelah setiap chunk.
+
+    Mengembalikan tuple ``(profile, sample)``.
+    """
+    if na_values is None:
+        na_values = NA_VALUES
+
+    total_bytes = None
+    if hasattr(source, 'seek') and hasattr(source, 'tell'):
+        source.seek(0, 2)
+        total_bytes = source.tell()
+        source.seek(0)
+
+    profiler = StreamingProfiler(sample_size=sample_size)
+    with pd.read_csv(source, na_values=na_values, chunksize=chunksize) as reader:
+        for chunk in reader:
+            profiler.update(normalize_frame(chunk))
+            if progress_callback is not None:
+                fraction = min(source.tell() / total_bytes, 1.0) if total_bytes else 0.0
+                progress_callback(fraction, profiler.n_rows)
+
+    if progress_callback is not None:
+        progress_callback(1.0, profiler.n_rows)
+    return profiler.finalize(), profiler.sample
+
+
+def profile_dataframe(df, target_col=TARGET_COL):
+    """Profiling DataFrame di memori dalam satu kali jalan (tanpa sampel)."""
+    profiler = StreamingProfiler(target_col=target_col, sample_size=0)
+    profiler.update(df)
+    return profiler.finalize(quantile_source=df)
+
+
+_profile_cache = OrderedDict()
+_profile_cache_lock = threading.Lock()
+
+
+def get_profile(df, data_key=None):
+    """Ambil profile untuk versi data ``data_key``, hitung jika belum ada.
+
+    Profile disimpan per proses sehingga dipakai ulang lintas halaman, rerun,
+    dan session. Tanpa ``data_key`` profile dihitung tanpa disimpan.
+    """
+    if data_key is None:
+        return profile_dataframe(df)
+
+    with _profile_cache_lock:
+        profile = _profile_cache.get(data_key)
+        if profile is not None:
+            _profile_cache.move_to_end(data_key)
+            return profile
+
+    profile = profile_dataframe(df)
+    with _profile_cache_lock:
+        _profile_cache[data_key] = profile
+        while len(_profile_cache) > MAX_CACHED_PROFILES:
+            _profile_cache.popitem(last=False)
+    return profile
@@ -0,0 +1,230 @@
+"""Training model (Random Forest atau Histogram Gradient Boosting) yang
+memanfaatkan model sebelumnya.
+
+Jika data, fitur, split, dan parameter selain ``n_estimators`` sama dengan
+forest yang sudah ada, forest tidak di-training dari awal:
+
+- jumlah tree bertambah: hanya tree baru yang di-fit (``warm_start``)
+- jumlah tree berkurang: tree terakhir dibuang tanpa fit ulang
+
+sklearn menurunkan seed setiap tree dari ``random_state`` secara berurutan,
+jadi hasil kedua cara ini identik dengan training dari awal dengan jumlah
+tree yang sama. Hal yang sama dipakai untuk melaporkan progress: forest
+ditumbuhkan per batch tree, dan training bisa dibatalkan di antara batch.
+
+Histogram Gradient Boosting (``engine='hist_gradient_boosting'``) memakai
+parameter ``n_estimators`` yang sama sebagai jumlah iterasi (``max_iter``,
+satu tree per iterasi untuk klasifikasi biner) dan ditumbuhkan dengan cara
+yang sama. Early stopping dimatikan agar hasilnya tidak bergantung pada
+pembagian batch; memangkas iterasi tidak didukung, jadi di-training ulang.
+
+Untuk data besar, Random Forest di-fit dari satu matriks float32
+(``compact_features``) yang dipakai sklearn tanpa salinan lagi, dan
+``max_samples`` (fraksi data training) membatasi ukuran bootstrap setiap tree.
+"""
+import copy
+import os
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
+
+from utils.data_loader import derive_key
+
+# Mode training yang dilaporkan ke halaman Analysis
+FIT_FULL = 'full'
+FIT_GROW = 'grow'
+FIT_TRIM = 'trim'
+FIT_REUSE = 'reuse'
+
+ENGINE_RF = 'random_forest'
+ENGINE_HGB = 'hist_gradient_boosting'
+ENGINE_LABELS = {
+    ENGINE_RF: 'Random Forest',
+    ENGINE_HGB: 'Histogram Gradient Boosting',
+}
+
+
+class TrainingCancelled(Exception):
+    """Training dihentikan lewat ``should_stop`` sebelum semua tree selesai."""
+
+
+def default_batch_size(n_estimators):
+    # Satu batch minimal sebanyak core agar n_jobs=-1 tetap terpakai penuh,
+    # dan paling banyak sekitar 20 update progress
+    return max(os.cpu_count() or 1, -(-n_estimators // 20))
+
+
+def compact_features(X, positions=None):
+    """Matriks feature float32 dalam satu blok C-contiguous, sebagai DataFrame.
+
+    Random Forest sklearn selalu bekerja dengan float32: DataFrame campuran
+    int64/float64 dikonversi ulang setiap kali ``fit`` dipanggil (termasuk
+    setiap batch warm start), sedangkan matriks ini dipakai langsung. Kolom
+    diisi satu per satu ke array tujuan, jadi salinan sementara hanya sebesar
+    satu kolom. ``positions`` (opsional) memilih baris sekaligus.
+    """
+    index = X.index if positions is None else X.index[positions]
+    values = np.empty((len(index), X.shape[1]), dtype=np.float32)
+    for j, column in enumerate(X.columns):
+        column_values = X[column].to_numpy(dtype=np.float32, na_value=np.nan)
+        values[:, j] = column_values if positions is None else column_values[positions]
+    return pd.DataFrame(values, index=index, columns=X.columns, copy=False)
+
+
+def uses_compact_features(params):
+    # HGB mem-binning data sendiri dari float64, jadi matriks float32 tidak berguna
+    return params.get('engine', ENGINE_RF) == ENGINE_RF
+
+
+def forest_config_key(data_key, features, params):
+    """Key semua hal yang menentukan forest kecuali jumlah tree."""
+    config = {name: value for name, value in params.items() if name != 'n_estimators'}
+    return derive_key(data_key, features=tuple(features), **config)
+
+
+def make_estimator(params):
+    """Estimator belum di-fit untuk ``params`` (``engine`` default Random Forest)."""
+    params = dict(params)
+    engine = params.pop('engine', ENGINE_RF)
+    if engine == ENGINE_HGB:
+        return HistGradientBoostingClassifier(
+            max_iter=params.pop('n_estimators'), early_stopping=False, **params
+        )
+    return RandomForestClassifier(n_jobs=-1, **params)
+
+
+def n_fitted_trees(model):
+    """Jumlah tree (RF) atau iterasi (HGB) yang sudah di-fit."""
+    if isinstance(model, HistGradientBoostingClassifier):
+        return getattr(model, 'n_iter_', 0)
+    return len(getattr(model, 'estimators_', []))
+
+
+def _set_size(model, n_trees):
+    if isinstance(model, HistGradientBoostingClassifier):
+        model.set_params(max_iter=n_trees)
+    else:
+        model.set_params(n_estimators=n_trees)
+
+
+def _clone_fitted(model):
+    if isinstance(model, HistGradientBoostingClassifier):
+        # warm_start HGB menambah ke list predictor internal, jadi salin penuh
+        return copy.deepcopy(model)
+    # Salinan dangkal: tree yang sudah di-fit dipakai bersama (tidak pernah
+    # diubah), tetapi list estimators_ milik salinan sendiri
+    clone = copy.copy(model)
+    clone.estimators_ = list(model.estimators_)
+    return clone
+
+
+def _grow(model, X_train, y_train, n_estimators, batch_size, progress_callback, should_stop):
+    """Tambah tree ke ``model`` per batch sampai berjumlah ``n_estimators``."""
+    n_start = n_fitted_trees(model)
+    batch_size = batch_size or default_batch_size(n_estimators - n_start)
+    # Skor OOB cukup dihitung sekali di batch terakhir, untuk semua tree
+    oob_score = getattr(model, 'oob_score', False)
+    model.set_params(warm_start=True)
+    n_trees = n_start
+    while n_trees < n_estimators:
+        if should_stop is not None and should_stop():
+            raise TrainingCancelled()
+        n_trees = min(n_trees + batch_size, n_estimators)
+        _set_size(model, n_trees)
+        if oob_score:
+            model.set_params(oob_score=n_trees == n_estimators)
+        model.fit(X_train, y_train)
+        if progress_callback is not None:
+            progress_callback(n_trees - n_start, n_estimators - n_start)
+    model.set_params(warm_start=False)
+    return model
+
+
+def oob_predictions(model, y_train):
+    """Prediksi out-of-bag: ``(y_true, y_pred)`` untuk baris yang punya skor OOB.
+
+    Baris yang terambil bootstrap di semua tree tidak punya prediksi OOB dan
+    dilewati (sklearn menghitungnya sebagai kelas pertama di ``oob_score_``).
+    """
+    decision = model.oob_decision_function_
+    has_oob = decision.sum(axis=1) > 0
+    y_pred = model.classes_.take(decision[has_oob].argmax(axis=1), axis=0)
+    return np.asarray(y_train)[has_oob], y_pred
+
+
+def fit_forest(X_train, y_train, params, base_model=None, progress_callback=None,
+               should_stop=None, batch_size=None):
+    """Fit model sesuai ``params`` (lihat ``make_estimator``).
+
+    ``base_model`` adalah model yang sudah di-fit dengan konfigurasi yang
+    sama (selain ``n_estimators``), atau None. Mengembalikan tuple
+    ``(model, mode, n_trees_fitted)``; ``base_model`` tidak diubah.
+
+    Dengan ``oob_score=True`` di ``params``, skor OOB dihitung ulang untuk
+    semua tree; karena itu forest yang dipangkas di-training dari awal.
+
+    ``progress_callback(selesai, total)`` dipanggil setiap satu batch tree
+    baru selesai. ``should_stop()`` dicek sebelum setiap batch; jika True,
+    ``TrainingCancelled`` dilempar.
+    """
+    n_estimators = params['n_estimators']
+    if base_model is not None and n_estimators < n_fitted_trees(base_model):
+        if params.get('oob_score') or params.get('engine', ENGINE_RF) != ENGINE_RF:
+            base_model = None
+    if base_model is None:
+        model = make_estimator(params)
+        _grow(model, X_train, y_train, n_estimators, batch_size, progress_callback, should_stop)
+        return model, FIT_FULL, n_estimators
+
+    n_existing = n_fitted_trees(base_model)
+    model = _clone_fitted(base_model)
+    if n_estimators == n_existing:
+        return model, FIT_REUSE, 0
+
+    if n_estimators < n_existing:
+        model.estimators_ = model.estimators_[:n_estimators]
+        model.set_params(n_estimators=n_estimators)
+        return model, FIT_TRIM, 0
+
+    _grow(model, X_train, y_train, n_estimators, batch_size, progress_callback, should_stop)
+    return model, FIT_GROW, n_estimators - n_existing
+
+
+def model_size_bytes(model):
+    """Ukuran model saat diserialisasi (pickle, tanpa kompresi)."""
+    return len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def compare_engines(X, y, params_by_engine, test_size=20, random_state=42):
+    """Bandingkan engine pada split train/test yang sama.
+
+    ``params_by_engine`` memetakan engine ke ``params`` untuk ``fit_forest``.
+    Mengembalikan DataFrame berisi waktu fit, waktu predict data test, ukuran
+    model, dan accuracy per engine.
+    """
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=test_size/100, random_state=random_state, stratify=y
+    )
+    rows = []
+    for engine, params in params_by_engine.items():
+        started = time.perf_counter()
+        model, _, _ = fit_forest(X_train, y_train, {**params, 'engine': engine})
+        fit_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        y_pred = model.predict(X_test)
+        predict_seconds = time.perf_counter() - started
+
+        rows.append({
+            'Engine': ENGINE_LABELS[engine],
+            'Fit (detik)': fit_seconds,
+            'Predict (detik)': predict_seconds,
+            'Ukuran Model (MB)': model_size_bytes(model) / 1024**2,
+            'Test Accuracy': accuracy_score(y_test, y_pred),
+        })
+    return pd.DataFrame(rows)
@@ -0,0 +1,128 @@
+"""Cache hasil training di halaman Analysis.
+
+Key cache sama dengan ID model di registry: fingerprint data hasil
+preprocessing, daftar fitur, dan semua parameter (termasuk split
+train/test). Jika konfigurasi yang sama di-training lagi, model beserta
+semua hasil evaluasi (metrik, confusion matrix, classification report,
+feature importance, index split, prediksi test) langsung diambil dari cache.
+
+Cache di memori berukuran terbatas (LRU) dan dipakai bersama semua session
+di proses yang sama. Jika persistensi aktif, hasil yang tidak ada di memori
+dicari di registry model, sehingga cache tetap berlaku setelah server
+restart.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from utils.model_registry import REGISTRY_DIR, load_model
+
+MAX_TRAINING_CACHE_ENTRIES = int(os.environ.get("AKDAT_TRAINING_CACHE_SIZE", 8))
+# Set ke 0 agar cache hanya berlaku di memori proses
+PERSIST_TRAINING_CACHE = os.environ.get("AKDAT_TRAINING_CACHE_PERSIST", "1") != "0"
+
+
+class TrainingResult:
+    """Model yang sudah di-fit beserta semua hasil evaluasinya."""
+
+    def __init__(self, model, metrics, confusion_matrix, classification_report,
+                 feature_importance, train_index=None, test_index=None, y_pred_test=None):
+        self.model = model
+        self.metrics = metrics
+        self.confusion_matrix = confusion_matrix
+        self.classification_report = classification_report
+        self.feature_importance = feature_importance
+        self.train_index = train_index
+        self.test_index = test_index
+        self.y_pred_test = y_pred_test
+
+    @property
+    def evaluation(self):
+        """Hasil evaluasi dalam bentuk yang bisa disimpan sebagai JSON di registry."""
+        return {
+            'confusion_matrix': np.asarray(self.confusion_matrix).tolist(),
+            'classification_report': self.classification_report,
+            'feature_importance': self.feature_importance.to_dict('records'),
+        }
+
+    @property
+    def extras(self):
+        """Objek non-JSON yang disimpan di artefak registry."""
+        return {
+            'train_index': self.train_index,
+            'test_index': self.test_index,
+            'y_pred_test': self.y_pred_test,
+        }
+
+    @classmethod
+    def from_registered(cls, registered):
+        """Pulihkan hasil training dari model di registry."""
+        evaluation = registered.meta.get('evaluation', {})
+        extras = registered.extras
+        return cls(
+            model=registered.model,
+            metrics=registered.metrics,
+            confusion_matrix=np.array(evaluation.get('confusion_matrix', [[0, 0], [0, 0]])),
+            classification_report=evaluation.get('classification_report', {}),
+            feature_importance=pd.DataFrame(
+                evaluation.get('feature_importance', []), columns=['Feature', 'Importance']
+            ),
+            train_index=extras.get('train_index'),
+            test_index=extras.get('test_index'),
+            y_pred_test=extras.get('y_pred_test'),
+        )
+
+
+class TrainingCache:
+    """LRU ``key -> TrainingResult``, dengan registry sebagai lapisan disk (opsional)."""
+
+    def __init__(self, max_entries=MAX_TRAINING_CACHE_ENTRIES, registry_dir=None):
+        self.max_entries = max_entries
+        self.registry_dir = registry_dir
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Hasil untuk ``key``, atau None jika belum pernah di-training."""
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                return result
+
+        if self.registry_dir is None:
+            return None
+        try:
+            result = TrainingResult.from_registered(load_model(key, self.registry_dir))
+        except (OSError, ValueError, KeyError):
+            return None
+        self.put(key, result)
+        return result
+
+    def put(self, key, result):
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+_training_cache = None
+_training_cache_lock = threading.Lock()
+
+
+def get_training_cache():
+    """Cache hasil training milik proses ini (dibuat sekali)."""
+    global _training_cache
+    with _training_cache_lock:
+        if _training_cache is None:
+            _training_cache = TrainingCache(
+                registry_dir=REGISTRY_DIR if PERSIST_TRAINING_CACHE else None
+            )
+        return _training_cache
@@ -0,0 +1,259 @@
+"""Training model sebagai job di background.
+
+Job dijalankan di thread pool milik proses server, sehingga script
+Streamlit tidak menunggu ``model.fit`` selesai dan forest hasil training
+tidak perlu dikirim antar proses. Paralelisme tetap penuh: setiap batch tree
+di-fit dengan ``n_jobs=-1`` (joblib melepas GIL saat membangun tree).
+
+Progress dilaporkan sebagai jumlah tree yang sudah selesai, dan job bisa
+dibatalkan di antara batch tree. Job disimpan per proses dengan ID-nya,
+sehingga halaman bisa tersambung lagi ke job yang masih berjalan setelah
+rerun atau pindah halaman cukup dengan menyimpan ID job di session.
+"""
+import contextlib
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+from sklearn.model_selection import train_test_split
+
+from utils.importance import compute_permutation_importance
+from utils.memory import TracedMemory, frame_nbytes
+from utils.training import TrainingCancelled, compact_features, fit_forest, oob_predictions, uses_compact_features
+from utils.training_cache import TrainingResult
+
+# Jumlah job training yang berjalan bersamaan; job lain menunggu di antrean
+MAX_RUNNING_JOBS = int(os.environ.get("AKDAT_TRAINING_WORKERS", 1))
+# Job yang sudah selesai tetap disimpan agar hasilnya bisa diambil session
+MAX_FINISHED_JOBS = 16
+
+# Ukur puncak alokasi memori selama fit dengan tracemalloc (0 = nonaktif)
+TRACE_FIT_MEMORY = os.environ.get("AKDAT_TRACE_FIT_MEMORY", "1") != "0"
+
+# Feature importance model tanpa feature_importances_ (permutation, data test)
+IMPORTANCE_SAMPLE_SIZE = 2_000
+IMPORTANCE_REPEATS = 3
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_CANCELLED = 'cancelled'
+JOB_FAILED = 'failed'
+
+
+class TrainingJob:
+    """Status satu job training; dibaca oleh halaman, ditulis oleh worker."""
+
+    def __init__(self, info):
+        self.job_id = uuid.uuid4().hex[:12]
+        # Konfigurasi training (key cache, parameter, fitur, ...) untuk halaman
+        self.info = info
+        self.status = JOB_QUEUED
+        self.stage = "Menunggu giliran..."
+        self.trees_done = 0
+        self.trees_total = 0
+        self.result = None
+        self.fit_mode = None
+        self.n_trees_fitted = 0
+        self.error = None
+        self.submitted_at = time.time()
+        self.finished_at = None
+        self._cancel = threading.Event()
+
+    @property
+    def finished(self):
+        return self.status in (JOB_DONE, JOB_CANCELLED, JOB_FAILED)
+
+    @property
+    def progress(self):
+        if self.status == JOB_DONE:
+            return 1.0
+        if self.trees_total == 0:
+            return 0.0
+        return self.trees_done / self.trees_total
+
+    @property
+    def elapsed(self):
+        return (self.finished_at or time.time()) - self.submitted_at
+
+    def cancel(self):
+        self._cancel.set()
+
+    def cancel_requested(self):
+        return self._cancel.is_set()
+
+    def _update_trees(self, done, total):
+        self.trees_done = done
+        self.trees_total = total
+        self.stage = f"Training model... {done}/{total} tree"
+
+
+def train_and_evaluate(job, X, y, features, model_params, test_size, base_model=None):
+    """Split, fit, dan evaluasi; kembalikan ``TrainingResult``.
+
+    Dengan ``oob_score=True`` di ``model_params``, evaluasi (confusion
+    matrix, classification report, precision, recall) memakai prediksi
+    out-of-bag dan prediksi ulang data training dilewati. ``test_size=0``
+    (hanya untuk mode OOB) berarti semua data dipakai untuk training.
+
+    Puncak alokasi memori selama fit (``tracemalloc``) dicatat di metrik
+    ``peak_fit_mb`` jika pengukuran aktif dan tidak sedang dipakai job lain.
+    Sebagai konteks, ukuran matriks feature yang dipakai untuk fit
+    (``train_matrix_mb``) dan DataFrame asli untuk baris yang sama
+    (``train_frame_mb``) dihitung dari ``nbytes``.
+    """
+    use_oob = bool(model_params.get('oob_score'))
+    if test_size > 0:
+        job.stage = "Membagi data train/test..."
+        # Split posisi baris saja (hasilnya sama dengan split X langsung), agar
+        # baris train/test bisa langsung disalin ke matriks float32
+        train_positions, test_positions = train_test_split(
+            np.arange(len(y)),
+            test_size=test_size/100,
+            random_state=model_params['random_state'],
+            stratify=y
+        )
+        y_train, y_test = y.iloc[train_positions], y.iloc[test_positions]
+    else:
+        train_positions, test_positions = None, None
+        y_train, y_test = y, None
+
+    if uses_compact_features(model_params):
+        job.stage = "Menyiapkan matriks feature float32..."
+        X_train = compact_features(X, train_positions)
+        X_test = None if test_positions is None else compact_features(X, test_positions)
+    else:
+        X_train = X if train_positions is None else X.iloc[train_positions]
+        X_test = None if test_positions is None else X.iloc[test_positions]
+
+    job.stage = "Training model..."
+    job.trees_total = model_params['n_estimators']
+    fit_memory = TracedMemory(optional=True)
+    with fit_memory if TRACE_FIT_MEMORY else contextlib.nullcontext():
+        model, job.fit_mode, job.n_trees_fitted = fit_forest(
+            X_train, y_train, model_params,
+            base_model=base_model,
+            progress_callback=job._update_trees,
+            should_stop=job.cancel_requested,
+        )
+    if job.cancel_requested():
+        raise TrainingCancelled()
+
+    job.stage = "Making predictions..."
+    metrics = {}
+    y_pred_test = None
+    if X_test is not None:
+        y_pred_test = model.predict(X_test)
+        metrics['test_accuracy'] = accuracy_score(y_test, y_pred_test)
+    if use_oob:
+        y_true, y_pred = oob_predictions(model, y_train)
+        metrics['oob_accuracy'] = accuracy_score(y_true, y_pred)
+    else:
+        metrics['train_accuracy'] = accuracy_score(y_train, model.predict(X_train))
+        y_true, y_pred = y_test, y_pred_test
+
+    job.stage = "Calculating metrics..."
+    report = classification_report(y_true, y_pred, output_dict=True)
+    metrics['precision'] = report['weighted avg']['precision']
+    metrics['recall'] = report['weighted avg']['recall']
+    if fit_memory.peak_bytes is not None:
+        metrics['peak_fit_mb'] = fit_memory.peak_bytes / 1024**2
+    metrics['train_matrix_mb'] = frame_nbytes(X_train) / 1024**2
+    metrics['train_frame_mb'] = frame_nbytes(X, len(X_train)) / 1024**2
+
+    if hasattr(model, 'feature_importances_'):
+        feature_importance = pd.DataFrame({
+            'Feature': features,
+            'Importance': model.feature_importances_
+        }).sort_values('Importance', ascending=False)
+    else:
+        # Gradient boosting tidak punya impurity importance: pakai permutation importance
+        job.stage = "Menghitung feature importance..."
+        feature_importance = compute_permutation_importance(
+            model, X_test, y_test,
+            n_samples=IMPORTANCE_SAMPLE_SIZE,
+            n_repeats=IMPORTANCE_REPEATS,
+            random_state=model_params['random_state']
+        )[['Feature', 'Importance']]
+    return TrainingResult(
+        model=model,
+        metrics=metrics,
+        confusion_matrix=confusion_matrix(y_true, y_pred),
+        classification_report=report,
+        feature_importance=feature_importance,
+        # Simpan index split saja; datanya tetap bisa diambil dari store
+        train_index=X_train.index,
+        test_index=None if X_test is None else X_test.index,
+        y_pred_test=y_pred_test,
+    )
+
+
+def _run(job, on_done, args, kwargs):
+    if job.cancel_requested():
+        job.status = JOB_CANCELLED
+        job.finished_at = time.time()
+        return
+    job.status = JOB_RUNNING
+    try:
+        result = train_and_evaluate(job, *args, **kwargs)
+        if on_done is not None:
+            on_done(job, result)
+        job.result = result
+        job.status = JOB_DONE
+        job.stage = "✅ Training selesai!"
+    except TrainingCancelled:
+        job.status = JOB_CANCELLED
+        job.stage = "Training dibatalkan"
+    except Exception as e:
+        job.error = f"{type(e).__name__}: {e}"
+        job.status = JOB_FAILED
+        job.stage = "Training gagal"
+    finally:
+        job.finished_at = time.time()
+
+
+_executor = None
+_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=MAX_RUNNING_JOBS, thread_name_prefix='training-job')
+    return _executor
+
+
+def submit_training_job(X, y, features, model_params, test_size, base_model=None, info=None, on_done=None):
+    """Jalankan ``train_and_evaluate`` di background dan kembalikan ``TrainingJob``.
+
+    ``on_done(job, result)`` (opsional) dipanggil di thread worker setelah
+    training berhasil, sebelum job ditandai selesai (mis. untuk mengisi cache).
+    """
+    job = TrainingJob(info or {})
+    job.trees_total = model_params['n_estimators']
+    with _jobs_lock:
+        _jobs[job.job_id] = job
+        finished = [job_id for job_id, other in _jobs.items() if other.finished]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del _jobs[job_id]
+        _get_executor().submit(
+            _run, job, on_done,
+            (X, y, list(features), model_params, test_size),
+            {'base_model': base_model}
+        )
+    return job
+
+
+def get_job(job_id):
+    """Job dengan ``job_id``, atau None jika tidak ada (mis. server restart)."""
+    if job_id is None:
+        return None
+    with _jobs_lock:
+        return _jobs.get(job_id)
@@ -0,0 +1,226 @@
+"""Pencarian hyperparameter Random Forest dengan successive halving.
+
+Kandidat parameter (grid atau acak) dievaluasi dengan stratified k-fold
+cross-validation pada data training. Ronde pertama memakai subsampel kecil
+untuk semua kandidat; setiap ronde hanya ``1/eta`` kandidat terbaik yang
+lanjut dengan data ``eta`` kali lebih banyak, sampai ronde terakhir memakai
+seluruh data training. Evaluasi dijalankan paralel di worker process.
+
+Setiap hasil evaluasi disimpan di ``TuningCache`` (file JSON kecil per
+evaluasi) dengan key dari versi data, fitur, parameter, dan jumlah sampel,
+sehingga konfigurasi yang sama tidak pernah di-training ulang.
+"""
+import itertools
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import StratifiedKFold, cross_val_score, train_test_split
+
+from utils.data_loader import derive_key
+
+CACHE_DIR = os.path.join('model', 'tuning')
+
+# Rentang sama dengan slider di halaman Analysis
+SEARCH_SPACE = {
+    'n_estimators': list(range(10, 201, 10)),
+    'max_depth': list(range(5, 51, 5)),
+    'min_samples_split': list(range(2, 21)),
+}
+
+# Grid default yang lebih jarang agar jumlah kandidat tetap wajar
+DEFAULT_GRID = {
+    'n_estimators': [50, 100, 150, 200],
+    'max_depth': [10, 20, 30, 50],
+    'min_samples_split': [2, 5, 10],
+}
+
+# Jumlah sampel minimum per kelas di setiap fold
+MIN_SAMPLES_PER_CLASS = 10
+
+
+def grid_candidates(grid=None):
+    """Semua kombinasi parameter dari ``grid``."""
+    grid = grid or DEFAULT_GRID
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def random_candidates(n_candidates, space=None, random_state=42):
+    """``n_candidates`` kombinasi acak (tanpa duplikat) dari ``space``."""
+    space = space or SEARCH_SPACE
+    rng = np.random.default_rng(random_state)
+    total = math.prod(len(values) for values in space.values())
+    candidates, seen = [], set()
+    while len(candidates) < min(n_candidates, total):
+        params = {name: int(rng.choice(values)) for name, values in space.items()}
+        signature = tuple(sorted(params.items()))
+        if signature not in seen:
+            seen.add(signature)
+            candidates.append(params)
+    return candidates
+
+
+class TuningCache:
+    """Hasil evaluasi per key, disimpan sebagai file JSON di ``directory``."""
+
+    def __init__(self, directory=CACHE_DIR):
+        self.directory = directory
+        self._memory = {}
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        if key in self._memory:
+            return self._memory[key]
+        try:
+            with open(self._path(key)) as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self._memory[key] = result
+        return result
+
+    def put(self, key, result):
+        self._memory[key] = result
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = self._path(key) + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(result, f)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            # Tanpa akses tulis, cache tetap berlaku di memori
+            pass
+
+
+# Data training per worker: dikirim sekali saat worker dibuat
+_worker_data = {}
+
+
+def _init_worker(X, y):
+    _worker_data['X'] = X
+    _worker_data['y'] = y
+
+
+def _subsample(y, n_samples, random_state):
+    """Posisi subsampel berstrata berukuran ``n_samples`` (semua jika cukup)."""
+    positions = np.arange(len(y))
+    if n_samples >= len(y):
+        return positions
+    subset, _ = train_test_split(positions, train_size=n_samples, stratify=y, random_state=random_state)
+    return np.sort(subset)
+
+
+def evaluate_params(X, y, params, n_samples, cv=3, random_state=42):
+    """Skor cross-validation (accuracy) untuk satu kombinasi parameter."""
+    positions = _subsample(y, n_samples, random_state)
+    model = RandomForestClassifier(random_state=random_state, n_jobs=1, **params)
+    folds = StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state)
+    started = time.perf_counter()
+    scores = cross_val_score(model, X[positions], y[positions], cv=folds, scoring='accuracy')
+    return {
+        'mean_score': float(scores.mean()),
+        'std_score': float(scores.std()),
+        'fit_seconds': time.perf_counter() - started,
+    }
+
+
+def _evaluate_in_worker(params, n_samples, cv, random_state):
+    return evaluate_params(_worker_data['X'], _worker_data['y'], params, n_samples, cv, random_state)
+
+
+def halving_schedule(n_candidates, n_total, eta=3, min_samples=None):
+    """Jumlah sampel per ronde: ronde terakhir memakai seluruh ``n_total``."""
+    # Ronde terakhir menyisakan sekitar eta kandidat pada data penuh
+    n_rounds = max(1, math.ceil(math.log(n_candidates, eta))) if n_candidates > 1 else 1
+    schedule = [int(n_total / eta ** (n_rounds - 1 - i)) for i in range(n_rounds)]
+    if min_samples is not None:
+        schedule = [n for n in schedule if n >= min_samples] or [n_total]
+    return schedule
+
+
+def successive_halving(X, y, candidates, data_key, cv=3, eta=3, random_state=42,
+                       n_workers=1, cache=None, progress_callback=None):
+    """Jalankan successive halving dan kembalikan leaderboard (DataFrame).
+
+    ``X`` dan ``y`` adalah data training (array/DataFrame). ``data_key``
+    mengidentifikasi versi data + fitur + split untuk key cache.
+    ``progress_callback(selesai, total, ronde, jumlah_ronde)`` dipanggil setiap
+    satu evaluasi selesai.
+
+    Leaderboard berisi parameter, ronde terakhir yang dicapai, jumlah sampel
+    di ronde itu, skor rata-rata & standar deviasi, dan apakah hasilnya dari
+    cache; diurutkan dari ronde tertinggi lalu skor tertinggi.
+    """
+    if cache is None:
+        cache = TuningCache()
+    X = np.ascontiguousarray(np.asarray(X, dtype=np.float32))
+    y = np.asarray(y)
+
+    n_classes = len(np.unique(y))
+    schedule = halving_schedule(len(candidates), len(y), eta, min_samples=MIN_SAMPLES_PER_CLASS * n_classes * cv)
+    total_evaluations = 0
+    survivors = len(candidates)
+    for _ in schedule:
+        total_evaluations += survivors
+        survivors = max(1, math.ceil(survivors / eta))
+
+    records = {i: {**params, 'round': 0, 'n_samples': 0, 'mean_score': np.nan,
+                   'std_score': np.nan, 'from_cache': False}
+               for i, params in enumerate(candidates)}
+    done = 0
+
+    executor = None
+    if n_workers > 1:
+        executor = ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker, initargs=(X, y))
+    try:
+        alive = list(range(len(candidates)))
+        for round_number, n_samples in enumerate(schedule, start=1):
+            keys = {
+                i: derive_key(data_key, cv=cv, random_state=random_state, n_samples=n_samples, **candidates[i])
+                for i in alive
+            }
+            results, pending = {}, {}
+            for i in alive:
+                cached = cache.get(keys[i])
+                if cached is not None:
+                    results[i] = (cached, True)
+                elif executor is not None:
+                    pending[i] = executor.submit(_evaluate_in_worker, candidates[i], n_samples, cv, random_state)
+                else:
+                    pending[i] = None
+
+            for i in alive:
+                if i in pending:
+                    if executor is not None:
+                        result = pending[i].result()
+                    else:
+                        result = evaluate_params(X, y, candidates[i], n_samples, cv, random_state)
+                    cache.put(keys[i], result)
+                    results[i] = (result, False)
+                result, from_cache = results[i]
+                records[i].update(
+                    round=round_number, n_samples=n_samples,
+                    mean_score=result['mean_score'], std_score=result['std_score'],
+                    from_cache=from_cache,
+                )
+                done += 1
+                if progress_callback is not None:
+                    progress_callback(done, total_evaluations, round_number, len(schedule))
+
+            # Pertahankan 1/eta kandidat terbaik untuk ronde berikutnya
+            alive.sort(key=lambda i: records[i]['mean_score'], reverse=True)
+            alive = alive[:max(1, math.ceil(len(alive) / eta))]
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    leaderboard = pd.DataFrame(list(records.values()))
+    return leaderboard.sort_values(['round', 'mean_score'], ascending=False).reset_index(drop=True)